@@ -0,0 +1,143 @@
+"""Matching of the abbreviations in articlenizer.ABBREVIATIONS.
+
+The abbreviation patterns are expanded in the literal strings they can match and compiled once into a trie.
+From the trie a regular expression is generated in which abbreviations with a common prefix share a single branch,
+so the regex engine only has to follow one path for each position instead of trying every abbreviation one after another.
+A reversed trie allows to check whether an abbreviation ends at a given position without searching the text.
+"""
+
+import re
+
+from articlenizer import ABBREVIATIONS, regex_engine
+
+ANY = None # trie key for a wildcard ('.'), matches anything except a newline
+END = '' # trie key marking the end of an abbreviation
+
+def expand_abbreviation(pattern):
+    """Expand an abbreviation pattern in all sequences of characters it can match.
+    Only the syntax used in ABBREVIATIONS is supported: escaped characters, character sets, optional characters and '.' as wildcard.
+
+    Args:
+        pattern (string): abbreviation pattern
+
+    Returns:
+        list of tuples: sequences of characters (ANY for a wildcard)
+    """
+    expansions = [()]
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == '\\':
+            chars = [pattern[i+1]]
+            i += 2
+        elif pattern[i] == '[':
+            close = pattern.index(']', i)
+            chars = list(pattern[i+1:close])
+            i = close + 1
+        elif pattern[i] == '.':
+            chars = [ANY]
+            i += 1
+        else:
+            chars = [pattern[i]]
+            i += 1
+        if i < len(pattern) and pattern[i] == '?':
+            expansions = expansions + [e + (c,) for e in expansions for c in chars]
+            i += 1
+        else:
+            expansions = [e + (c,) for e in expansions for c in chars]
+    return expansions
+
+def _build_trie(sequences):
+    """Build a trie of nested dictionaries
+
+    Args:
+        sequences (iterable): sequences of characters
+
+    Returns:
+        dictionary: root node
+    """
+    root = {}
+    for sequence in sequences:
+        node = root
+        for char in sequence:
+            node = node.setdefault(char, {})
+        node[END] = True
+    return root
+
+def _trie_to_regex(node):
+    """Generate a regular expression from a trie node
+
+    Args:
+        node (dictionary): trie node
+
+    Returns:
+        string: regular expression matching all sequences below the node
+    """
+    chars = sorted((k for k in node if k != END and k is not ANY))
+    if ANY in node:
+        chars.append(ANY)
+    alternatives = []
+    for char in chars:
+        alternatives.append(('.' if char is ANY else re.escape(char)) + _trie_to_regex(node[char]))
+    if not alternatives:
+        return ''
+    if len(alternatives) == 1 and END not in node:
+        return alternatives[0]
+    regex = '(?:' + '|'.join(alternatives) + ')'
+    if END in node:
+        regex += '?'
+    return regex
+
+class AbbreviationMatcher():
+    """Compiled matcher for a list of abbreviation patterns.
+    """
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        sequences = [sequence for p in self.patterns for sequence in expand_abbreviation(p)]
+        self.trie = _build_trie(sequences)
+        self.reversed_trie = _build_trie(sequence[::-1] for sequence in sequences)
+        self.pattern = _trie_to_regex(self.trie)
+        self.regex = regex_engine.compile(self.pattern)
+
+    def search(self, s, pos=0, endpos=None):
+        """Search for the first abbreviation in a string
+
+        Args:
+            s (string): text
+            pos (int, optional): index to start searching at. Defaults to 0.
+            endpos (int, optional): index to stop searching at. Defaults to None (end of the string).
+
+        Returns:
+            match object or None
+        """
+        if endpos is None:
+            endpos = len(s)
+        return self.regex.search(s, pos, endpos)
+
+    def ends_at(self, s, end, beg=0):
+        """Check whether an abbreviation ends at a given position, walking the reversed trie backwards from there.
+
+        Args:
+            s (string): text
+            end (int): index the abbreviation has to end at (exclusive)
+            beg (int, optional): first index the abbreviation may start at. Defaults to 0.
+
+        Returns:
+            bool: whether s[beg:end] ends with an abbreviation
+        """
+        nodes = [self.reversed_trie]
+        idx = end
+        while nodes and idx > beg:
+            idx -= 1
+            char = s[idx]
+            next_nodes = []
+            for node in nodes:
+                if char in node:
+                    next_nodes.append(node[char])
+                if ANY in node and char != '\n':
+                    next_nodes.append(node[ANY])
+            if any(END in node for node in next_nodes):
+                return True
+            nodes = next_nodes
+        return False
+
+ABBREVIATION_MATCHER = AbbreviationMatcher(ABBREVIATIONS)
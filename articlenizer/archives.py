@@ -0,0 +1,122 @@
+"""Reading articles directly from tar and zip archives (e.g. PMC OA bulk packages) without unpacking them.
+
+Tar archives are read as a stream, member by member, so compressed archives are decompressed once, sequentially.
+An archive is one job for the parallel wrappers and the manifest. The output of a member is placed below the output
+directory of its archive (see archive_out_path) under the member name, members whose names point outside of it
+(absolute paths or '..') are skipped.
+"""
+
+import os
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+
+ARCHIVE_SUFFIXES = ['.tar.gz', '.tgz', '.tar.bz2', '.tar.xz', '.tar', '.zip']
+
+def archive_suffix(path):
+    """Archive suffix of a file name
+
+    Args:
+        path (string or PosixPath): file
+
+    Returns:
+        string: matching entry of ARCHIVE_SUFFIXES or None
+    """
+    name = Path(path).name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+def find_archives(path):
+    """All archives in a directory or the path itself if it is an archive
+
+    Args:
+        path (string or PosixPath): directory or archive
+
+    Returns:
+        list: archive paths
+    """
+    path = Path(path)
+    if path.is_file():
+        return [path] if archive_suffix(path) is not None else []
+    return sorted(p for p in path.rglob('*') if p.is_file() and archive_suffix(p) is not None)
+
+def archive_out_path(archive, in_path, out_path):
+    """Output directory of an archive, its path relative to the input directory without the archive suffix
+
+    Args:
+        archive (PosixPath): archive
+        in_path (string or PosixPath): input directory or the archive itself
+        out_path (string or PosixPath): output directory
+
+    Returns:
+        PosixPath: directory for the outputs of the archive members
+    """
+    archive = Path(archive)
+    in_path = Path(in_path)
+    relative = Path(archive.name) if in_path == archive else archive.relative_to(in_path)
+    return Path(out_path) / relative.parent / archive.name[:-len(archive_suffix(archive))]
+
+def member_path(name):
+    """Normalized relative path of an archive member
+
+    Args:
+        name (string): member name
+
+    Returns:
+        PurePosixPath: relative path or None if the member points outside of the output directory
+    """
+    path = PurePosixPath(name)
+    parts = [p for p in path.parts if p != '.']
+    if path.is_absolute() or '..' in parts or not parts:
+        print(RuntimeWarning("Skipping archive member outside of the output directory: {}".format(name)))
+        return None
+    return PurePosixPath(*parts)
+
+def iter_members(archive, suffix):
+    """Read the files of an archive one by one
+
+    Args:
+        archive (string or PosixPath): tar (optionally compressed) or zip archive
+        suffix (string): only members with this suffix are read (e.g. '.nxml')
+
+    Yields:
+        PurePosixPath, file: member path (see member_path) and binary file object, only valid until the next member is read
+    """
+    if archive_suffix(archive) == '.zip':
+        with zipfile.ZipFile(archive) as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir() or not info.filename.endswith(suffix):
+                    continue
+                path = member_path(info.filename)
+                if path is not None:
+                    with zip_file.open(info) as member:
+                        yield path, member
+    else:
+        with tarfile.open(archive, mode='r|*') as tar_file:
+            for info in tar_file:
+                if not info.isfile() or not info.name.endswith(suffix):
+                    continue
+                path = member_path(info.name)
+                if path is not None:
+                    yield path, tar_file.extractfile(info)
+
+def member_out_name(out_dir, path, out_suffix, created=None):
+    """Output file of an archive member, its parent directory is created
+
+    Args:
+        out_dir (PosixPath): output directory of the archive (see archive_out_path)
+        path (PurePosixPath): member path
+        out_suffix (string): suffix that replaces the suffix of the member (e.g. '.txt')
+        created (set, optional): directories that already exist, updated. Defaults to None.
+
+    Returns:
+        PosixPath: output file name
+    """
+    out_name = Path(out_dir) / Path(*path.parts).with_suffix(out_suffix)
+    if created is None or out_name.parent not in created:
+        os.makedirs(out_name.parent, exist_ok=True)
+        if created is not None:
+            created.add(out_name.parent)
+    return out_name
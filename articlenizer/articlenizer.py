@@ -1,12 +1,27 @@
+import io
+import re
+import time
+from array import array
 from pathlib import Path
 from functools import partial
-from multiprocessing import Pool
 
 from articlenizer import sentenize
 from articlenizer import tokenize
 from articlenizer import corrections
 from articlenizer import encode_string
-from articlenizer.util import chunk_list
+from articlenizer import archives
+from articlenizer import profiling
+from articlenizer.util import Vocabulary
+from articlenizer.scheduler import run_parallel
+from articlenizer.prefetch import prefetch, BackgroundWriter, QUEUE_DEPTH
+from articlenizer.pipeline import get_pipeline
+from articlenizer.cache import cache_key
+from articlenizer.abbreviations import ABBREVIATION_MATCHER
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 def handle_unicode(text):
     """Wrapper for encode_string.handle_unicode_characters. Handle unicode characters appearing in string.
@@ -37,14 +52,16 @@ def sentenize_text(text, representation='list', correct=True):
 
     Args:
         text (string): string to sentenize
-        representation (str, optional): return type, 'list' return a list of sentences, otherwise a block of text is returned where newlines indicate individual sentences. Defaults to 'list'.
+        representation (str, optional): return type, 'list' return a list of sentences, 'spans' returns the block of text and an array of sentence offsets (see sentenize.sentenize_spans), otherwise a block of text is returned where newlines indicate individual sentences. Defaults to 'list'.
         correct (bool): correct errors in string
 
     Returns:
-        list or text: sentences in the given text
+        list, text or (text, array): sentences in the given text
     """
     if correct:
         text = correct_text(text)
+    if representation == 'spans':
+        return sentenize.sentenize_spans(text)
     sentences = sentenize.sentenize(text)
     if representation == 'list':
         sentences = sentences.split('\n')
@@ -55,14 +72,16 @@ def tokenize_text(sentence, representation='no_spaces', correct=True):
 
     Args:
         text (string): string to tokenize
-        representation (str, optional): whether to include spaces in the return string. If no spaces are returned the original string cannot be reconstructed. Defaults to 'no_spaces'.
+        representation (str, optional): whether to include spaces in the return string. If no spaces are returned the original string cannot be reconstructed. 'spans' returns the string and an array of token offsets (see tokenize.tokenize_spans). Defaults to 'no_spaces'.
         correct (bool): correct errors in string
 
     Returns:
-        list: list of tokens
+        list or (text, array): list of tokens
     """
     if correct:
         sentence = correct_text(sentence)
+    if representation == 'spans':
+        return sentence, tokenize.tokenize_spans(sentence)
     tokens = tokenize.tokenize(sentence)
     if representation == 'no_spaces':
         tokens = [tok for tok in tokens if tok.rstrip()]
@@ -84,34 +103,397 @@ def switch_citations(text):
     text, _ = corrections.correct_citations(text)
     return text
 
-def get_tokenized_sentences(text, sentence_rep='list', token_rep='no_spaces', process_unicode=True, replace_math=True, correct=True, corr_cite=True):
-    """Sent- and Tokenize an text
+def _sentenize_document(text, sentence_rep='list', process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    """Apply all preprocessing steps and sentenize a text
 
     Args:
         text (string): text to process
         sentence_rep (str, optional): see 'sentenize_text'. Defaults to 'list'.
-        token_rep (str, optional): see 'tokenize_text'. Defaults to 'no_spaces'.
         process_unicode (bool, optional): replace unicodes. Defaults to True.
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
 
     Returns:
-        list of lists: sentences with individual tokens
+        list or text: sentences in the given text
     """
+    if sentence_rep == 'list':
+        return get_pipeline(process_unicode, replace_math, correct, corr_cite, tokenize=False).process(text)
     if process_unicode:
         text = handle_unicode(text)
     if replace_math:
         text = replace_math_equations(text)
     if corr_cite:
         text = switch_citations(text)
-    text = sentenize_text(text, sentence_rep, correct=correct)
+    return sentenize_text(text, sentence_rep, correct=correct)
+
+# blank lines the text can be split at for the paragraph cache
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n\s*')
+# opening quotes of the quotation rule in sentenize.SUBSENTENCE_REGEX, which joins lines up to 500 characters apart
+OPENING_QUOTES = '»“❝‘"'
+QUOTE_REACH = 510
+# paragraph in front of every cached paragraph but the first, gives it the same context as within the whole text
+CACHE_CONTEXT = 'Text.\n\n'
+
+def _closes_brackets(text):
+    """Whether all round and square brackets opened in a text are closed again"""
+    for open_bracket, close_bracket in ['()', '[]']:
+        if open_bracket not in text:
+            continue
+        depth = 0
+        for char in text:
+            if char == open_bracket:
+                depth += 1
+            elif char == close_bracket and depth:
+                depth -= 1
+        if depth:
+            return False
+    return True
+
+def _independent_break(text, unit_beg, paragraph_beg, beg, end):
+    """Whether no preprocessing rule can reach over a paragraph break, i.e. the text before and after it are processed the same on their own.
+    The previous paragraph has to end a sentence that is not an abbreviation or initial, the next one has to start with a capital letter,
+    all brackets opened since unit_beg have to be closed and no opening quote may be in reach.
+
+    Args:
+        text (string): text
+        unit_beg (int): start of the text before the break that is processed together
+        paragraph_beg (int): start of the paragraph before the break
+        beg (int): start of the break
+        end (int): end of the break (start of the next paragraph)
+
+    Returns:
+        bool: whether the text can be split at the break
+    """
+    if not 'A' <= text[end:end + 1] <= 'Z':
+        return False
+    last = len(text[paragraph_beg:beg].rstrip(' \t')) + paragraph_beg
+    if last == paragraph_beg or text[last - 1] not in '.!?':
+        return False
+    if text[last - 2:last - 1].isupper() and not text[last - 3:last - 2].isalpha():
+        return False
+    if ABBREVIATION_MATCHER.ends_at(text, last, max(paragraph_beg, last - 20)):
+        return False
+    unit = text[unit_beg:beg]
+    # unicode handling may be switched off or map characters to quotes and brackets, both versions are checked
+    versions = [unit] if unit.isascii() else [unit, encode_string.handle_unicode_characters(unit)[0]]
+    for version in versions:
+        if any(quote in version[-QUOTE_REACH:] for quote in OPENING_QUOTES) or not _closes_brackets(version):
+            return False
+    return True
+
+def split_paragraphs(text):
+    """Split a text at the paragraph breaks that no preprocessing rule reaches over (see _independent_break).
+    The first part is preprocessed as it is, all other parts after CACHE_CONTEXT, so that they get the same sentences as within the whole text.
+
+    Args:
+        text (string): text
+
+    Returns:
+        list: parts of the text, each including its trailing paragraph break
+    """
+    units = []
+    unit_beg = 0
+    paragraph_beg = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        if _independent_break(text, unit_beg, paragraph_beg, match.start(), match.end()):
+            units.append(text[unit_beg:match.end()])
+            unit_beg = match.end()
+        paragraph_beg = match.end()
+    units.append(text[unit_beg:])
+    return units
+
+def _cached_tokenized_sentences(text, cache, pipeline):
+    """Tokenized sentences of a text with the paragraph cache, see get_tokenized_sentences"""
+    units = split_paragraphs(text)
+    if len(units) == 1:
+        return pipeline.process(text)
+    config = [pipeline.config[name] for name in ['process_unicode', 'replace_math', 'correct', 'corr_cite', 'token_rep']]
+    start = time.perf_counter()
+    keys = [cache_key(unit, config + [idx == 0]) for idx, unit in enumerate(units)]
+    found = cache.get_many(keys)
+    lookup = time.perf_counter() - start
+    new = {}
+    tokenized_text = []
+    context = None
+    for idx, (unit, key) in enumerate(zip(units, keys)):
+        if key in found:
+            sentences = found[key]
+        elif key in new:
+            sentences = new[key]
+        else:
+            if idx == 0:
+                sentences = pipeline.process(unit)
+            else:
+                if context is None:
+                    context = pipeline.process(CACHE_CONTEXT)
+                sentences = pipeline.process(CACHE_CONTEXT + unit)
+                # the preprocessing may still join the start of the part to the previous sentence (e.g. a formula
+                # replaced by a lowercase token), then the part is not independent and the whole text is processed
+                if sentences[:len(context)] != context or (len(sentences) == len(context) and unit.strip()):
+                    profiling.add('cache', lookup, len(text))
+                    return pipeline.process(text)
+                sentences = sentences[len(context):]
+            new[key] = sentences
+        # parts without any text give a single empty sentence, which only the whole text may return
+        if sentences and sentences != [[]]:
+            tokenized_text.extend(sentences)
+    start = time.perf_counter()
+    cache.put_many(new)
+    profiling.add('cache', lookup + time.perf_counter() - start, len(text))
+    return tokenized_text if tokenized_text else [[]]
+
+def get_tokenized_sentences(text, sentence_rep='list', token_rep='no_spaces', process_unicode=True, replace_math=True, correct=True, corr_cite=True, cache=None):
+    """Sent- and Tokenize an text
+
+    Args:
+        text (string): text to process
+        sentence_rep (str, optional): see 'sentenize_text'. Defaults to 'list'.
+        token_rep (str, optional): see 'tokenize_text'. Defaults to 'no_spaces'.
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+        cache (ParagraphCache, optional): cache for the tokenized sentences of paragraphs, repeated paragraphs are not processed again (see cache.ParagraphCache and split_paragraphs). Only for sentence_rep 'list' and token representations without spans. Defaults to None.
+
+    Returns:
+        list of lists: sentences with individual tokens
+    """
+    if cache is not None:
+        if sentence_rep != 'list' or token_rep == 'spans':
+            raise(RuntimeError("The paragraph cache only stores lists of token lists."))
+        return _cached_tokenized_sentences(text, cache, get_pipeline(process_unicode, replace_math, correct, corr_cite, token_rep=token_rep))
+    if sentence_rep == 'list':
+        return get_pipeline(process_unicode, replace_math, correct, corr_cite, token_rep=token_rep).process(text)
+    text = _sentenize_document(text, sentence_rep, process_unicode, replace_math, correct, corr_cite)
     tokenized_text = []
     for line in text:
         tokenized_text.append(tokenize_text(line, token_rep, correct=False))
     return tokenized_text
 
-def preprocess_articles(file_list, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+def tokenize_batch(sentences, vocabulary=None, token_rep='no_spaces', correct=True):
+    """Tokenize many sentences at once and map the tokens to the integer ids of a vocabulary.
+    The result are NumPy arrays if NumPy is installed, otherwise arrays of the standard library array module.
+
+    Args:
+        sentences (iterable): sentence strings
+        vocabulary (Vocabulary, optional): vocabulary to extend, pass the vocabulary of a previous call to get consistent ids. Defaults to None (new vocabulary).
+        token_rep (str, optional): see 'tokenize_text'. Defaults to 'no_spaces'.
+        correct (bool, optional): correct errors in the sentences. Defaults to True.
+
+    Returns:
+        array, array, Vocabulary: int32 token ids of all sentences one after another, int64 offsets of the sentences in the token ids 
+        (sentence i is ids[offsets[i]:offsets[i+1]]) and the vocabulary (vocabulary[id] is the token string)
+    """
+    if vocabulary is None:
+        vocabulary = Vocabulary()
+    ids = array('i')
+    offsets = array('q', [0])
+    for sentence in sentences:
+        ids.extend(vocabulary.intern(tokenize_text(sentence, token_rep, correct)))
+        offsets.append(len(ids))
+    if numpy is not None:
+        ids = numpy.asarray(ids, dtype=numpy.int32)
+        offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    return ids, offsets, vocabulary
+
+# places to split a text at, from the most to the least preferred
+TEXT_BREAKS = ['\n\n', '\n', '. ', ' ']
+
+def _last_break(text, end):
+    """Position after the last paragraph break before end, if there is none the last line break, sentence end or space is used
+
+    Args:
+        text (string): text
+        end (int): index to search before
+
+    Returns:
+        int: start of the following paragraph, 0 if there is no break
+    """
+    for text_break in TEXT_BREAKS:
+        position = text.rfind(text_break, 0, end)
+        if position >= 0:
+            return position + len(text_break)
+    return 0
+
+def _sentence_cut(document, limit):
+    """Last sentence of a processed window that starts before limit in the raw text, right after a whitespace character
+
+    Args:
+        document (Document): window processed with edits, one sentence per line
+        limit (int): offset in the raw text
+
+    Returns:
+        int, int: offset of the sentence in the processed text and of the whitespace in front of it in the raw text, 0, 0 if there is none
+    """
+    beg = document.text.rfind('\n', 0, document.forward([limit])[0])
+    while beg >= 0:
+        raw = document.backward([beg + 1])[0]
+        if 0 < raw <= limit and document.raw[raw - 1].isspace():
+            return beg + 1, raw - 1
+        beg = document.text.rfind('\n', 0, beg)
+    return 0, 0
+
+def _carry_agrees(document, carry_length, carry_sentences):
+    """Whether a window starting with carried text gives the same sentences for it as the previous window.
+    The sentences within QUOTE_REACH characters of the end of the carried text may differ due to the following text 
+    and are only compared if the carried text is too short to tell them apart from the context before it.
+
+    Args:
+        document (Document): window processed with edits, one sentence per line
+        carry_length (int): length of the carried text at the start of the raw window
+        carry_sentences (list): non-empty sentences of the carried text in the previous window
+
+    Returns:
+        bool: sentences agree
+    """
+    stable = document.text.rfind('\n', 0, document.forward([carry_length])[0] - QUOTE_REACH)
+    if stable < QUOTE_REACH:
+        sentences = [sentence for sentence in document.text.split('\n') if sentence]
+        return sentences[:len(carry_sentences)] == carry_sentences
+    sentences = [sentence for sentence in document.text[:stable].split('\n') if sentence]
+    return carry_sentences[:len(sentences)] == sentences
+
+def _read_windows(stream, window_size):
+    """Read a file-like object in windows of at least window_size characters that end at a paragraph break
+
+    Args:
+        stream (file-like): text input
+        window_size (int): number of characters to read at once
+
+    Yields:
+        string: window of text
+    """
+    pending = ''
+    while True:
+        chunk = stream.read(window_size)
+        if not chunk:
+            if pending:
+                yield pending
+            return
+        pending += chunk
+        cut = _last_break(pending, len(pending))
+        if cut > 0:
+            yield pending[:cut]
+            pending = pending[cut:]
+
+def iter_sentences(stream, window_size=1000000, overlap=5000, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    """Sentenize a file-like object window by window with bounded memory.
+    The last sentences of each window (at least overlap characters) are carried over to the next window, so that rules 
+    spanning a window edge (e.g. rejoining brackets within 250 characters) see the same context as for the whole text. 
+    The sentences before the carried text are held back until the next window gives the same sentences for the carried 
+    text without the context before it, otherwise they are processed again together with the next window (up to twice 
+    the window_size and overlap). Every window is processed once if its carried text does not depend on the context 
+    before it. Empty lines are skipped.
+
+    Args:
+        stream (file-like): text input
+        window_size (int, optional): number of characters to read at once, at least overlap. Defaults to 1000000.
+        overlap (int, optional): minimum number of characters carried over to the next window. Defaults to 5000.
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+
+    Yields:
+        string: sentence
+    """
+    if window_size < overlap:
+        raise(RuntimeError("The window size has to be at least as large as the overlap: {} < {}".format(window_size, overlap)))
+    # the stages with edits give the same sentences as _sentenize_document and locate them in the raw text
+    pipeline = get_pipeline(process_unicode, replace_math, correct, corr_cite, tokenize=False, track_edits=True, article_order=True)
+    held = ''
+    held_sentences = []
+    carry = ''
+    carry_sentences = []
+    for window in _read_windows(stream, window_size):
+        text = carry + window
+        document = pipeline.process(text)
+        if held:
+            if _carry_agrees(document, len(carry), carry_sentences) or len(held) + len(text) > 2 * (window_size + overlap):
+                # the carried text does not depend on the context before it, or give up on the context 
+                for sentence in held_sentences:
+                    yield sentence
+            else:
+                text = held + text
+                document = pipeline.process(text)
+            held = ''
+            held_sentences = []
+        cut, tail_start = _sentence_cut(document, len(text) - overlap)
+        if cut > 0:
+            held = text[:tail_start]
+            held_sentences = [sentence for sentence in document.text[:cut - 1].split('\n') if sentence]
+            carry = text[tail_start:]
+            carry_sentences = [sentence for sentence in document.text[cut:].split('\n') if sentence]
+        elif len(text) > 2 * (window_size + overlap):
+            # no sentence the text could be split at, give up on the context 
+            for sentence in document.text.split('\n'):
+                if sentence:
+                    yield sentence
+            carry = ''
+            carry_sentences = []
+        else:
+            carry = text
+            carry_sentences = [sentence for sentence in document.text.split('\n') if sentence]
+    for sentence in held_sentences + carry_sentences:
+        yield sentence
+
+def iter_tokenized_sentences(stream, token_rep='no_spaces', window_size=1000000, overlap=5000, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    """Streaming version of get_tokenized_sentences, see iter_sentences
+
+    Args:
+        stream (file-like): text input
+        token_rep (str, optional): see 'tokenize_text'. Defaults to 'no_spaces'.
+        window_size (int, optional): number of characters to read at once, at least overlap. Defaults to 1000000.
+        overlap (int, optional): minimum number of characters carried over to the next window. Defaults to 5000.
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+
+    Yields:
+        list: tokens of a sentence
+    """
+    for sentence in iter_sentences(stream, window_size, overlap, process_unicode, replace_math, correct, corr_cite):
+        yield tokenize_text(sentence, token_rep, correct=False)
+
+def _write_lines(out_name, lines):
+    # when streaming, lines is a generator and the time includes the processing
+    start = time.perf_counter()
+    characters = 0
+    with out_name.open(mode='w') as prepro_article:
+        for line in lines:
+            prepro_article.write(line + '\n')
+            characters += len(line) + 1
+    profiling.add('write' if isinstance(lines, list) else 'stream', time.perf_counter() - start, characters)
+
+def _read_text(in_name):
+    start = time.perf_counter()
+    with in_name.open(mode='r') as article:
+        text = article.read()
+    profiling.add('read', time.perf_counter() - start, len(text))
+    return text
+
+def _read_member(member):
+    start = time.perf_counter()
+    text = member[1].read().decode('utf-8')
+    profiling.add('read', time.perf_counter() - start, len(text))
+    return text
+
+def _preprocess_article(article, key, out_name, writer, process_unicode=True, replace_math=True, correct=True, corr_cite=True, stream=False, cache=None, shards=None):
+    """Preprocess an article (text or open file when streaming) and submit its output for out_name or for the shards under key to writer (see preprocess_articles)"""
+    if stream:
+        sentences = iter_tokenized_sentences(article, token_rep='no_spaces', process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
+        lines = (' '.join(line).rstrip() for line in sentences)
+    else:
+        sentences = get_tokenized_sentences(article, sentence_rep='list', token_rep='no_spaces', process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite, cache=cache)
+        lines = [' '.join(line).rstrip() for line in sentences]
+    if shards is not None:
+        writer.submit(shards.write, key, {'sentences': list(lines)})
+    else:
+        writer.submit(_write_lines, out_name, lines)
+
+def preprocess_articles(file_list, process_unicode=True, replace_math=True, correct=True, corr_cite=True, stream=False, manifest=None, cache=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Preprocess a list of articles and write output to files.
 
     Args:
@@ -120,16 +502,62 @@ def preprocess_articles(file_list, process_unicode=True, replace_math=True, corr
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
+        stream (bool, optional): read and write articles window by window with bounded memory (see iter_tokenized_sentences), without reader and writer threads. Defaults to False.
+        manifest (Manifest, optional): manifest in which each written article is recorded (see manifest.Manifest). Defaults to None.
+        cache (ParagraphCache, optional): paragraph cache, not used when streaming (see get_tokenized_sentences). Defaults to None.
+        shards (ShardWriter, optional): write the articles to shards as records {'key': input filename, 'sentences': list of sentences} instead of output files (see shards.ShardWriter). Defaults to None.
+        queue_depth (int, optional): number of articles read ahead and written behind the processing by background threads, 0 reads and writes one article after another (see prefetch). Defaults to prefetch.QUEUE_DEPTH.
+    """
+    writer = BackgroundWriter(0 if stream else queue_depth)
+    try:
+        if stream:
+            for in_name, out_name in file_list:
+                with in_name.open(mode='r') as article:
+                    _preprocess_article(article, str(in_name), out_name, writer, process_unicode, replace_math, correct, corr_cite, stream, cache, shards)
+                if manifest is not None:
+                    manifest.record_written([in_name, out_name], shards=shards)
+        else:
+            for (in_name, out_name), text in prefetch(file_list, lambda job: _read_text(job[0]), queue_depth):
+                _preprocess_article(text, str(in_name), out_name, writer, process_unicode, replace_math, correct, corr_cite, stream, cache, shards)
+                if manifest is not None:
+                    writer.submit(manifest.record_written, [in_name, out_name], None, shards)
+    finally:
+        writer.close()
+    if shards is not None:
+        shards.finish()
+
+def preprocess_archives(archive_list, process_unicode=True, replace_math=True, correct=True, corr_cite=True, stream=False, manifest=None, cache=None, shards=None, queue_depth=QUEUE_DEPTH):
+    """Preprocess the .txt files in tar or zip archives without unpacking them.
+
+    Args:
+        archive_list ([archive, output directory]): archives and the directories for the outputs of their members (see archives.archive_out_path), each member is written to <output directory>/<member name>.prepro.txt
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+        stream (bool, optional): see preprocess_articles, members are read completely. Defaults to False.
+        manifest (Manifest, optional): manifest in which each finished archive is recorded (see manifest.Manifest). Defaults to None.
+        cache (ParagraphCache, optional): see preprocess_articles. Defaults to None.
+        shards (ShardWriter, optional): see preprocess_articles, the key of a member is <archive>/<member name>. Defaults to None.
+        queue_depth (int, optional): see preprocess_articles, members are read ahead also when streaming. Defaults to prefetch.QUEUE_DEPTH.
     """
-    for in_name, out_name in file_list:
-        with in_name.open(mode='r') as article:
-            text = article.read()
-        text = get_tokenized_sentences(text, sentence_rep='list', token_rep='no_spaces', process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
-        with out_name.open(mode='w') as prepro_article:
-            for line in text:
-                prepro_article.write(' '.join(line).rstrip() + '\n')
+    writer = BackgroundWriter(0 if stream else queue_depth)
+    try:
+        for archive, out_dir in archive_list:
+            created = set()
+            for (path, _), text in prefetch(archives.iter_members(archive, '.txt'), _read_member, queue_depth):
+                out_name = None if shards is not None else archives.member_out_name(out_dir, path, '.prepro.txt', created)
+                # iter_tokenized_sentences reads from a file, the member was already read completely
+                article = io.StringIO(text) if stream else text
+                _preprocess_article(article, '{}/{}'.format(archive, path), out_name, writer, process_unicode, replace_math, correct, corr_cite, stream, cache, shards)
+            if manifest is not None:
+                writer.submit(manifest.record_written, [archive, out_dir], None, shards)
+    finally:
+        writer.close()
+    if shards is not None:
+        shards.finish()
 
-def preprocess_articles_parallel_wrapper(file_list, n_cores, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+def preprocess_articles_parallel_wrapper(file_list, n_cores, process_unicode=True, replace_math=True, correct=True, corr_cite=True, stream=False, manifest=None, cache=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Parallel wrapper for preprocess_articles
 
     Args:
@@ -139,8 +567,30 @@ def preprocess_articles_parallel_wrapper(file_list, n_cores, process_unicode=Tru
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
+        stream (bool, optional): see preprocess_articles. Defaults to False.
+        manifest (Manifest, optional): see preprocess_articles. Defaults to None.
+        cache (ParagraphCache, optional): see preprocess_articles, shared by all processes. Defaults to None.
+        shards (ShardWriter, optional): see preprocess_articles, every process writes its own shards. Defaults to None.
+        queue_depth (int, optional): see preprocess_articles, per process. Defaults to prefetch.QUEUE_DEPTH.
+    """
+    fct_to_execute = partial(preprocess_articles, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite, stream=stream, manifest=manifest, cache=cache, shards=shards, queue_depth=queue_depth)
+    run_parallel(fct_to_execute, file_list, n_cores)
+
+def preprocess_archives_parallel_wrapper(archive_list, n_cores, process_unicode=True, replace_math=True, correct=True, corr_cite=True, stream=False, manifest=None, cache=None, shards=None, queue_depth=QUEUE_DEPTH):
+    """Parallel wrapper for preprocess_archives, every archive is processed by a single process
+
+    Args:
+        archive_list ([archive, output directory]): see preprocess_archives
+        n_cores (int): number of python processes to use (multiprocessing package)
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+        stream (bool, optional): see preprocess_articles. Defaults to False.
+        manifest (Manifest, optional): see preprocess_archives. Defaults to None.
+        cache (ParagraphCache, optional): see preprocess_articles, shared by all processes. Defaults to None.
+        shards (ShardWriter, optional): see preprocess_articles, every process writes its own shards. Defaults to None.
+        queue_depth (int, optional): see preprocess_articles, per process. Defaults to prefetch.QUEUE_DEPTH.
     """
-    list_segments = chunk_list(file_list, n_cores)
-    fct_to_execute = partial(preprocess_articles, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
-    with Pool(n_cores) as p:
-        p.map(fct_to_execute, list_segments)
+    fct_to_execute = partial(preprocess_archives, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite, stream=stream, manifest=manifest, cache=cache, shards=shards, queue_depth=queue_depth)
+    run_parallel(fct_to_execute, archive_list, n_cores)
@@ -0,0 +1,295 @@
+"""Compact binary format of preprocessed corpora with random access to sentences and documents.
+
+A corpus is a directory with flat little endian arrays and JSON files:
+    token_ids.bin          int32 vocabulary id of every token, all sentences one after another
+    label_ids.bin          int32 label id of every token (only for BIO corpora)
+    sentence_offsets.bin   int64, sentence i is token_ids[sentence_offsets[i]:sentence_offsets[i+1]]
+    document_offsets.bin   int64, document j consists of the sentences document_offsets[j] to document_offsets[j+1]
+    vocabulary.json        token string of every id, labels.json label string of every id
+    documents.json         key of every document (e.g. its input file)
+    meta.json              format version and counts
+The arrays are memory mapped by BinaryCorpus, with numpy.memmap if NumPy is installed, so a sentence or document is
+read without loading the corpus into memory.
+"""
+
+import sys
+import mmap
+import json
+from array import array
+from pathlib import Path
+
+from articlenizer import __version__
+from articlenizer.util import Vocabulary
+from articlenizer.shards import iter_shards, shard_paths
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+FORMAT_VERSION = 1
+OUTPUT_SUFFIXES = {
+    'prepro': '.prepro.txt',
+    'bio': '.data.txt'
+}
+ARRAYS = {
+    'token_ids': 'i',
+    'label_ids': 'i',
+    'sentence_offsets': 'q',
+    'document_offsets': 'q'
+}
+NUMPY_TYPES = {
+    'i': '<i4',
+    'q': '<i8'
+}
+
+def _append(out_file, typecode, values):
+    """Write values as little endian array"""
+    values = array(typecode, values)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    values.tofile(out_file)
+
+class BinaryCorpusWriter():
+    """Writes documents of tokenized sentences (and their BIO labels) to a binary corpus directory.
+    """
+    def __init__(self, out_path, with_labels=False, vocabulary=None, labels=None):
+        """Create a corpus, existing corpus files in out_path are replaced
+
+        Args:
+            out_path (string or PosixPath): corpus directory, created if it does not exist
+            with_labels (bool, optional): store a label for every token. Defaults to False.
+            vocabulary (Vocabulary, optional): vocabulary to extend, e.g. of another corpus to get consistent ids. Defaults to None (new vocabulary).
+            labels (Vocabulary, optional): label vocabulary to extend. Defaults to None (new vocabulary).
+        """
+        self.out_path = Path(out_path)
+        self.out_path.mkdir(parents=True, exist_ok=True)
+        self.with_labels = with_labels
+        self.vocabulary = Vocabulary() if vocabulary is None else vocabulary
+        self.labels = Vocabulary() if labels is None else labels
+        self.keys = []
+        self.n_tokens = 0
+        self.n_sentences = 0
+        self._files = {}
+        for name in ARRAYS:
+            if name != 'label_ids' or with_labels:
+                self._files[name] = (self.out_path / (name + '.bin')).open(mode='wb')
+        _append(self._files['sentence_offsets'], 'q', [0])
+        _append(self._files['document_offsets'], 'q', [0])
+
+    def add_document(self, key, sentences, labels=None):
+        """Append a document
+
+        Args:
+            key (string): key of the document (e.g. the input path)
+            sentences (list of lists): tokens of each sentence (e.g. the result of get_tokenized_sentences)
+            labels (list of lists, optional): label of each token, required if the corpus has labels. Defaults to None.
+        """
+        if self.with_labels and labels is None:
+            raise(RuntimeError("Document {} has no labels.".format(key)))
+        offsets = []
+        for idx, sentence in enumerate(sentences):
+            _append(self._files['token_ids'], 'i', self.vocabulary.intern(sentence))
+            if self.with_labels:
+                if len(labels[idx]) != len(sentence):
+                    raise(RuntimeError("Sentence {} of document {} has {} tokens but {} labels.".format(idx, key, len(sentence), len(labels[idx]))))
+                _append(self._files['label_ids'], 'i', self.labels.intern(labels[idx]))
+            self.n_tokens += len(sentence)
+            offsets.append(self.n_tokens)
+        _append(self._files['sentence_offsets'], 'q', offsets)
+        self.n_sentences += len(offsets)
+        _append(self._files['document_offsets'], 'q', [self.n_sentences])
+        self.keys.append(key)
+
+    def close(self):
+        """Write vocabularies, document keys and meta data, the corpus can be read afterwards
+        """
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        with (self.out_path / 'vocabulary.json').open(mode='w') as f:
+            json.dump(self.vocabulary.tokens, f, ensure_ascii=False)
+        if self.with_labels:
+            with (self.out_path / 'labels.json').open(mode='w') as f:
+                json.dump(self.labels.tokens, f, ensure_ascii=False)
+        with (self.out_path / 'documents.json').open(mode='w') as f:
+            json.dump(self.keys, f, ensure_ascii=False)
+        with (self.out_path / 'meta.json').open(mode='w') as f:
+            json.dump({
+                'format': FORMAT_VERSION,
+                'version': __version__,
+                'with_labels': self.with_labels,
+                'n_documents': len(self.keys),
+                'n_sentences': self.n_sentences,
+                'n_tokens': self.n_tokens
+            }, f)
+
+def _map_array(path, typecode):
+    """Read only memory map of a little endian array file, numpy.memmap if NumPy is installed, otherwise a memoryview"""
+    if numpy is not None:
+        if path.stat().st_size == 0:
+            return numpy.zeros(0, dtype=NUMPY_TYPES[typecode])
+        return numpy.memmap(path, dtype=NUMPY_TYPES[typecode], mode='r')
+    if sys.byteorder == 'big':
+        raise(RuntimeError("Reading binary corpora on big endian systems requires NumPy."))
+    if path.stat().st_size == 0:
+        return memoryview(array(typecode))
+    with path.open(mode='rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
+
+class BinaryCorpus():
+    """Memory mapped binary corpus (see BinaryCorpusWriter), documents are indexed by position.
+    """
+    def __init__(self, path):
+        """Open a corpus
+
+        Args:
+            path (string or PosixPath): corpus directory
+        """
+        self.path = Path(path)
+        with (self.path / 'meta.json').open(mode='r') as f:
+            self.meta = json.load(f)
+        if self.meta['format'] != FORMAT_VERSION:
+            raise(RuntimeError("Unsupported binary corpus format: {}".format(self.meta['format'])))
+        with (self.path / 'vocabulary.json').open(mode='r') as f:
+            self.vocabulary = Vocabulary(json.load(f))
+        self.labels = None
+        if self.meta['with_labels']:
+            with (self.path / 'labels.json').open(mode='r') as f:
+                self.labels = Vocabulary(json.load(f))
+        with (self.path / 'documents.json').open(mode='r') as f:
+            self.keys = json.load(f)
+        for name, typecode in ARRAYS.items():
+            if name != 'label_ids' or self.meta['with_labels']:
+                setattr(self, name, _map_array(self.path / (name + '.bin'), typecode))
+
+    def __len__(self):
+        return self.meta['n_documents']
+
+    @property
+    def n_sentences(self):
+        return self.meta['n_sentences']
+
+    def sentence_ids(self, idx):
+        """Token ids of a sentence
+
+        Args:
+            idx (int): sentence index in the corpus
+
+        Returns:
+            array: int32 ids, a view on the memory map
+        """
+        return self.token_ids[self.sentence_offsets[idx]:self.sentence_offsets[idx + 1]]
+
+    def sentence_label_ids(self, idx):
+        """Label ids of a sentence
+
+        Args:
+            idx (int): sentence index in the corpus
+
+        Returns:
+            array: int32 ids, a view on the memory map
+        """
+        if self.labels is None:
+            raise(RuntimeError("Corpus has no labels."))
+        return self.label_ids[self.sentence_offsets[idx]:self.sentence_offsets[idx + 1]]
+
+    def sentence(self, idx):
+        """Tokens of a sentence
+
+        Args:
+            idx (int): sentence index in the corpus
+
+        Returns:
+            list: token strings
+        """
+        return [self.vocabulary[int(i)] for i in self.sentence_ids(idx)]
+
+    def sentence_labels(self, idx):
+        """Labels of a sentence
+
+        Args:
+            idx (int): sentence index in the corpus
+
+        Returns:
+            list: label strings
+        """
+        return [self.labels[int(i)] for i in self.sentence_label_ids(idx)]
+
+    def document_sentences(self, idx):
+        """Sentence indices of a document
+
+        Args:
+            idx (int): document index
+
+        Returns:
+            range: indices of its sentences in the corpus
+        """
+        return range(int(self.document_offsets[idx]), int(self.document_offsets[idx + 1]))
+
+    def document(self, idx):
+        """Tokens of the sentences of a document
+
+        Args:
+            idx (int): document index
+
+        Returns:
+            list of lists: token strings of each sentence
+        """
+        return [self.sentence(s) for s in self.document_sentences(idx)]
+
+    def document_labels(self, idx):
+        """Labels of the sentences of a document
+
+        Args:
+            idx (int): document index
+
+        Returns:
+            list of lists: label strings of each sentence
+        """
+        return [self.sentence_labels(s) for s in self.document_sentences(idx)]
+
+def split_line(line):
+    """Tokens of a line of a .prepro.txt, .data.txt or .labels.txt output (tokens joined by single spaces)
+
+    Args:
+        line (string): output line without line break
+
+    Returns:
+        list: tokens
+    """
+    return [t for t in line.split(' ') if t]
+
+def _read_lines(path):
+    with path.open(mode='r') as f:
+        return [split_line(line.rstrip('\n')) for line in f]
+
+def output_documents(path, output_format='prepro'):
+    """Documents written by bin/articlenize_prepro or bin/brat_to_bio, output files sorted by name, shards in the order
+    of their records (the last record of every key, see shards.iter_shards).
+
+    Args:
+        path (string or PosixPath): output directory of the tool
+        output_format (str, optional): 'prepro' for preprocessed articles or 'bio' for BIO data and labels. Defaults to 'prepro'.
+
+    Yields:
+        string, list of lists, list of lists: key, tokens of each sentence and labels of each token (None for 'prepro')
+    """
+    if output_format not in OUTPUT_SUFFIXES:
+        raise(RuntimeError("Unknown output format: {}".format(output_format)))
+    path = Path(path)
+    if shard_paths(path, prefix=output_format):
+        for record in iter_shards(path, prefix=output_format):
+            if output_format == 'prepro':
+                yield record['key'], [split_line(line) for line in record['sentences']], None
+            else:
+                yield record['key'], [split_line(line) for line in record['data']], [split_line(line) for line in record['labels']]
+        return
+    suffix = OUTPUT_SUFFIXES[output_format]
+    for out_name in sorted(path.rglob('*' + suffix)):
+        key = str(out_name.relative_to(path))[:-len(suffix)]
+        if output_format == 'prepro':
+            yield key, _read_lines(out_name), None
+        else:
+            yield key, _read_lines(out_name), _read_lines(Path(str(out_name)[:-len(suffix)] + '.labels.txt'))
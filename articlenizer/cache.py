@@ -0,0 +1,147 @@
+"""On-disk cache of preprocessed paragraphs, shared by all processes that use the same file.
+
+Values are stored in a SQLite database under a content hash of the paragraph and the preprocessing configuration.
+Every lookup marks the entry as used, when the stored values exceed max_bytes the least recently used entries are
+removed until the cache is filled to EVICTION_TARGET. Each process opens its own connection, the database is
+in WAL mode so that readers and a writer do not block each other.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+
+from articlenizer import __version__
+
+EVICTION_TARGET = 0.9 # share of max_bytes that is kept when entries are evicted
+MAX_VARIABLES = 500 # keys per query, below the SQLite limit of bound variables
+
+def cache_key(text, config):
+    """Content hash of a text and the configuration it is processed with
+
+    Args:
+        text (string): text
+        config (list): JSON serializable configuration (e.g. preprocessing flags)
+
+    Returns:
+        bytes: 16 byte digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([__version__] + list(config)).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+class ParagraphCache():
+    """Size bounded LRU store of JSON serializable values in a SQLite file.
+    """
+    def __init__(self, path, max_bytes=1 << 30):
+        """Open or create a cache
+
+        Args:
+            path (string or PosixPath): database file
+            max_bytes (int, optional): size of the stored values at which the least recently used entries are evicted. Defaults to 1 GiB.
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+
+    def __getstate__(self):
+        # connections cannot be shared between processes, every process opens its own
+        state = dict(self.__dict__)
+        state['_connection'] = None
+        state['_pid'] = None
+        return state
+
+    def _connect(self):
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=60)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value BLOB, size INTEGER, used REAL)')
+                connection.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+                connection.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)')
+                connection.execute("INSERT OR IGNORE INTO meta VALUES ('size', 0)")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get_many(self, keys):
+        """Look up values and mark them as used
+
+        Args:
+            keys (list): keys (see cache_key)
+
+        Returns:
+            dictionary: value for each key that is in the cache
+        """
+        connection = self._connect()
+        keys = list(set(keys))
+        found = {}
+        for idx in range(0, len(keys), MAX_VARIABLES):
+            batch = keys[idx:idx + MAX_VARIABLES]
+            query = 'SELECT key, value FROM entries WHERE key IN ({})'.format(','.join('?' * len(batch)))
+            for key, value in connection.execute(query, batch):
+                found[key] = json.loads(value)
+        if found:
+            now = time.time()
+            with connection:
+                connection.executemany('UPDATE entries SET used = ? WHERE key = ?', [(now, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Store values, evicts the least recently used entries if the cache is full
+
+        Args:
+            items (dictionary): value for each key
+        """
+        if not items:
+            return
+        connection = self._connect()
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            value = json.dumps(value, ensure_ascii=False).encode('utf-8')
+            rows.append((key, value, len(value), now))
+        with connection:
+            replaced = 0
+            keys = [row[0] for row in rows]
+            for idx in range(0, len(keys), MAX_VARIABLES):
+                batch = keys[idx:idx + MAX_VARIABLES]
+                query = 'SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN ({})'.format(','.join('?' * len(batch)))
+                replaced += connection.execute(query, batch).fetchone()[0]
+            connection.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', rows)
+            connection.execute("UPDATE meta SET value = value + ? WHERE name = 'size'", (sum(row[2] for row in rows) - replaced,))
+            size = connection.execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+            if size > self.max_bytes:
+                self._evict(connection, size)
+
+    def _evict(self, connection, size):
+        """Remove the least recently used entries until the stored values fit in EVICTION_TARGET of max_bytes"""
+        excess = size - EVICTION_TARGET * self.max_bytes
+        removed = []
+        for key, entry_size in connection.execute('SELECT key, size FROM entries ORDER BY used'):
+            if excess <= 0:
+                break
+            removed.append((key,))
+            excess -= entry_size
+        connection.executemany('DELETE FROM entries WHERE key = ?', removed)
+        connection.execute("UPDATE meta SET value = (SELECT COALESCE(SUM(size), 0) FROM entries) WHERE name = 'size'")
+
+    def size(self):
+        """Bytes of the stored values
+
+        Returns:
+            int: size of all values
+        """
+        return self._connect().execute("SELECT value FROM meta WHERE name = 'size'").fetchone()[0]
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
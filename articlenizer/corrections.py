@@ -1,89 +1,137 @@
-import re
 import unicodedata
 
-from articlenizer import ABBREVIATIONS
-from articlenizer.util import apply_regex_list
+from bisect import bisect_left
+
+from articlenizer import regex_engine
+from articlenizer.abbreviations import ABBREVIATION_MATCHER
+from articlenizer.util import apply_guarded_regex_list
 from articlenizer.sentenize import _boundary_gen
 
 CORRECTION_REGEX = []
 
 # )word -> ) word and word;word -> word; word
-CORRECTION_REGEX.append((re.compile(r'(?P<bracket>[\)\]])(?P<text>[A-Za-z]{2,})'), r'\g<bracket> \g<text>')) 
-CORRECTION_REGEX.append((re.compile(r'(?P<text>\s[A-Za-z]{3,})(?P<bracket>[\(\[])'), r'\g<text> \g<bracket>')) 
-CORRECTION_REGEX.append((re.compile(r'(?P<text>,)(?P<bracket>[\(\[])'), r'\g<text> \g<bracket>')) 
-CORRECTION_REGEX.append((re.compile(r'(?P<semi_colon>[^\s]+;)(?P<any>[^\s])'), r'\g<semi_colon> \g<any>'))
+CORRECTION_REGEX.append((regex_engine.compile(r'(?P<bracket>[\)\]])(?P<text>[A-Za-z]{2,})'), r'\g<bracket> \g<text>')) 
+CORRECTION_REGEX.append((regex_engine.compile(r'(?P<text>\s[A-Za-z]{3,})(?P<bracket>[\(\[])'), r'\g<text> \g<bracket>')) 
+CORRECTION_REGEX.append((regex_engine.compile(r'(?P<text>,)(?P<bracket>[\(\[])'), r'\g<text> \g<bracket>')) 
+CORRECTION_REGEX.append((regex_engine.compile(r'(?P<semi_colon>[^\s]+;)(?P<any>[^\s])'), r'\g<semi_colon> \g<any>'))
+
+# trigger literals of each rule (see util.apply_guarded_regex_list)
+CORRECTION_TRIGGERS = [
+    [')', ']'],
+    ['(', '['],
+    [',(', ',['],
+    [';']
+]
 
-MATH_EXPRESSION = re.compile(r'[^\s]+[^\.\!\?,;\s]\s') 
+# insertion positions of all CORRECTION_REGEX rules in the uncorrected string (match end), a space inserted by the first rule is covered by [\)\]] in the second
+CORRECTION_RULES = ['close_bracket', 'open_bracket', 'comma', 'semi_colon']
+CORRECTION_POSITIONS = regex_engine.compile(r'(?P<close_bracket>[\)\]](?=[A-Za-z]{2}))|(?P<open_bracket>(?<=[\s\)\]])[A-Za-z]{3,}(?=[\(\[]))|(?P<comma>,(?=[\(\[]))|(?P<semi_colon>(?<=\S);(?=\S))')
+WHITESPACE = regex_engine.compile(r'\s')
+
+MATH_EXPRESSION = regex_engine.compile(r'[^\s]+[^\.\!\?,;\s]\s') 
 # word;word -> word; word
 
 BASE_MATH_CHARS = ['+', '-', '/', '*']
 
-WRONG_CITATION = re.compile(r'[^\]](?P<dot>[\.,])(?P<middle> ?)(?P<citation>\[[0-9\-,\?]+\])(?P<end>$|[^\.])')
+WRONG_CITATION = regex_engine.compile(r'[^\]](?P<dot>[\.,])(?P<middle> ?)(?P<citation>\[[0-9\-,\?]+\])(?P<end>$|[^\.])')
+
+abbr = ABBREVIATION_MATCHER.regex
+
+class _MathCharClasses(dict):
+    """Translation table from characters to their class for formula detection: 
+    'd' digit, 'a' alpha, 'b' base math char, 'm' math symbol, 'g' greek (non-alpha), 'o' opening bracket, 'c' closing bracket, 'u' unmatched. 
+    Classes for the ASCII and greek block are precomputed, everything else is filled in lazily.
+    """
+    def __init__(self, precomputed_block=0x0400):
+        super().__init__()
+        for code in range(precomputed_block):
+            self.__missing__(code)
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char.isdigit():
+            char_class = 'd'
+        elif char.isalpha():
+            char_class = 'a'
+        elif char in BASE_MATH_CHARS:
+            char_class = 'b'
+        elif unicodedata.category(char) == 'Sm':
+            char_class = 'm'
+        elif ( code >= 945 and code <= 970 ) or ( code >= 913 and code <= 938 ):
+            char_class = 'g'
+        elif char in ['(', '{']:
+            char_class = 'o'
+        elif char in [')', '}']:
+            char_class = 'c'
+        else:
+            char_class = 'u'
+        self[code] = char_class
+        return char_class
+
+MATH_CHAR_CLASSES = _MathCharClasses()
+
+def _is_math_expr(cs):
+    """Decide whether a candidate string is a formula.
+
+    Args:
+        cs (string): candidate string
+
+    Returns:
+        bool: whether the string should be replaced
+    """
+    if '°' in cs or '×' in cs:
+        return False
+
+    classes = cs.translate(MATH_CHAR_CLASSES)
+    math_chars = classes.count('m')
+    if not ( ( math_chars >= 2 and classes.count('a') >= 1 ) or ( math_chars >= 1 and classes.count('g') >= 1 ) ):
+        return False
 
-abbr = re.compile(r'|'.join(ABBREVIATIONS))
+    # brackets have to be opened before they are closed (from the left) and closed after they are opened (from the right)
+    first_open, first_close = classes.find('o'), classes.find('c')
+    left_error = first_close >= 0 and ( first_open < 0 or first_close < first_open )
+    right_error = classes.rfind('o') > classes.rfind('c')
+    return not left_error and not right_error
 
 def remove_math_expr(s):
     """Replace mathematical formulas by the placeholder 'formtok'.
     A (restrictive) heuristic is used in order to determine what counts as a formula. 
+    Only the checked positions are replaced and the output is build in a single pass. 
 
     Args:
         s (string): string to transform
 
     Returns:
         string: transformed string
+        list: [string, replacement, start, end] for each replacement in reversed order, offsets refer to the input string
     """
-    potential_tokens = [o for o in _boundary_gen(s, MATH_EXPRESSION)]
     list_to_replace = []
-    for o in potential_tokens:
-        cs = s[o[0]:o[1]]
-        if '°' in cs or '×' in cs:
-            continue
-
-        alphas = 0
-        digits = 0
-        unmatched = 0
-        math_chars = 0 
-        greek_letters = 0
-        for char in cs:
-            if char.isdigit():
-                digits += 1
-            elif char.isalpha():
-                alphas += 1
-            elif char in BASE_MATH_CHARS:
-                pass
-            elif unicodedata.category(char) == 'Sm':
-                math_chars += 1
-            elif ( ord(char) >= 945 and ord(char) <= 970 ) or ( ord(char) >= 913 and ord(char) <= 938 ):
-                greek_letters += 1
-            else:
-                unmatched += 1
-
-        if ( math_chars >= 2 and alphas >= 1 ) or ( math_chars >= 1 and greek_letters >= 1 ):
-            matched = True
-            left_error = False
-            left_break = False
-            right_error = False
-            right_break = False
-            for i in range(len(cs)):
-                left = cs[i]
-                if left in ['(', '{']:
-                    left_break = True
-                elif left in [')', '}'] and not left_break:
-                    left_error = True
-
-                right = cs[-(i+1)]
-                if right in ['}', ')']:
-                    right_break = True
-                elif right in ['(', '{'] and not right_break:
-                    right_error = True
-
-            if not left_error and not right_error:
-                list_to_replace.append([cs, 'formtok ', o[0], o[1]])
-    
-    for replacement in list_to_replace:
-        s = s.replace(replacement[0], replacement[1])
+    out_s = []
+    last = 0
+    for start, end in _boundary_gen(s, MATH_EXPRESSION):
+        cs = s[start:end]
+        if _is_math_expr(cs):
+            out_s.append(s[last:start])
+            out_s.append('formtok ')
+            last = end
+            list_to_replace.append([cs, 'formtok ', start, end])
+    out_s.append(s[last:])
+    list_to_replace.reverse()
         
-    return s, reversed(list_to_replace)
+    return ''.join(out_s), list_to_replace
+
+def remove_math_expr_with_edits(s):
+    """Replace mathematical formulas as remove_math_expr and report the changes as edits (see document.Document)
+
+    Args:
+        s (string): string to transform
+
+    Returns:
+        string: transformed string
+        list: edits (start, end, 'formtok ') from the beginning to the end of the string
+    """
+    s, list_to_replace = remove_math_expr(s)
+    return s, [(start, end, replacement) for _, replacement, start, end in reversed(list_to_replace)]
 
 def correct(s):
     """Correct a string
@@ -94,12 +142,42 @@ def correct(s):
     Returns:
         string: corrected string
     """
-    s = apply_regex_list(s, CORRECTION_REGEX)
+    s = apply_guarded_regex_list(s, CORRECTION_REGEX, CORRECTION_TRIGGERS, 'correction')
 
     return s
 
+def _correction_positions(s):
+    """Positions in s at which CORRECTION_REGEX inserts a space, see correct_with_index
+
+    Args:
+        s (string): string to correct
+
+    Returns:
+        list: for each rule the positions in s
+    """
+    rule_positions = [[], [], [], []]
+    pending_semicolon = None
+    for match in CORRECTION_POSITIONS.finditer(s):
+        rule = match.lastgroup
+        if rule == 'semi_colon':
+            # only the last semi-colon within a run of non-whitespace characters is corrected in one pass of the rule
+            if pending_semicolon is not None and WHITESPACE.search(s, pending_semicolon, match.start()) is not None:
+                rule_positions[3].append(pending_semicolon)
+            pending_semicolon = match.end()
+        else:
+            # all other insertions split a run of non-whitespace characters
+            if pending_semicolon is not None:
+                rule_positions[3].append(pending_semicolon)
+                pending_semicolon = None
+            rule_positions[CORRECTION_RULES.index(rule)].append(match.end())
+    if pending_semicolon is not None:
+        rule_positions[3].append(pending_semicolon)
+    return rule_positions
+
 def correct_with_index(s):
-    """Correct a string but remember at what position a change is made
+    """Correct a string but remember at what position a change is made.
+    All insertions of CORRECTION_REGEX are collected in a single scan (CORRECTION_POSITIONS) and applied at once. 
+    The result is the same as applying the rules one after another. 
 
     Args:
         s (string): string to correct
@@ -107,35 +185,84 @@ def correct_with_index(s):
     Returns:
         string, positions: corrected string
     """
+    rule_positions = _correction_positions(s)
+
+    # indices are reported with respect to the string at the time the corresponding rule is applied
     indices = []
-    for r, t in CORRECTION_REGEX:
-        regex_matches = r.finditer(s)
-        for match in reversed(list(regex_matches)):
-            ind = match.span(2)[0]
-            s = s[:ind] + ' ' + s[ind:]
-            indices.append(ind-1)
-    return s, reversed(indices)
+    previous_positions = []
+    for positions in rule_positions:
+        indices.append([pos + bisect_left(previous_positions, pos) - 1 for pos in positions])
+        previous_positions = sorted(previous_positions + positions)
+
+    out_s = []
+    last = 0
+    for pos in previous_positions:
+        out_s.append(s[last:pos])
+        last = pos
+    out_s.append(s[last:])
+
+    return ' '.join(out_s), [ind for rule_indices in reversed(indices) for ind in rule_indices]
+
+def correct_with_edits(s):
+    """Correct a string as correct_with_index and report the changes as edits (see document.Document)
+
+    Args:
+        s (string): string to correct
+
+    Returns:
+        string: corrected string
+        list: edits (position, position, ' ') for each inserted space
+    """
+    positions = sorted(pos for rule_positions in _correction_positions(s) for pos in rule_positions)
+    out_s = []
+    last = 0
+    for pos in positions:
+        out_s.append(s[last:pos])
+        last = pos
+    out_s.append(s[last:])
+    return ' '.join(out_s), [(pos, pos, ' ') for pos in positions]
 
 def correct_citations(s):
     """Correct citations of the form ... as in. [5] -> ... as in [5].
+    Switches are collected on the input string and the output is build once. Citations are not moved if the dot ends an abbreviation, e.g. "et al. [5]". 
 
     Args:
         s (string): plain article string
 
     Returns:
         string: transformed string
+        list: switched spans [(dot_beg, dot_end), (citation_beg, citation_end)], the length of the string is not changed by switching
     """
     switches = []
-    matches = WRONG_CITATION.finditer(s)
-    for match in matches:
-        indices = match.span(0)
-        left_context = ''
-        if indices[0] > 4:
-            left_context = s[indices[0]-5:indices[0]+2]
-        if left_context and abbr.search(left_context):
-            pass
-        else:
-            s = s[:match.span("dot")[0]] + match.group("middle") + match.group("citation")+ match.group("dot") + match.group("end") + s[match.span("end")[1]:]
-            switches.append([match.span("dot"), (match.span("middle")[0], match.span("citation")[1])])
+    out_s = []
+    last = 0
+    for match in WRONG_CITATION.finditer(s):
+        if match.start() > 4 and ABBREVIATION_MATCHER.ends_at(s, match.end('dot'), match.start() - 5):
+            continue
+        out_s.append(s[last:match.start('dot')])
+        out_s.append(match.group('middle'))
+        out_s.append(match.group('citation'))
+        out_s.append(match.group('dot'))
+        last = match.end('citation')
+        switches.append([match.span('dot'), (match.start('middle'), match.end('citation'))])
+    out_s.append(s[last:])
             
-    return s, switches
\ No newline at end of file
+    return ''.join(out_s), switches
+
+def correct_citations_with_edits(s):
+    """Correct citations as correct_citations and report the changes as edits (see document.Document).
+    Moving the dot behind the citation is reported as removing it and inserting it again.
+
+    Args:
+        s (string): plain article string
+
+    Returns:
+        string: transformed string
+        list: edits (dot_beg, dot_end, '') and (citation_end, citation_end, dot) for each switch
+    """
+    out_s, switches = correct_citations(s)
+    edits = []
+    for (dot_beg, dot_end), (_, citation_end) in switches:
+        edits.append((dot_beg, dot_end, ''))
+        edits.append((citation_end, citation_end, s[dot_beg:dot_end]))
+    return out_s, edits
@@ -0,0 +1,207 @@
+"""Alignment between a raw text and its preprocessed version.
+
+Every preprocessing stage reports its changes as a sorted list of edits (beg, end, replacement), with offsets
+referring to the text before the stage. A Document composes the edits of all stages into a single alignment:
+the runs of characters that were copied unchanged from the raw to the processed text. Offsets are projected
+between both texts by a binary search over the runs, no matter how many edits were made.
+
+An offset inside a replaced segment is moved to the border of the replacement, so a span that overlaps
+a replacement covers all of it. Text inserted directly before or after a span is not added to the span.
+Substitutions that keep the length of the text (e.g. a space that becomes a newline) do not move any offsets and
+do not have to be reported.
+"""
+
+from bisect import bisect_left, bisect_right
+
+def edits_to_runs(edits, length):
+    """Unchanged runs between sorted edits
+
+    Args:
+        edits (list): sorted, non overlapping edits (beg, end, replacement)
+        length (int): length of the text the edits refer to
+
+    Returns:
+        list: runs (source beg, target beg, length)
+    """
+    runs = []
+    source = 0
+    shift = 0
+    for beg, end, replacement in edits:
+        if beg < source or end < beg:
+            raise(RuntimeError("Edits are not sorted or overlap at {}-{}.".format(beg, end)))
+        if beg > source:
+            runs.append((source, source + shift, beg - source))
+        source = end
+        shift += len(replacement) - (end - beg)
+    if length > source:
+        runs.append((source, source + shift, length - source))
+    return runs
+
+def compose_runs(first, second):
+    """Compose two alignments, the target of the first one is the source of the second one
+
+    Args:
+        first (list): runs (source beg, target beg, length)
+        second (list): runs (source beg, target beg, length)
+
+    Returns:
+        list: runs from the source of first to the target of second
+    """
+    runs = []
+    idx = 0
+    for source, target, length in first:
+        while idx < len(second) and second[idx][0] + second[idx][2] <= target:
+            idx += 1
+        jdx = idx
+        while jdx < len(second) and second[jdx][0] < target + length:
+            inner_source, inner_target, inner_length = second[jdx]
+            beg = max(target, inner_source)
+            end = min(target + length, inner_source + inner_length)
+            if end > beg:
+                run = (source + beg - target, inner_target + beg - inner_source, end - beg)
+                if runs and runs[-1][0] + runs[-1][2] == run[0] and runs[-1][1] + runs[-1][2] == run[1]:
+                    run = (runs[-1][0], runs[-1][1], runs[-1][2] + run[2])
+                    runs[-1] = run
+                else:
+                    runs.append(run)
+            jdx += 1
+    return runs
+
+def _project(offsets, begs, others, lengths, total, end):
+    """Project offsets over runs sorted by begs, see Document.forward"""
+    projected = []
+    for offset in offsets:
+        if end:
+            idx = bisect_left(begs, offset) - 1
+            if idx < 0:
+                projected.append(0 if offset <= 0 else others[0] if others else total)
+            elif offset <= begs[idx] + lengths[idx]:
+                projected.append(others[idx] + offset - begs[idx])
+            else:
+                projected.append(others[idx + 1] if idx + 1 < len(begs) else total)
+        else:
+            idx = bisect_right(begs, offset) - 1
+            if idx >= 0 and offset < begs[idx] + lengths[idx]:
+                projected.append(others[idx] + offset - begs[idx])
+            elif idx >= 0:
+                projected.append(others[idx] + lengths[idx])
+            else:
+                projected.append(0)
+    return projected
+
+class Document():
+    """A raw text, its current processed version and the alignment of both.
+    """
+    def __init__(self, text):
+        self.raw = text
+        self.text = text
+        self.stages = []
+        self.runs = [(0, 0, len(text))] if text else []
+        self._index = None
+
+    def apply(self, name, fct, *args):
+        """Run a preprocessing stage on the current text
+
+        Args:
+            name (string): name of the stage
+            fct (function): stage, called with the current text and args, returns the processed text and its edits (see Document.edit)
+
+        Returns:
+            Document: self
+        """
+        text, edits = fct(self.text, *args)
+        return self.edit(name, text, edits)
+
+    def edit(self, name, text, edits):
+        """Replace the current text and add the edits that lead to it to the alignment
+
+        Args:
+            name (string): name of the stage
+            text (string): new text
+            edits (list): sorted, non overlapping edits (beg, end, replacement) with offsets in the current text
+
+        Returns:
+            Document: self
+        """
+        runs = edits_to_runs(edits, len(self.text))
+        expected = len(self.text) + sum(len(replacement) - (end - beg) for beg, end, replacement in edits)
+        if expected != len(text):
+            raise(RuntimeError("Edits of stage {} do not match the length of its output: {} != {}.".format(name, expected, len(text))))
+        self.runs = compose_runs(self.runs, runs)
+        self._index = None
+        self.text = text
+        self.stages.append(name)
+        return self
+
+    def edit_log(self):
+        """All changes from the raw to the current text
+
+        Returns:
+            list: sorted edits (beg, end, replacement) with offsets in the raw text
+        """
+        edits = []
+        source = 0
+        target = 0
+        for run_source, run_target, length in self.runs + [(len(self.raw), len(self.text), 0)]:
+            if run_source > source or run_target > target:
+                edits.append((source, run_source, self.text[target:run_target]))
+            source = run_source + length
+            target = run_target + length
+        return edits
+
+    def _run_index(self):
+        if self._index is None:
+            self._index = tuple([r[i] for r in self.runs] for i in range(3))
+        return self._index
+
+    def forward(self, offsets, end=False):
+        """Project offsets in the raw text to the current text
+
+        Args:
+            offsets (iterable): offsets in the raw text
+            end (bool, optional): whether the offsets end spans (exclusive) or start them. Defaults to False.
+
+        Returns:
+            list: offsets in the current text
+        """
+        sources, targets, lengths = self._run_index()
+        return _project(offsets, sources, targets, lengths, len(self.text), end)
+
+    def backward(self, offsets, end=False):
+        """Project offsets in the current text to the raw text
+
+        Args:
+            offsets (iterable): offsets in the current text
+            end (bool, optional): whether the offsets end spans (exclusive) or start them. Defaults to False.
+
+        Returns:
+            list: offsets in the raw text
+        """
+        sources, targets, lengths = self._run_index()
+        return _project(offsets, targets, sources, lengths, len(self.raw), end)
+
+    def forward_spans(self, spans):
+        """Project spans in the raw text to the current text
+
+        Args:
+            spans (list): (beg, end) tuples in the raw text
+
+        Returns:
+            list: (beg, end) tuples in the current text
+        """
+        begs = self.forward((s[0] for s in spans))
+        ends = self.forward((s[1] for s in spans), end=True)
+        return [(beg, max(beg, end)) for beg, end in zip(begs, ends)]
+
+    def backward_spans(self, spans):
+        """Project spans in the current text to the raw text
+
+        Args:
+            spans (list): (beg, end) tuples in the current text
+
+        Returns:
+            list: (beg, end) tuples in the raw text
+        """
+        begs = self.backward((s[0] for s in spans))
+        ends = self.backward((s[1] for s in spans), end=True)
+        return [(beg, max(beg, end)) for beg, end in zip(begs, ends)]
@@ -7,109 +7,169 @@ from collections import Counter
 
 from articlenizer import sentenize
 
+# decisions a codepoint can be classified into
+KEEP = 0 # character is written as it is
+MAP = 1 # character is written as a different (normalized) character
+DROP = 2 # character is removed and its position is reported
+SKIP = 3 # character is removed silently and does not advance the position count
+WARN = 4 # same as SKIP, but a warning is printed 
+
+def _classify_codepoint(char):
+    """Decide how a single character is handled by handle_unicode_characters. 
+
+    Args:
+        char (string): single character
+
+    Returns:
+        (int, string): decision and the associated value (output character for KEEP and MAP, dropped character for DROP and WARN)
+    """
+    if re.match(r"[A-Za-z0-9\s]", char) is not None or char in string.punctuation:
+        # keep "normal" chars
+        return KEEP, char
+
+    # 'TradeMarks' are tricky but often used to indicate external equipment in studies
+    if char in ['©', '™', '®']:
+        return (KEEP, char) if char == '™' else (MAP, '™')
+
+    # Temperatures are almost always indicated by °
+    if char == '°':
+        return KEEP, char
+
+    # some unicodes are combined and based on 'normal' characters -> we want to keep the base characters, e.g. á -> a
+    u_map = unicodedata.decomposition(char)
+    if u_map and len(u_map) > 1:
+        split_codes = [code for code in u_map.split() if not re.match(r'<.*>', code)]
+        for code in split_codes:
+            code_char = chr(int(code, 16))
+            if re.match(r'[a-zA-Z]', code_char):
+                return MAP, code_char
+
+    # normalized unicode for everything else just to be save.. 
+    normalized = unicodedata.normalize('NFC', char)
+    if len(normalized) > 1:
+        return WARN, normalized
+
+    # we want to keep basic greek letters no matter what
+    if normalized == 'µ': # yes, they are actually different: this is the 'micro sign'
+        normalized = 'μ' # this the greek letter..
+    if ( ord(normalized) >= 945 and ord(normalized) <= 970 ) or ( ord(normalized) >= 913 and ord(normalized) <= 938 ):
+        return _keep_or_map(char, normalized)
+
+    # the rest is based on unicode categories some of which are considered important and others are not
+    category = unicodedata.category(normalized)
+    if category == 'Pi':
+        if ord(normalized) == 8216 or ord(normalized) == 8219:
+            return _keep_or_map(char, normalized)
+        return _keep_or_map(char, '“')
+    elif category == 'Pf':
+        if ord(normalized) == 8217:
+            return _keep_or_map(char, '’')
+        return _keep_or_map(char, '”')
+    elif category == 'Pd':
+        return _keep_or_map(char, '-')
+    elif category in ['Sc', 'Lu', 'Ll', 'Po', 'Sm']:
+        # Mathsymbols (Sm), TODO: handle them better?
+        return _keep_or_map(char, normalized)
+    elif category in ['Pe', 'Cf', 'Ps', 'So', 'Sk', 'No']:
+        return DROP, normalized
+    elif category == 'Lm':
+        if ord(normalized) >= 697 and ord(normalized) <= 719:
+            return _keep_or_map(char, "'")
+        return SKIP, normalized
+    else:
+        #print("Encountered an unhandled unicode character: {} - DROPPED".format(char))
+        return DROP, normalized
+
+def _keep_or_map(char, out_char):
+    if char == out_char:
+        return KEEP, char
+    return MAP, out_char
+
+class CodepointTable():
+    """Decision table for handle_unicode_characters. 
+    Every distinct codepoint is only classified once: a block of low codepoints is precomputed and everything else is filled in lazily. 
+    """
+    def __init__(self, precomputed_block=0x0250):
+        self.block = [_classify_codepoint(chr(c)) for c in range(precomputed_block)]
+        self.table = {}
+
+    def decide(self, char):
+        """Get the decision for a character
+
+        Args:
+            char (string): single character
+
+        Returns:
+            (int, string): decision and value, see _classify_codepoint
+        """
+        code = ord(char)
+        if code < len(self.block):
+            return self.block[code]
+        decision = self.table.get(char)
+        if decision is None:
+            decision = _classify_codepoint(char)
+            self.table[char] = decision
+        return decision
+
+CODEPOINT_TABLE = CodepointTable()
+
+def _process_unicode_characters(s):
+    """Core of handle_unicode_characters, see there. Additionally returns the edits (index, index + 1, '') of all removed characters.
+    """
+    specials = [c for c in set(s) if CODEPOINT_TABLE.decide(c)[0] != KEEP]
+    if not specials:
+        return s, [], []
+
+    special_chars = re.compile('[{}]'.format(''.join(re.escape(c) for c in specials)))
+    dropped_char_indices = []
+    edits = []
+    out_s = []
+    last = 0
+    skipped = 0
+    for match in special_chars.finditer(s):
+        pos = match.start()
+        out_s.append(s[last:pos])
+        last = pos + 1
+        decision, value = CODEPOINT_TABLE.decide(match.group(0))
+        if decision == MAP:
+            out_s.append(value)
+            continue
+        edits.append((pos, pos + 1, ''))
+        if decision == DROP:
+            dropped_char_indices.append([pos - skipped, value])
+        elif decision == WARN:
+            print(RuntimeWarning("Unkown unicode character with length > 1: {} -- ignored".format(value)))
+            skipped += 1
+        else:
+            skipped += 1
+    out_s.append(s[last:])
+    
+    return ''.join(out_s), dropped_char_indices, edits
+
 def handle_unicode_characters(s):
     """Handle unicode characters appearing in string. Some do actually contain valuable information for NLP applications. But there is also a lot of "unnecessary" unicode in scientific texts (at least from an Software-NER perspective). It can either be dropped, or different codes can be summarized by one characters. 
 
+    Decisions are taken from CODEPOINT_TABLE. Only characters that are not kept as they are need to be visited individually, everything inbetween is copied as whole runs. 
+
     Args:
         s (string): string to transform
 
     Returns:
         string: unicode 'normalized' string
+        list: [index, character] for each dropped character 
     """
-    dropped_char_indices = []
-    running_count = 0
-    out_s = ''
-    for char in s:
-        if re.match(r"[A-Za-z0-9\s]", char) is not None or char in string.punctuation:
-            # keep "normal" chars
-            out_s += char
-            running_count += 1
-        else:
-            # here we will deal with unicode
-            if char in ['©', '™', '®']:
-                # 'TradeMarks' are tricky but often used to indicate external equipment in studies
-                out_s += '™'
-                running_count += 1
-                continue
-
-            if char == '°':
-                # Temperatures are almost always indicated by °
-                out_s += char
-                running_count += 1
-                continue
-
-            # some unicodes are combined and based on 'normal' characters -> we want to keep the base characters, e.g. á -> a
-            unicode_matched = False
-            #char_
-            u_map = unicodedata.decomposition(char)
-            if u_map and len(u_map) > 1:
-                split_codes = [code for code in u_map.split() if not re.match(r'<.*>', code)]
-                for code in split_codes:
-                    code_char = chr(int(code, 16))
-                    if re.match(r'[a-zA-Z]', code_char):
-                        out_s += code_char # TODO
-                        unicode_matched = True
-                        running_count += 1
-                        break
-            if unicode_matched: 
-                continue
-
-            # normalized unicode for everything else just to be save.. 
-            char = unicodedata.normalize('NFC', char)
-
-            if len(char) > 1:
-                print(RuntimeWarning("Unkown unicode character with length > 1: {} -- ignored".format(char)))
-                continue
-
-            # we want to keep basic greek letters no matter what
-            if char == 'µ': # yes, they are actually different: this is the 'micro sign'
-                char = 'μ' # this the greek letter..
-            if ( ord(char) >= 945 and ord(char) <= 970 ) or ( ord(char) >= 913 and ord(char) <= 938 ):
-                out_s += char
-                running_count += 1
-                continue
-
-            # the rest is based on unicode categories some of which are considered important and others are not
-            category = unicodedata.category(char)
-            if category == 'Pi':
-                if  ord(char) == 8216 or ord(char) == 8219:
-                    out_s += char
-                else:
-                    out_s += '“'
-                running_count += 1
-            elif category == 'Pf':
-                if ord(char) == 8217:
-                    out_s += '’'
-                else:
-                    out_s += '”'
-                running_count += 1
-            elif category == 'Pd':
-                char = '-'
-                out_s += char
-                running_count += 1
-            elif category == 'Sc':
-                out_s += char
-                running_count += 1
-            elif category in ['Pe', 'Cf', 'Ps', 'So', 'Sk', 'No']:
-                dropped_char_indices.append([running_count, char])
-                running_count += 1
-            elif category == 'Lm':
-                if ord(char) >= 697 and ord(char) <= 719:
-                    char ="'"
-                    running_count += 1
-                    out_s += char
-            elif category in ['Lu', 'Ll', 'Po']:
-                # keep
-                out_s += char
-                running_count += 1
-            elif category == 'Sm':
-                # Mathsymbols, TODO: handle them better?
-                out_s += char
-                running_count += 1
-                unicode_in_sent = True
-            else:
-                #print("Encountered an unhandled unicode character: {} - DROPPED".format(char))
-                dropped_char_indices.append([running_count, char])
-                running_count += 1
-    
-    return out_s, dropped_char_indices
+    s, dropped_char_indices, _ = _process_unicode_characters(s)
+    return s, dropped_char_indices
+
+def handle_unicode_characters_with_edits(s):
+    """Handle unicode characters as handle_unicode_characters and report the changes as edits (see document.Document)
+
+    Args:
+        s (string): string to transform
+
+    Returns:
+        string: unicode 'normalized' string
+        list: edits (beg, end, '') for each removed character, mapped characters keep the length and are not reported
+    """
+    s, _, edits = _process_unicode_characters(s)
+    return s, edits
@@ -1,12 +1,13 @@
-import re
-
+import time
+from array import array
 from pathlib import Path
 from functools import partial
-from multiprocessing import Pool
 from itertools import zip_longest
 
-from articlenizer import articlenizer, encode_string, corrections, sentenize, util
-from articlenizer.util import chunk_list
+from articlenizer import sentenize, tokenize, util, profiling
+from articlenizer.scheduler import run_parallel
+from articlenizer.prefetch import prefetch, BackgroundWriter, QUEUE_DEPTH
+from articlenizer.pipeline import get_pipeline
 
 def annotation_to_dict(annotation):
     """Read BRAT annotation line by line and transform it in a dictionary. 
@@ -51,101 +52,36 @@ def annotation_to_dict(annotation):
 
     return annotation_dict
 
-def _adjust_strings(annotation, text):
-    """Adjust annotation string of an entity.
-    If entity boundaries are readjusted the resulting annotation string is recalculated by this function.
-    Dictionary is adjusted in place
-
-    Args:
-        annotation (dictionary): annotation dictionary (result of calling annotation_to_dict)
-        text (string): plain text corresponding to the annotated entities
-    """
-    for _, entity in annotation['entities'].items():
-        entity['string'] = text[entity['beg']:entity['end']]        
-
-def _remove_characters(annotation, drops):
-    """Update annotation boundaries based on given indices where a character was dropped.
-
-    Args:
-        annotation (dictionary):  annotation dictionary (result of calling annotation_to_dict)
-        drops (list): list of integer indicies
-    """
-    for _, entity in annotation['entities'].items():
-        entity['beg_org'] = entity['beg']
-        entity['end_org'] = entity['end']
-    for drop in drops:
-        drop_position, _ = drop
-        for _, entity in annotation['entities'].items():
-            if drop_position <= entity['beg_org']:
-                entity['beg'] -= 1
-                entity['end'] -= 1
-            elif drop_position <= entity['end_org']:
-                entity['end'] -= 1
-
-def _add_characters(annotation, adds):
-    """Update annotation boundaries based on given indices where a character was added.
+def preprocess_document(text, process_unicode=True, replace_math=True, correct=True, corr_cite=True, sentenize_text=True):
+    """Run the preprocessing steps for annotated text and keep track of all changes in a Document. 
 
     Args:
-        annotation (dictionary): annotation dictionary (result of calling annotation_to_dict)
-        adds (list): list of integer indicies
-    """
-    for _, entity in annotation['entities'].items():
-        entity['beg_org'] = entity['beg']
-        entity['end_org'] = entity['end']
-    for add in adds:
-        for _, entity in annotation['entities'].items():
-            if add <= entity['beg_org']:
-                entity['beg'] += 1
-                entity['end'] += 1
-            elif add < entity['end_org']:
-                entity['end'] += 1
-            
-def _replace_segments(annotation, replacements):
-    """Update annotation based on string substitution at a specific position (general case)
+        text (string): plain text of the BRAT annotation (content of .txt file)
+        process_unicode (bool, optional): replace unicodes. Defaults to True.
+        replace_math (bool, optional): replace math equations. Defaults to True.
+        correct (bool, optional): replace string errors. Defaults to True.
+        corr_cite (bool, optional): correct citation errors. Defaults to True.
+        sentenize_text (bool, optional): normalize and sentenize the text. Defaults to True.
 
-    Args:
-        annotation (dictionary): annotation dictionary (result of calling annotation_to_dict)
-        replacements (list): contains lists of [string, replacement, start_ind, end_ind]
+    Returns:
+        Document: raw and processed text and their alignment
     """
-    for drop in replacements:
-        drop_string, drop_repl, drop_start, drop_end = drop
-        drop_diff = len(drop_repl) - len(drop_string)
-        for _, entity in annotation['entities'].items():
-            if drop_end < entity['beg']:
-                entity['beg'] += drop_diff
-                entity['end'] += drop_diff
-            elif drop_start >= entity['end']:
-                pass
-            elif drop_start < entity['beg'] and drop_end <= entity['end']:
-                entity['beg'] = drop_start + 1
-                entity['end'] += drop_diff
-            elif drop_start >= entity['beg'] and drop_end > entity['end']:
-                entity['end'] = drop_end + drop_diff 
-            elif drop_start < entity['beg'] and drop_end > entity['end']:
-                entity['beg'] = drop_start 
-                entity['end'] = drop_end + drop_diff
-            elif drop_start >= entity['beg'] and drop_end <= entity['end']:
-                entity['end'] += drop_diff
-            else:
-                raise(RuntimeError("Unknown case occurred on {} {}-{} with replacement {}".format(drop_string, drop_start, drop_end, drop_repl)))
+    return get_pipeline(process_unicode, replace_math, correct, corr_cite, sentenize_text, track_edits=True).process(text)
 
-def _switch_characters(annotation, switches):
-    """Adjust annotation boundaries to switching spans in the text
+def project_annotation(annotation, document):
+    """Project entity boundaries from the raw to the processed text of a document and update the entity strings.
+    Dictionary is adjusted in place
 
     Args:
         annotation (dictionary): annotation dictionary (result of calling annotation_to_dict)
-        switches ([type]): list of replacement span tuples [(b1, e1), (b2, e2)] with e1 <= b2
+        document (Document): preprocessed document
     """
-    for switch in switches:
-        for _, entity in annotation['entities'].items():
-            if entity['beg'] >= switch[0][0] and entity['end'] <= switch[0][1]: 
-                entity['beg'] += (switch[1][1] - switch[1][0])
-                entity['end'] += (switch[1][1] - switch[1][0])
-            elif entity['beg'] >= switch[1][0] and entity['end'] <= switch[1][1]: 
-                entity['beg'] -= (switch[0][1] - switch[0][0])
-                entity['end'] -= (switch[0][1] - switch[0][0])
-            elif ( entity['beg'] < switch[0][0] and entity['end'] > switch[0][0] ) or ( entity['beg'] < switch[0][1] and entity['end'] > switch[0][1] ) or ( entity['beg'] < switch[1][0] and entity['end'] > switch[1][0] ) or ( entity['beg'] < switch[1][1] and entity['end'] > switch[1][1] ):
-                print(RuntimeWarning("For {} switch and {} entity there is an overlap that cannot be handled.".format(switch, entity)))
+    entities = list(annotation['entities'].values())
+    spans = document.forward_spans([(entity['beg'], entity['end']) for entity in entities])
+    for entity, (beg, end) in zip(entities, spans):
+        entity['beg'] = beg
+        entity['end'] = end
+        entity['string'] = document.text[beg:end]
 
 def get_sentence_entities(beg, end, annotations):
     """Get annotation for each individual sentence and adjust indices to start from 0 for each sentence.
@@ -221,63 +157,80 @@ def bio_annotate(tokens, entities):
         tokens (list): sentence split in token strings 
         entities (dictionary): entity annotation for a given sentence
 
+    Returns:
+        list, list, list: adjusted tokens, token names, bio labels
+    """
+    spans = array('I')
+    offset = 0
+    for token in tokens:
+        if token.rstrip():
+            spans.append(offset)
+            spans.append(offset + len(token))
+        offset += len(token)
+    return bio_annotate_spans(''.join(tokens), spans, entities)
+
+def bio_annotate_spans(text, spans, entities, start=0):
+    """Create BIO annotation for token offsets and entities. 
+    Tokens that directly follow each other are separated by a single space in the adjusted entity offsets.
+
+    Args:
+        text (string): text the token offsets refer to
+        spans (array): start and end offset of each token without whitespace tokens (result of tokenize.tokenize_spans)
+        entities (dictionary): entity annotation for a given sentence, relative to start
+        start (int, optional): offset of the sentence in text. Defaults to 0.
+
     Returns:
         list, list, list: adjusted tokens, token names, bio labels
     """
     out_tokens = []
     out_names = []
     out_labels = []
-    offset = 0
-    new_offset = 0
-    space_before = True
-    for token in tokens:
-        if token.rstrip() and not space_before:
-            new_offset += 1
-        current_end = offset + len(token)
+    inserted_spaces = 0
+    previous_end = None
+    for beg, end in zip(spans[::2], spans[1::2]):
+        token = text[beg:end]
+        if beg == previous_end:
+            inserted_spaces += 1
+        offset = beg - start
+        current_end = end - start
+        new_offset = offset + inserted_spaces
         current_label = 'O'
         token_name = 'O'
-        if token.rstrip():
-            for ann_key, ann in entities.items():
-                if offset == ann['beg']:
-                    if current_label != 'O':
-                        raise(RuntimeError("Multiple annotations for a span."))
-                    current_label = 'B-{}'.format(ann['label'])
-                    token_name = ann_key
-                    ann['new_beg'] = new_offset
-                    ann['new_end'] = new_offset + len(token)
-                elif offset > ann['beg'] and current_end <= ann['end']:
-                    if current_label != 'O':
-                        raise(RuntimeError("Multiple annotations for a span."))
+        for ann_key, ann in entities.items():
+            if offset == ann['beg']:
+                if current_label != 'O':
+                    raise(RuntimeError("Multiple annotations for a span."))
+                current_label = 'B-{}'.format(ann['label'])
+                token_name = ann_key
+                ann['new_beg'] = new_offset
+                ann['new_end'] = new_offset + len(token)
+            elif offset > ann['beg'] and current_end <= ann['end']:
+                if current_label != 'O':
+                    raise(RuntimeError("Multiple annotations for a span."))
+                current_label = 'I-{}'.format(ann['label'])
+                token_name = ann_key
+                ann['new_end'] = new_offset + len(token)
+            elif offset < ann['beg'] and current_end > ann['beg'] or offset < ann['end'] and current_end > ann['end']:
+                print(RuntimeWarning("Annotation does not match the token split, token: {}, entities: {}".format(token, entities)))
+                if out_labels[-1].startswith('B-') and out_labels[-1].split('-', maxsplit=1)[-1] == ann['label']: 
+                    print("Treating as I..")
                     current_label = 'I-{}'.format(ann['label'])
                     token_name = ann_key
                     ann['new_end'] = new_offset + len(token)
-                elif offset < ann['beg'] and current_end > ann['beg'] or offset < ann['end'] and current_end > ann['end']:
-                    print(RuntimeWarning("Annotation does not match the token split, token: {}, entities: {}".format(token, entities)))
-                    if out_labels[-1].startswith('B-') and out_labels[-1].split('-', maxsplit=1)[-1] == ann['label']: 
-                        print("Treating as I..")
-                        current_label = 'I-{}'.format(ann['label'])
-                        token_name = ann_key
-                        ann['new_end'] = new_offset + len(token)
-                    else:
-                        print("Treating as B..")
-                        current_label = 'B-{}'.format(ann['label'])
-                        token_name = ann_key
-                        ann['new_beg'] = new_offset
-                        ann['new_end'] = new_offset + len(token)
-                    
                 else:
-                    pass
+                    print("Treating as B..")
+                    current_label = 'B-{}'.format(ann['label'])
+                    token_name = ann_key
+                    ann['new_beg'] = new_offset
+                    ann['new_end'] = new_offset + len(token)
+                
+            else:
+                pass
 
-            out_names.append(token_name)
-            out_labels.append(current_label)
-            out_tokens.append(token)
-        
-        offset = current_end 
-        new_offset += len(token)
-        if not token.rstrip():
-            space_before = True
-        else:
-            space_before = False
+        out_names.append(token_name)
+        out_labels.append(current_label)
+        out_tokens.append(token)
+        previous_end = end
     return out_tokens, out_names, out_labels
 
 def brat_to_bio(text, annotation, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
@@ -294,47 +247,29 @@ def brat_to_bio(text, annotation, process_unicode=True, replace_math=True, corre
     Returns:
         list of dictionaries: sentences information for each sentence in text 
     """
-    annotation_dict = annotation_to_dict(annotation)
-    if process_unicode:
-        text, replacements = encode_string.handle_unicode_characters(text)
-        _remove_characters(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if replace_math:
-        text, replacements = corrections.remove_math_expr(text)
-        _replace_segments(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if correct:
-        text, replacements = corrections.correct_with_index(text)
-        _add_characters(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if corr_cite:
-        text, switched_segments = corrections.correct_citations(text)
-        _switch_characters(annotation_dict, switched_segments)
-        _adjust_strings(annotation_dict, text)
-
-    text, replacements = sentenize.normalize(text)
-    _replace_segments(annotation_dict, replacements)
-    _adjust_strings(annotation_dict, text)
-    text, replacements = sentenize.sentenize_with_index(text)
-    _add_characters(annotation_dict, replacements)
-    _adjust_strings(annotation_dict, text)
+    document = preprocess_document(text, process_unicode, replace_math, correct, corr_cite)
+    processed = document.text
+    with profiling.measure('tokenize', len(processed)):
+        spans = sentenize.sentence_spans(processed)
+        sentence_spans = list(zip(spans[::2], spans[1::2]))
+        token_spans = [tokenize.tokenize_spans(processed, sentence_beg, sentence_end) for sentence_beg, sentence_end in sentence_spans]
 
     sentences = []
-    sentence_match_objects = re.finditer(r'[^\n]+', text)
-    for sentence in sentence_match_objects:
-        sentence_string = sentence.group(0)
-        sentence_entities = get_sentence_entities(sentence.span(0)[0], sentence.span(0)[1], annotation_dict)
-        tokens = articlenizer.tokenize_text(sentence_string, 'spaces', False)
-        tokens, names, labels = bio_annotate(tokens, sentence_entities)
-        sentence_relations = get_sentence_relations(annotation_dict, sentence_entities)
-        sentences.append({
-            'string': sentence_string,
-            'tokens': tokens,
-            'names': names,
-            'labels': labels,
-            'entities': sentence_entities,
-            'relations': sentence_relations
-        })
+    with profiling.measure('projection', len(text)):
+        annotation_dict = annotation_to_dict(annotation)
+        project_annotation(annotation_dict, document)
+        for (sentence_beg, sentence_end), sentence_token_spans in zip(sentence_spans, token_spans):
+            sentence_entities = get_sentence_entities(sentence_beg, sentence_end, annotation_dict)
+            tokens, names, labels = bio_annotate_spans(processed, sentence_token_spans, sentence_entities, sentence_beg)
+            sentence_relations = get_sentence_relations(annotation_dict, sentence_entities)
+            sentences.append({
+                'string': processed[sentence_beg:sentence_end],
+                'tokens': tokens,
+                'names': names,
+                'labels': labels,
+                'entities': sentence_entities,
+                'relations': sentence_relations
+            })
     
     return sentences
 
@@ -370,37 +305,15 @@ def sentence_based_info_annotation_dict(text, annotation_dict, process_unicode=T
     Returns:
         list of dictionaries: Brat based information for each sentence in text 
     """
-    
-    if process_unicode:
-        text, replacements = encode_string.handle_unicode_characters(text)
-        _remove_characters(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if replace_math:
-        text, replacements = corrections.remove_math_expr(text)
-        _replace_segments(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if correct:
-        text, replacements = corrections.correct_with_index(text)
-        _add_characters(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-    if corr_cite:
-        text, switched_segments = corrections.correct_citations(text)
-        _switch_characters(annotation_dict, switched_segments)
-        _adjust_strings(annotation_dict, text)
-
-    if not is_preprocessed:
-        text, replacements = sentenize.normalize(text)
-        _replace_segments(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
-        text, replacements = sentenize.sentenize_with_index(text)
-        _add_characters(annotation_dict, replacements)
-        _adjust_strings(annotation_dict, text)
+    document = preprocess_document(text, process_unicode, replace_math, correct, corr_cite, not is_preprocessed)
+    project_annotation(annotation_dict, document)
+    text = document.text
 
     sentences = []
-    sentence_match_objects = re.finditer(r'[^\n]+', text)
-    for sentence in sentence_match_objects:
-        sentence_string = sentence.group(0)
-        sentence_entities = get_sentence_entities(sentence.span(0)[0], sentence.span(0)[1], annotation_dict)
+    spans = sentenize.sentence_spans(text)
+    for sentence_beg, sentence_end in zip(spans[::2], spans[1::2]):
+        sentence_string = text[sentence_beg:sentence_end]
+        sentence_entities = get_sentence_entities(sentence_beg, sentence_end, annotation_dict)
         sentence_relations = get_sentence_relations(annotation_dict, sentence_entities)
         sentences.append({
             'string': sentence_string,
@@ -410,7 +323,44 @@ def sentence_based_info_annotation_dict(text, annotation_dict, process_unicode=T
     
     return sentences
 
-def write_brat_to_bio(file_names, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+def _read_brat(file_names):
+    start = time.perf_counter()
+    with file_names['txt'].open(mode='r') as t_file, file_names['ann'].open(mode='r') as a_file:
+        text, annotation = t_file.read(), a_file.read()
+    profiling.add('read', time.perf_counter() - start, len(text) + len(annotation))
+    return text, annotation
+
+def _bio_lines(article_text, article_annotation, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    """Output lines of an article in BIO format for text, labels and relations (see write_brat_to_bio)"""
+    article_sentences = brat_to_bio(article_text, article_annotation, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
+    outputs = {'data': [], 'labels': [], 'relations': []}
+    for sent in article_sentences:
+        outputs['data'].append(' '.join(sent['tokens']).rstrip())
+        outputs['labels'].append(' '.join(sent['labels']).rstrip())
+        relation_string = ''
+        for _, rel in sent['relations'].items():
+            relation_string += '{}\t{}\t{}\t{}\t{}\t{}\t{};;'.format(rel['label'], rel['arg1'], rel['pos1'], rel['ent1'], rel['arg2'], rel['pos2'], rel['ent2'])
+        outputs['relations'].append(relation_string)
+    return outputs
+
+def _bio_files(file_names):
+    """Output files of an article written by write_brat_to_bio"""
+    return ['{}.{}.txt'.format(file_names['out'], name) for name in ['data', 'labels', 'relations']]
+
+def _write_bio(file_names, outputs, shards=None):
+    if shards is not None:
+        shards.write(str(file_names['txt']), outputs)
+        return
+    start = time.perf_counter()
+    characters = 0
+    for name, lines in outputs.items():
+        with Path('{}.{}.txt'.format(file_names['out'], name)).open(mode='w') as out_file:
+            for line in lines:
+                out_file.write(line + '\n')
+                characters += len(line) + 1
+    profiling.add('write', time.perf_counter() - start, characters)
+
+def write_brat_to_bio(file_names, process_unicode=True, replace_math=True, correct=True, corr_cite=True, shards=None):
     """Read a BRAT input file, transform it to BIO format and write separate outputs for text, labels and relations.
 
     Args:
@@ -419,26 +369,13 @@ def write_brat_to_bio(file_names, process_unicode=True, replace_math=True, corre
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
+        shards (ShardWriter, optional): write a record {'key': text filename, 'data': lines, 'labels': lines, 'relations': lines} to the shards instead of the three output files. Defaults to None.
     """
-    with file_names['txt'].open(mode='r') as t_file, file_names['ann'].open(mode='r') as a_file:
-        article_text = t_file.read()
-        article_annotation = a_file.read()
-        article_sentences = brat_to_bio(article_text, article_annotation, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
-
-        out_text_loc = Path(str(file_names['out']) + '.data.txt') 
-        out_label_loc = Path(str(file_names['out']) + '.labels.txt') 
-        out_relation_loc = Path(str(file_names['out']) + '.relations.txt') 
-
-        with out_text_loc.open(mode='w') as out_text, out_label_loc.open(mode='w') as out_labels, out_relation_loc.open(mode='w') as out_relations:
-            for sent in article_sentences:
-                out_text.write(' '.join(sent['tokens']).rstrip() + '\n')
-                out_labels.write(' '.join(sent['labels']).rstrip() + '\n')
-                relation_string = ''
-                for _, rel in sent['relations'].items():
-                    relation_string += '{}\t{}\t{}\t{}\t{}\t{}\t{};;'.format(rel['label'], rel['arg1'], rel['pos1'], rel['ent1'], rel['arg2'], rel['pos2'], rel['ent2'])
-                out_relations.write(relation_string + '\n')
-
-def article_list_brat_to_bio(file_names, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    article_text, article_annotation = _read_brat(file_names)
+    outputs = _bio_lines(article_text, article_annotation, process_unicode, replace_math, correct, corr_cite)
+    _write_bio(file_names, outputs, shards)
+
+def article_list_brat_to_bio(file_names, process_unicode=True, replace_math=True, correct=True, corr_cite=True, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Read a list of BRAT input files, transform them to BIO format and write separate outputs for text, labels and relations for each file
 
     Args:
@@ -447,11 +384,23 @@ def article_list_brat_to_bio(file_names, process_unicode=True, replace_math=True
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
+        manifest (Manifest, optional): manifest in which each written article is recorded (see manifest.Manifest). Defaults to None.
+        shards (ShardWriter, optional): see write_brat_to_bio. Defaults to None.
+        queue_depth (int, optional): number of articles read ahead and written behind the transformation by background threads, 0 reads and writes one article after another (see prefetch). Defaults to prefetch.QUEUE_DEPTH.
     """
-    for f_names in file_names:
-        write_brat_to_bio(f_names, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite) 
-
-def brat_to_bio_parallel_wrapper(file_names, n_cores, process_unicode=True, replace_math=True, correct=True, corr_cite=True):
+    writer = BackgroundWriter(queue_depth)
+    try:
+        for f_names, (article_text, article_annotation) in prefetch(file_names, _read_brat, queue_depth):
+            outputs = _bio_lines(article_text, article_annotation, process_unicode, replace_math, correct, corr_cite)
+            writer.submit(_write_bio, f_names, outputs, shards)
+            if manifest is not None:
+                writer.submit(manifest.record_written, f_names, _bio_files(f_names), shards)
+    finally:
+        writer.close()
+    if shards is not None:
+        shards.finish()
+
+def brat_to_bio_parallel_wrapper(file_names, n_cores, process_unicode=True, replace_math=True, correct=True, corr_cite=True, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Parallel wrapper for article_list_brat_to_bio
 
     Args:
@@ -461,11 +410,12 @@ def brat_to_bio_parallel_wrapper(file_names, n_cores, process_unicode=True, repl
         replace_math (bool, optional): replace math equations. Defaults to True.
         correct (bool, optional): replace string errors. Defaults to True.
         corr_cite (bool, optional): correct citation errors. Defaults to True.
+        manifest (Manifest, optional): see article_list_brat_to_bio. Defaults to None.
+        shards (ShardWriter, optional): see write_brat_to_bio, every process writes its own shards. Defaults to None.
+        queue_depth (int, optional): see article_list_brat_to_bio, per process. Defaults to prefetch.QUEUE_DEPTH.
     """
-    list_segments = chunk_list(file_names, n_cores)
-    fct_to_execute = partial(article_list_brat_to_bio, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite)
-    with Pool(n_cores) as p:
-        p.map(fct_to_execute, list_segments)
+    fct_to_execute = partial(article_list_brat_to_bio, process_unicode=process_unicode, replace_math=replace_math, correct=correct, corr_cite=corr_cite, manifest=manifest, shards=shards, queue_depth=queue_depth)
+    run_parallel(fct_to_execute, file_names, n_cores)
 
 def bio_to_brat(text, label, relation='', split_sent=True, split_words=True):
     """Transform bio annotated tex to BRAT annotation format
@@ -577,6 +527,4 @@ def bio_to_brat_parallel_wrapper(file_names, n_cores):
         file_names (list of lists): elements: [PosixPath, PosixPath, PosixPath, PosixPath] paths to text, labels and output text and output annotation
         n_cores (int): number of python processes to use (multiprocessing package)
     """
-    list_segments = chunk_list(file_names, n_cores)
-    with Pool(n_cores) as p:
-        p.map(article_list_bio_to_brat, list_segments)
+    run_parallel(article_list_bio_to_brat, file_names, n_cores)
@@ -2,10 +2,9 @@ import re
 
 from pathlib import Path
 from functools import partial
-from multiprocessing import Pool
 
 from articlenizer.articlenizer import sentenize_text
-from articlenizer.util import chunk_list
+from articlenizer.scheduler import run_parallel
 
 article_beg_pattern = re.compile(r'<b>(?P<article_name>[a-zA-Z0-9]+?)</b>')
 article_end_pattern = re.compile(r'<p><hr><p>')
@@ -114,8 +113,6 @@ def parse_file_list_parallel_wrapper(in_list, out_path='.', n_cores=4):
     Returns:
         int: Number of articles extracted 
     """
-    list_segments = chunk_list(in_list, n_cores)
     fct_to_execute = partial(parse_file_list, out_path=out_path)
-    with Pool(n_cores) as p:
-        n_articles = p.map(fct_to_execute, list_segments)
+    n_articles = run_parallel(fct_to_execute, in_list, n_cores)
     return sum(n_articles)
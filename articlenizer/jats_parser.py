@@ -1,12 +1,16 @@
+import io
+import time
 import xml.sax
 
 from pathlib import Path
-from multiprocessing import Pool
 from functools import partial
 from collections import deque
 
+from articlenizer import archives
+from articlenizer import profiling
 from articlenizer import articlenizer
-from articlenizer.util import chunk_list
+from articlenizer.scheduler import run_parallel
+from articlenizer.prefetch import prefetch, BackgroundWriter, QUEUE_DEPTH
 
 PARAGRAPH_TAGS = ['title', 'p', 'sec', 'abstract']
 LINEBREAK_TAGS = ['list-item']
@@ -278,11 +282,33 @@ def parse_jats_article(xml_content, parser=None, jats_parser=None):
         text = handle_xrefs(text)
         return text
 
-def parse_article_list(in_list):
+def _read_text(path):
+    start = time.perf_counter()
+    with path.open(mode='r') as xml_in:
+        xml_content = xml_in.read()
+    profiling.add('read', time.perf_counter() - start, len(xml_content))
+    return xml_content
+
+def _read_member(member):
+    start = time.perf_counter()
+    xml_content = member[1].read()
+    profiling.add('read', time.perf_counter() - start, len(xml_content))
+    return xml_content
+
+def _write_text(path, text):
+    start = time.perf_counter()
+    with path.open('w') as txt_out:
+        txt_out.write(text)
+    profiling.add('write', time.perf_counter() - start, len(text))
+
+def parse_article_list(in_list, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Parse and write JATS articles to plain text files.
 
     Args:
         in_list ([in_path, out_path]): path to input JATS, location for output plain txt
+        manifest (Manifest, optional): manifest in which each parsed article is recorded (see manifest.Manifest). Defaults to None.
+        shards (ShardWriter, optional): write records {'key': input path, 'text': plain text} to shards instead of text files (see shards.ShardWriter). Defaults to None.
+        queue_depth (int, optional): number of articles read ahead and written behind the parsing by background threads, 0 reads and writes one article after another (see prefetch). Defaults to prefetch.QUEUE_DEPTH.
 
     Returns:
         int: count of erroneous files
@@ -292,25 +318,90 @@ def parse_article_list(in_list):
     parser.setContentHandler(jats_parser)
     
     error_count = 0
-    for path_in, path_out in in_list:
-        with path_in.open(mode='r') as xml_in:
-            text = parse_jats_article(xml_in, parser=parser, jats_parser=jats_parser)
+    writer = BackgroundWriter(queue_depth)
+    try:
+        for (path_in, path_out), xml_content in prefetch(in_list, lambda job: _read_text(job[0]), queue_depth):
+            start = time.perf_counter()
+            text = parse_jats_article(io.StringIO(xml_content), parser=parser, jats_parser=jats_parser)
+            profiling.add('parse', time.perf_counter() - start, len(xml_content))
             if text is None:
                 error_count += 1
+            elif shards is not None:
+                writer.submit(shards.write, str(path_in), {'text': text})
             else:
-                with path_out.open('w') as txt_out:
-                    txt_out.write(text)
+                writer.submit(_write_text, path_out, text)
+            if manifest is not None:
+                # articles that cannot be parsed have no output, they are only parsed again if they change
+                writer.submit(manifest.record_written, [path_in, path_out], [] if text is None else None, shards)
+    finally:
+        writer.close()
+    if shards is not None:
+        shards.finish()
 
     return error_count
 
-def parse_article_list_parallel_wrapper(in_list, n_cores=4):
+def parse_article_list_parallel_wrapper(in_list, n_cores=4, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
     """Parallel wrapper around parse_article_list
 
     Args:
         in_list ([in_path, out_path]): path to input JATS, location for output plain txt
         n_cores (int, optional): number parallel python processes to spawn (multiprocessing package). Defaults to 4.
+        manifest (Manifest, optional): see parse_article_list. Defaults to None.
+        shards (ShardWriter, optional): see parse_article_list, every process writes its own shards. Defaults to None.
+        queue_depth (int, optional): see parse_article_list, per process. Defaults to prefetch.QUEUE_DEPTH.
+    """
+    error_counts = run_parallel(partial(parse_article_list, manifest=manifest, shards=shards, queue_depth=queue_depth), in_list, n_cores)
+    return sum(error_counts)
+
+def parse_archive_list(archive_list, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
+    """Parse and write the JATS articles (.nxml) in tar or zip archives without unpacking them.
+
+    Args:
+        archive_list ([archive, output directory]): archives and the directories for the outputs of their members (see archives.archive_out_path), each article is written to <output directory>/<member name>.txt
+        manifest (Manifest, optional): manifest in which each finished archive is recorded (see manifest.Manifest). Defaults to None.
+        shards (ShardWriter, optional): see parse_article_list, the key of an article is <archive>/<member name>. Defaults to None.
+        queue_depth (int, optional): see parse_article_list. Defaults to prefetch.QUEUE_DEPTH.
+
+    Returns:
+        int: count of erroneous files
+    """
+    parser = xml.sax.make_parser()
+    jats_parser = JATS_Parser()
+    parser.setContentHandler(jats_parser)
+
+    error_count = 0
+    writer = BackgroundWriter(queue_depth)
+    try:
+        for archive, out_dir in archive_list:
+            created = set()
+            for (path, _), xml_content in prefetch(archives.iter_members(archive, '.nxml'), _read_member, queue_depth):
+                start = time.perf_counter()
+                text = parse_jats_article(io.BytesIO(xml_content), parser=parser, jats_parser=jats_parser)
+                profiling.add('parse', time.perf_counter() - start, len(xml_content))
+                if text is None:
+                    error_count += 1
+                elif shards is not None:
+                    writer.submit(shards.write, '{}/{}'.format(archive, path), {'text': text})
+                else:
+                    writer.submit(_write_text, archives.member_out_name(out_dir, path, '.txt', created), text)
+            if manifest is not None:
+                writer.submit(manifest.record_written, [archive, out_dir], None, shards)
+    finally:
+        writer.close()
+    if shards is not None:
+        shards.finish()
+
+    return error_count
+
+def parse_archive_list_parallel_wrapper(archive_list, n_cores=4, manifest=None, shards=None, queue_depth=QUEUE_DEPTH):
+    """Parallel wrapper around parse_archive_list, every archive is parsed by a single process
+
+    Args:
+        archive_list ([archive, output directory]): see parse_archive_list
+        n_cores (int, optional): number parallel python processes to spawn (multiprocessing package). Defaults to 4.
+        manifest (Manifest, optional): see parse_archive_list. Defaults to None.
+        shards (ShardWriter, optional): see parse_article_list, every process writes its own shards. Defaults to None.
+        queue_depth (int, optional): see parse_article_list, per process. Defaults to prefetch.QUEUE_DEPTH.
     """
-    list_segments = chunk_list(in_list, n_cores)
-    with Pool(n_cores) as p:
-        error_counts = p.map(parse_article_list, list_segments)
+    error_counts = run_parallel(partial(parse_archive_list, manifest=manifest, shards=shards, queue_depth=queue_depth), archive_list, n_cores)
     return sum(error_counts)
@@ -0,0 +1,177 @@
+"""Manifest of the outputs in a corpus output directory for incremental and resumable runs.
+
+For every finished job a line is appended to MANIFEST_NAME in the output directory with the output path,
+the content hash of its input files, the configuration of the run and the library version. Jobs whose entry
+still matches and whose output files still exist are skipped on the next run. Because entries are written as soon as
+the output of a job is written (for shards, once its shard is closed), an interrupted run continues with the first
+unfinished job, a line that was cut off by a crash is ignored. Entries that were replaced by later ones are removed
+with Manifest.compact.
+Input files are only hashed again if their size or modification time changed.
+"""
+
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from articlenizer import __version__
+from articlenizer import profiling
+
+MANIFEST_NAME = 'articlenizer_manifest.jsonl'
+
+def job_files(job):
+    """Input files and output of a job
+
+    Args:
+        job (list or dictionary): [input paths..., output path] or dictionary of paths with the output at key 'out'
+
+    Returns:
+        list, string: input paths and output path
+    """
+    if isinstance(job, dict):
+        return [p for key, p in job.items() if key != 'out'], str(job['out'])
+    return list(job[:-1]), str(job[-1])
+
+def file_fingerprint(path, previous=None):
+    """Size, modification time and sha256 hash of a file
+
+    Args:
+        path (PosixPath): file
+        previous (list, optional): earlier fingerprint of the file, its hash is reused if size and modification time did not change. Defaults to None.
+
+    Returns:
+        list: [size, modification time in ns, hex digest]
+    """
+    stat = Path(path).stat()
+    if previous is not None and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+        return previous
+    digest = hashlib.sha256()
+    with Path(path).open(mode='rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+
+class Manifest():
+    """Entries of the finished outputs in an output directory for a given configuration.
+    """
+    def __init__(self, out_path, config, version=__version__):
+        """Load the manifest of an output directory
+
+        Args:
+            out_path (string or PosixPath): output directory
+            config (dictionary): configuration of the run (e.g. tool name and preprocessing flags), has to be JSON serializable
+            version (string, optional): library version. Defaults to articlenizer.__version__.
+        """
+        self.path = Path(out_path) / MANIFEST_NAME
+        self.config = config
+        self.version = version
+        self.entries = {}
+        self.lines = 0
+        if self.path.is_file():
+            with self.path.open(mode='r') as f:
+                for line in f:
+                    self.lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry['output']] = entry
+
+    def __getstate__(self):
+        # workers only append entries, the loaded entries are not sent to them
+        state = dict(self.__dict__)
+        state['entries'] = {}
+        return state
+
+    def compact(self):
+        """Rewrite the manifest with only the latest entry of each output, if it contains replaced or broken lines
+        """
+        if self.lines == len(self.entries):
+            return
+        tmp_path = self.path.with_suffix('.tmp')
+        with tmp_path.open(mode='w') as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, self.path)
+        self.lines = len(self.entries)
+
+    def is_current(self, job):
+        """Check whether the output of a job was written from the same inputs with the same configuration and version and still exists
+
+        Args:
+            job (list or dictionary): job, see job_files
+
+        Returns:
+            bool: whether the job can be skipped
+        """
+        inputs, output = job_files(job)
+        entry = self.entries.get(output)
+        if entry is None or entry['config'] != self.config or entry['version'] != self.version:
+            return False
+        if sorted(entry['inputs']) != sorted(str(p) for p in inputs):
+            return False
+        # entries without files are from before they were recorded, their output is a single file
+        if not all(Path(f).exists() for f in entry.get('files', [output])):
+            return False
+        for p in inputs:
+            previous = entry['inputs'][str(p)]
+            try:
+                if file_fingerprint(p, previous)[2] != previous[2]:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def pending(self, jobs):
+        """Jobs that have to be processed
+
+        Args:
+            jobs (list): jobs, see job_files
+
+        Returns:
+            list: jobs without a current entry in the manifest
+        """
+        return [job for job in jobs if not self.is_current(job)]
+
+    def record(self, job, files=None):
+        """Append the entry of a finished job, can be called from several processes at once
+
+        Args:
+            job (list or dictionary): job, see job_files
+            files (list, optional): files written by the job, the job is processed again if one of them is missing. Defaults to None (the output of the job).
+        """
+        start = time.perf_counter()
+        inputs, output = job_files(job)
+        entry = {
+            'output': output,
+            'files': [output] if files is None else [str(f) for f in files],
+            'inputs': {str(p): file_fingerprint(p) for p in inputs},
+            'config': self.config,
+            'version': self.version
+        }
+        # one unbuffered write of the whole line to a descriptor opened with O_APPEND, the lines of different
+        # processes are appended one after the other instead of being flushed in parts by a buffered file object
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        fd = os.open(str(self.path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self.entries[output] = entry
+        self.lines += 1
+        profiling.add('manifest', time.perf_counter() - start, sum(fingerprint[0] for fingerprint in entry['inputs'].values()))
+
+    def record_written(self, job, files=None, shards=None):
+        """Append the entry of a finished job once its output is on disk: right away for output files, for shards when
+        the shard holding its records is closed (see shards.ShardWriter.call_when_written)
+
+        Args:
+            job (list or dictionary): job, see job_files
+            files (list, optional): see record, not used for shards. Defaults to None.
+            shards (ShardWriter, optional): shards the output of the job was written to. Defaults to None.
+        """
+        if shards is None:
+            self.record(job, files)
+        else:
+            shards.call_when_written(self.record, job, [])
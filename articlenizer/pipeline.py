@@ -0,0 +1,220 @@
+"""Preprocessing pipeline that is resolved once from a configuration.
+
+The enabled stages are looked up when the Pipeline is built and kept as a flat list of functions,
+processing a text only calls them one after another. Every stage records its cumulative wall time,
+the number of characters it was given and how often it was called, see Pipeline.report.
+"""
+
+import time
+from functools import lru_cache
+
+from articlenizer import encode_string, corrections, sentenize, tokenize
+from articlenizer.document import Document
+
+def _handle_unicode(text):
+    text, _ = encode_string.handle_unicode_characters(text)
+    return text
+
+def _replace_math(text):
+    text, _ = corrections.remove_math_expr(text)
+    return text
+
+def _switch_citations(text):
+    text, _ = corrections.correct_citations(text)
+    return text
+
+def _sentenize(text):
+    return sentenize.sentenize(text).split('\n')
+
+def _tokenize(sentences):
+    return [tokenize.tokenize(sentence) for sentence in sentences]
+
+def _tokenize_no_spaces(sentences):
+    return [[t for t in tokenize.tokenize(sentence) if t.rstrip()] for sentence in sentences]
+
+def _tokenize_spans(sentences):
+    return [(sentence, tokenize.tokenize_spans(sentence)) for sentence in sentences]
+
+# stages producing the processed text, sentenize returns a list of sentences and tokenize a list of token lists
+TEXT_STAGES = {
+    'unicode': _handle_unicode,
+    'math': _replace_math,
+    'citations': _switch_citations,
+    'correct': corrections.correct,
+    'sentenize': _sentenize,
+    'tokenize': _tokenize_no_spaces
+}
+# tokenize stage for each token representation (see articlenizer.tokenize_text), any other representation keeps the spaces
+TOKEN_REPRESENTATIONS = {
+    'no_spaces': _tokenize_no_spaces,
+    'spans': _tokenize_spans
+}
+# stages producing the processed text and its edits (see document.Document)
+EDIT_STAGES = {
+    'unicode': encode_string.handle_unicode_characters_with_edits,
+    'math': corrections.remove_math_expr_with_edits,
+    'correct': corrections.correct_with_edits,
+    'citations': corrections.correct_citations_with_edits,
+    'normalize': sentenize.normalize_with_edits,
+    'sentenize': sentenize.sentenize_with_edits
+}
+# order of the stages for articles (articlenizer.get_tokenized_sentences) and annotated text (formatting.brat_to_bio)
+TEXT_ORDER = ['unicode', 'math', 'citations', 'correct', 'sentenize', 'tokenize']
+EDIT_ORDER = ['unicode', 'math', 'correct', 'citations', 'normalize', 'sentenize']
+# stages with edits in the order of TEXT_ORDER, gives the same sentences for articles (see articlenizer.iter_sentences)
+ARTICLE_EDIT_ORDER = ['unicode', 'math', 'citations', 'correct', 'normalize', 'sentenize']
+
+def _size(value):
+    """Number of characters of a text, a list of sentences or a Document"""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, Document):
+        return len(value.text)
+    return sum(len(v) for v in value)
+
+class Pipeline():
+    """Flat list of the preprocessing stages enabled by a configuration with timing information for each stage.
+    """
+    def __init__(self, process_unicode=True, replace_math=True, correct=True, corr_cite=True, sentenize=True, tokenize=True, token_rep='no_spaces', track_edits=False, article_order=False):
+        """Resolve the enabled stages
+
+        Args:
+            process_unicode (bool, optional): replace unicodes. Defaults to True.
+            replace_math (bool, optional): replace math equations. Defaults to True.
+            correct (bool, optional): replace string errors. Defaults to True.
+            corr_cite (bool, optional): correct citation errors. Defaults to True.
+            sentenize (bool, optional): split the text in sentences (a list of sentences is returned). Defaults to True.
+            tokenize (bool, optional): split the sentences in tokens (a list of token lists is returned), ignored if track_edits is set. Defaults to True.
+            token_rep (str, optional): see articlenizer.tokenize_text. Defaults to 'no_spaces'.
+            track_edits (bool, optional): process annotated text, a Document with the alignment to the raw text is returned (see formatting.preprocess_document). Defaults to False.
+            article_order (bool, optional): track edits with the stage order of articles instead of annotated text (see ARTICLE_EDIT_ORDER). Defaults to False.
+        """
+        enabled = {
+            'unicode': process_unicode,
+            'math': replace_math,
+            'correct': correct,
+            'citations': corr_cite,
+            'normalize': sentenize,
+            'sentenize': sentenize,
+            'tokenize': sentenize and tokenize
+        }
+        self.config = {
+            'process_unicode': process_unicode,
+            'replace_math': replace_math,
+            'correct': correct,
+            'corr_cite': corr_cite,
+            'sentenize': sentenize,
+            'tokenize': tokenize,
+            'token_rep': token_rep,
+            'track_edits': track_edits,
+            'article_order': article_order
+        }
+        self.track_edits = track_edits
+        if track_edits:
+            self.stages = [(name, EDIT_STAGES[name]) for name in (ARTICLE_EDIT_ORDER if article_order else EDIT_ORDER) if enabled[name]]
+        else:
+            self.stages = []
+            for name in TEXT_ORDER:
+                if not enabled[name]:
+                    continue
+                fct = TEXT_STAGES[name]
+                if name == 'tokenize':
+                    fct = TOKEN_REPRESENTATIONS.get(token_rep, _tokenize)
+                self.stages.append((name, fct))
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a pipeline from a configuration dictionary
+
+        Args:
+            config (dictionary): keyword arguments of Pipeline, missing entries take their default values
+
+        Returns:
+            Pipeline: pipeline
+        """
+        unknown = set(config) - set(cls().config)
+        if unknown:
+            raise(RuntimeError("Unknown pipeline options: {}".format(', '.join(sorted(unknown)))))
+        return cls(**config)
+
+    def reset(self):
+        """Set all timings to zero
+        """
+        self.timings = {name: [0.0, 0, 0] for name, _ in self.stages}
+
+    def process(self, text):
+        """Run all stages on a text
+
+        Args:
+            text (string): text to process
+
+        Returns:
+            list of lists, list, string or Document: result of the last stage
+        """
+        timer = time.perf_counter
+        if self.track_edits:
+            text = Document(text)
+        for name, fct in self.stages:
+            timing = self.timings[name]
+            size = _size(text)
+            start = timer()
+            if self.track_edits:
+                text.apply(name, fct)
+            else:
+                text = fct(text)
+            timing[0] += timer() - start
+            timing[1] += size
+            timing[2] += 1
+        return text
+
+    def process_many(self, texts):
+        """Run all stages on a sequence of texts
+
+        Args:
+            texts (iterable): texts to process
+
+        Yields:
+            result of process for each text
+        """
+        for text in texts:
+            yield self.process(text)
+
+    def merge(self, other):
+        """Add the timings of another pipeline with the same stages (e.g. from a different process)
+
+        Args:
+            other (Pipeline or dictionary): pipeline or its timings
+        """
+        timings = other.timings if isinstance(other, Pipeline) else other
+        for name, (seconds, characters, calls) in timings.items():
+            timing = self.timings.setdefault(name, [0.0, 0, 0])
+            timing[0] += seconds
+            timing[1] += characters
+            timing[2] += calls
+
+    def report(self):
+        """Summary table of the timings
+
+        Returns:
+            string: one line per stage with its cumulative time, share of the total time, characters, throughput and calls
+        """
+        total = sum(t[0] for t in self.timings.values())
+        lines = ['{:<12} {:>10} {:>7} {:>12} {:>10} {:>8}'.format('stage', 'seconds', 'share', 'characters', 'MB/s', 'calls')]
+        for name, (seconds, characters, calls) in self.timings.items():
+            lines.append('{:<12} {:>10.3f} {:>6.1f}% {:>12} {:>10.2f} {:>8}'.format(name, seconds, 100 * seconds / total if total else 0, characters, characters / seconds / 1e6 if seconds else 0, calls))
+        lines.append('{:<12} {:>10.3f}'.format('total', total))
+        return '\n'.join(lines)
+
+SHARED_PIPELINES = [] # pipelines built by get_pipeline, their timings are collected by profiling.collect
+
+@lru_cache(maxsize=None)
+def get_pipeline(process_unicode=True, replace_math=True, correct=True, corr_cite=True, sentenize=True, tokenize=True, token_rep='no_spaces', track_edits=False, article_order=False):
+    """Shared pipeline for a configuration, built on the first call (see Pipeline)
+
+    Returns:
+        Pipeline: pipeline
+    """
+    pipeline = Pipeline(process_unicode, replace_math, correct, corr_cite, sentenize, tokenize, token_rep, track_edits, article_order)
+    SHARED_PIPELINES.append(pipeline)
+    return pipeline
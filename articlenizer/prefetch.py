@@ -0,0 +1,141 @@
+"""Overlapping file I/O with processing inside a worker process.
+
+prefetch reads the inputs of the next jobs in a thread while the current one is processed, BackgroundWriter writes
+outputs in a thread while the next job is processed. Both are connected to the processing loop by queues of
+QUEUE_DEPTH items, so at most that many read inputs and unwritten outputs are held in memory. The regular expressions
+hold the GIL, but file I/O releases it, which is what the threads overlap (mostly useful on network storage).
+A queue depth of 0 reads and writes in the calling thread, one step after another.
+"""
+
+import time
+import queue
+import threading
+
+from articlenizer import profiling
+
+QUEUE_DEPTH = 4
+_DONE = object()
+
+def _reader(items, read, out_queue, stop):
+    """Read the items into out_queue until all are read or stop is set"""
+    try:
+        for item in items:
+            try:
+                entry = (item, read(item), None)
+            except Exception as e:
+                entry = (item, None, e)
+            while not stop.is_set():
+                try:
+                    out_queue.put(entry, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            if stop.is_set():
+                return
+    except Exception as e:
+        # failure of the item iterator itself (e.g. a broken archive)
+        entry = (None, None, e)
+    else:
+        entry = _DONE
+    while not stop.is_set():
+        try:
+            out_queue.put(entry, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+def prefetch(items, read, queue_depth=QUEUE_DEPTH):
+    """Read the inputs of items in a background thread ahead of their processing
+
+    Args:
+        items (iterable): jobs, iterated in the reader thread
+        read (function): reads the input of a job
+        queue_depth (int, optional): number of inputs that are read ahead, 0 reads in the calling thread. Defaults to QUEUE_DEPTH.
+
+    Yields:
+        item, result: job and its input, exceptions of read are raised when the job is reached
+    """
+    if queue_depth <= 0:
+        for item in items:
+            yield item, read(item)
+        return
+    out_queue = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    thread = threading.Thread(target=_reader, args=(items, read, out_queue, stop), daemon=True)
+    thread.start()
+    try:
+        while True:
+            start = time.perf_counter()
+            entry = out_queue.get()
+            profiling.add('read wait', time.perf_counter() - start, 0, 0)
+            if entry is _DONE:
+                break
+            item, result, error = entry
+            if error is not None:
+                raise error
+            yield item, result
+    finally:
+        stop.set()
+        thread.join()
+
+class BackgroundWriter():
+    """Executes write functions in submission order in a background thread.
+    """
+    def __init__(self, queue_depth=QUEUE_DEPTH):
+        """Set up a writer, the thread is started with the first submitted write
+
+        Args:
+            queue_depth (int, optional): number of pending writes before submit blocks, 0 writes in the calling thread. Defaults to QUEUE_DEPTH.
+        """
+        self.queue_depth = queue_depth
+        self._queue = None
+        self._thread = None
+        self._error = None
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is _DONE:
+                return
+            if self._error is None:
+                fct, args = task
+                try:
+                    fct(*args)
+                except Exception as e:
+                    self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+    def submit(self, fct, *args):
+        """Queue a write, raises the exception of an earlier failed write
+
+        Args:
+            fct (function): write function
+            *args: arguments of fct
+        """
+        if self.queue_depth <= 0:
+            fct(*args)
+            return
+        self._raise_error()
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=self.queue_depth)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        start = time.perf_counter()
+        self._queue.put((fct, args))
+        profiling.add('write wait', time.perf_counter() - start, 0, 0)
+
+    def close(self):
+        """Wait for all pending writes, raises the exception of a failed write. Writes that were submitted after a failed one are skipped.
+        """
+        if self._thread is not None:
+            start = time.perf_counter()
+            self._queue.put(_DONE)
+            self._thread.join()
+            self._thread = None
+            profiling.add('write wait', time.perf_counter() - start, 0, 0)
+        self._raise_error()
@@ -0,0 +1,196 @@
+"""Opt-in profiling of the processing stages, merged across worker processes.
+
+Every process counts the wall time, characters and documents of each stage: the preprocessing stages of the shared
+pipelines (see pipeline.get_pipeline), reading and writing files, the paragraph cache, JATS parsing and the annotation
+projection of formatting.brat_to_bio. The rule counts of util.RULE_STATISTICS are collected as well. When profiling
+is enabled, scheduler.run_parallel returns the counters of each chunk to the calling process, which merges them
+in PROFILE, so collect() at the end of a run gives the counters of all processes.
+Stages that run in the reader and writer threads (see prefetch) overlap with the processing, they are counted under
+their name with THREAD_SUFFIX and left out of the shares and the stage total. The time the processing waited for them
+is counted as 'read wait' and 'write wait'.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+from articlenizer.pipeline import SHARED_PIPELINES
+from articlenizer.util import RuleStatistics, RULE_STATISTICS
+
+ENABLED = False
+THREAD_SUFFIX = ' (thread)'
+
+class Profile():
+    """Wall time, characters and documents per stage and the rule counts of one or more processes.
+    """
+    def __init__(self):
+        self.stages = {}
+        self.rules = RuleStatistics()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, characters, documents=1):
+        """Count the work of a stage, can be called from several threads
+
+        Args:
+            name (string): stage
+            seconds (float): time spent
+            characters (int): characters (or bytes) processed
+            documents (int, optional): documents processed. Defaults to 1.
+        """
+        with self._lock:
+            counts = self.stages.setdefault(name, [0.0, 0, 0])
+            counts[0] += seconds
+            counts[1] += characters
+            counts[2] += documents
+
+    def merge(self, other):
+        """Add the counts of another Profile or the timings of a Pipeline (same layout: seconds, characters, calls)
+
+        Args:
+            other (Profile or dictionary): profile or stage timings
+        """
+        stages = other.stages if isinstance(other, Profile) else other
+        for name, (seconds, characters, documents) in stages.items():
+            self.add(name, seconds, characters, documents)
+        if isinstance(other, Profile):
+            self.rules.merge(other.rules)
+
+    def reset(self):
+        """Set all counts to zero
+        """
+        with self._lock:
+            self.stages = {}
+        self.rules.counts = {}
+
+    def total(self):
+        """Time of all stages that ran in the processing threads
+
+        Returns:
+            float: seconds
+        """
+        return sum(c[0] for name, c in self.stages.items() if not name.endswith(THREAD_SUFFIX))
+
+    def summary(self, wall=None, statistics=None):
+        """JSON serializable summary
+
+        Args:
+            wall (float, optional): wall time of the run in seconds. Defaults to None.
+            statistics (WorkerStatistics, optional): worker statistics of the run (see scheduler). Defaults to None.
+
+        Returns:
+            dictionary: counts and throughput of each stage, the rule counts and optionally the run and its workers
+        """
+        total = self.total()
+        summary = {
+            'stages': {
+                name: {
+                    'seconds': seconds,
+                    'share': None if name.endswith(THREAD_SUFFIX) else seconds / total if total else 0,
+                    'characters': characters,
+                    'documents': documents,
+                    'chars_per_second': characters / seconds if seconds else 0
+                } for name, (seconds, characters, documents) in self.stages.items()
+            },
+            'stage_seconds': total,
+            'rules': [
+                {'rules': name, 'idx': idx, 'applied': applied, 'matched': changed, 'skipped': skipped}
+                for (name, idx), (applied, changed, skipped) in sorted(self.rules.counts.items())
+            ]
+        }
+        if wall is not None:
+            summary['wall_seconds'] = wall
+        if statistics is not None and statistics.workers:
+            utilization = statistics.utilization()
+            summary['workers'] = {
+                str(worker): {'seconds': seconds, 'utilization': utilization[worker], 'chunks': chunks, 'jobs': jobs, 'bytes': size}
+                for worker, (seconds, chunks, jobs, size) in sorted(statistics.workers.items())
+            }
+        return summary
+
+    def report(self, wall=None):
+        """Summary table of the stages
+
+        Args:
+            wall (float, optional): wall time of the run in seconds, printed below the stages. Defaults to None.
+
+        Returns:
+            string: one line per stage with its time, share of the stage time, characters, throughput and documents
+        """
+        total = self.total()
+        lines = ['{:<16} {:>10} {:>7} {:>14} {:>12} {:>10}'.format('stage', 'seconds', 'share', 'characters', 'chars/s', 'documents')]
+        for name, (seconds, characters, documents) in sorted(self.stages.items(), key=lambda s: (s[0].endswith(THREAD_SUFFIX), -s[1][0])):
+            share = '-' if name.endswith(THREAD_SUFFIX) else '{:.1f}%'.format(100 * seconds / total if total else 0)
+            lines.append('{:<16} {:>10.3f} {:>7} {:>14} {:>12.0f} {:>10}'.format(name, seconds, share, characters, characters / seconds if seconds else 0, documents))
+        lines.append('{:<16} {:>10.3f}'.format('stages', total))
+        if wall is not None:
+            lines.append('{:<16} {:>10.3f}'.format('wall', wall))
+        return '\n'.join(lines)
+
+PROFILE = Profile()
+
+def enable(enabled=True):
+    """Switch profiling on or off in this process
+
+    Args:
+        enabled (bool, optional): whether to count. Defaults to True.
+    """
+    global ENABLED
+    ENABLED = enabled
+
+def start_worker(enabled):
+    """Initializer of the worker processes, switches profiling on or off and drops the counts inherited from the parent process
+
+    Args:
+        enabled (bool): whether to count
+    """
+    enable(enabled)
+    collect()
+
+def add(name, seconds, characters, documents=1):
+    """Count the work of a stage in PROFILE if profiling is enabled (see Profile.add), stages outside of the main thread are marked with THREAD_SUFFIX
+    """
+    if ENABLED:
+        if threading.current_thread() is not threading.main_thread():
+            name += THREAD_SUFFIX
+        PROFILE.add(name, seconds, characters, documents)
+
+@contextmanager
+def measure(name, characters, documents=1):
+    """Count the time spent in a with block as the work of a stage (see add)
+
+    Args:
+        name (string): stage
+        characters (int): characters (or bytes) processed
+        documents (int, optional): documents processed. Defaults to 1.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - start, characters, documents)
+
+def collect():
+    """Counters of this process since the last collect: PROFILE, the timings of the shared pipelines and the rule
+    counts of RULE_STATISTICS. All of them are reset.
+
+    Returns:
+        Profile: counters
+    """
+    profile = Profile()
+    profile.merge(PROFILE)
+    PROFILE.reset()
+    for pipeline in SHARED_PIPELINES:
+        profile.merge(pipeline.timings)
+        pipeline.reset()
+    profile.rules.merge(RULE_STATISTICS)
+    RULE_STATISTICS.counts = {}
+    return profile
@@ -0,0 +1,82 @@
+"""Regular expression engine for the patterns of the preprocessing pipeline.
+
+The engine is picked at import time from the environment variable ARTICLENIZER_REGEX_ENGINE: 're' (default), 
+'regex' (third party regex module) or 're2' (RE2 binding providing a re compatible 're2' module). 
+If the selected engine is not installed the standard library is used. Patterns the selected engine cannot compile 
+(e.g. lookarounds with RE2) fall back to the standard library one by one, so the rule lists can be compiled unchanged. 
+Run benchmarks/benchmark_regex_engine.py to check which engines give the same results and which one is the fastest.
+Independent sentenize rules are fused into one pattern per stage (see util.compile_regex_stages) if the environment 
+variable ARTICLENIZER_FUSE_STAGES is '1'. By default this is only done for automaton based engines, backtracking 
+engines are slower on the fused alternations than on the single rules.
+"""
+
+import os
+import re
+
+ENGINES = {'re': re}
+try:
+    import regex
+    ENGINES['regex'] = regex
+except ImportError:
+    pass
+try:
+    import re2
+    ENGINES['re2'] = re2
+except ImportError:
+    pass
+
+def select_engine(name):
+    """Name of the engine to use for a requested engine
+
+    Args:
+        name (string): requested engine
+
+    Returns:
+        string: name of the engine, 're' if the requested one is not installed
+    """
+    if name not in ENGINES:
+        print(RuntimeWarning("Regex engine '{}' is not available, falling back to 're'.".format(name)))
+        return 're'
+    return name
+
+ENGINE_NAME = select_engine(os.environ.get('ARTICLENIZER_REGEX_ENGINE', 're'))
+
+AUTOMATON_ENGINES = ['re2'] # engines that match all alternatives of a pattern in a single pass over the text
+FUSE_STAGES = os.environ.get('ARTICLENIZER_FUSE_STAGES', '1' if ENGINE_NAME in AUTOMATON_ENGINES else '0') == '1'
+
+COMPILED = [] # all patterns compiled through this module: pattern, flags, compiled pattern
+FALLBACKS = [] # patterns the selected engine could not compile
+
+def compile(pattern, flags=0, engine=None):
+    """Compile a pattern with the selected engine, falling back to the standard library if the engine does not support it
+
+    Args:
+        pattern (string): regular expression
+        flags (int, optional): re flags. Defaults to 0.
+        engine (string, optional): name of the engine to use instead of the selected one. Defaults to None.
+
+    Returns:
+        compiled regular expression
+    """
+    name = ENGINE_NAME if engine is None else engine
+    compiled = None
+    if name != 're':
+        try:
+            compiled = ENGINES[name].compile(pattern, flags)
+        except Exception: # every engine has its own error type
+            FALLBACKS.append(pattern)
+    if compiled is None:
+        compiled = re.compile(pattern, flags)
+    COMPILED.append((pattern, flags, compiled))
+    return compiled
+
+def is_native(compiled):
+    """Whether a compiled pattern uses the selected engine and not the standard library fallback
+
+    Args:
+        compiled (compiled regular expression): pattern returned by compile
+
+    Returns:
+        bool: pattern is compiled by the selected engine
+    """
+    return ENGINE_NAME == 're' or not isinstance(compiled, re.Pattern)
@@ -0,0 +1,173 @@
+"""Size-aware execution of file lists on a pool of processes.
+
+Jobs (e.g. pairs of input and output paths) are sorted by the size of their input file, largest first,
+and grouped in chunks that shrink as the remaining work shrinks: every chunk holds about 1/(CHUNK_FACTOR * n_cores)
+of the bytes that are left, but at least 1/(MAX_CHUNKS * n_cores) of all bytes. Large articles are started first,
+one per chunk, and the small ones fill the gaps at the end, so no core is left with a few huge files while the others
+are idle. Chunks are handed out with imap_unordered as soon as a worker is free. Corpora that are too small to pay for
+starting the pool are processed serially. With profiling enabled, every chunk returns the stage counters of its
+worker (see profiling).
+"""
+
+import os
+import time
+from pathlib import Path
+from functools import partial
+from multiprocessing import Pool
+
+from articlenizer import profiling
+
+SERIAL_THRESHOLD = 256 * 1024 # bytes below which jobs are processed in the calling process
+CHUNK_FACTOR = 4 # number of chunks each core gets from the remaining work
+MAX_CHUNKS = 16 # number of chunks each core gets at most, limits the overhead of sending small jobs
+
+class WorkerStatistics():
+    """Busy time, processed chunks, jobs and bytes per worker process and the wall time of all runs.
+    """
+    def __init__(self):
+        self.workers = {}
+        self.wall = 0.0
+
+    def add(self, worker, seconds, jobs, size):
+        """Count a processed chunk
+
+        Args:
+            worker (int): process id of the worker
+            seconds (float): time spent on the chunk
+            jobs (int): number of jobs in the chunk
+            size (int): bytes of the jobs in the chunk
+        """
+        counts = self.workers.setdefault(worker, [0.0, 0, 0, 0])
+        counts[0] += seconds
+        counts[1] += 1
+        counts[2] += jobs
+        counts[3] += size
+
+    def merge(self, other):
+        """Add the counts of another WorkerStatistics object
+
+        Args:
+            other (WorkerStatistics): statistics to add
+        """
+        for worker, (seconds, chunks, jobs, size) in other.workers.items():
+            counts = self.workers.setdefault(worker, [0.0, 0, 0, 0])
+            counts[0] += seconds
+            counts[1] += chunks
+            counts[2] += jobs
+            counts[3] += size
+        self.wall += other.wall
+
+    def utilization(self):
+        """Share of the wall time each worker was busy
+
+        Returns:
+            dictionary: utilization between 0 and 1 for each worker
+        """
+        return {worker: counts[0] / self.wall if self.wall else 0 for worker, counts in self.workers.items()}
+
+    def report(self):
+        """Summary table of all workers
+
+        Returns:
+            string: one line per worker with its busy time, utilization, chunks, jobs and megabytes
+        """
+        utilization = self.utilization()
+        lines = ['{:<10} {:>10} {:>7} {:>8} {:>8} {:>10}'.format('worker', 'seconds', 'busy', 'chunks', 'jobs', 'MB')]
+        for worker, (seconds, chunks, jobs, size) in sorted(self.workers.items()):
+            lines.append('{:<10} {:>10.3f} {:>6.1f}% {:>8} {:>8} {:>10.2f}'.format(worker, seconds, 100 * utilization[worker], chunks, jobs, size / 1e6))
+        lines.append('{:<10} {:>10.3f}'.format('wall', self.wall))
+        return '\n'.join(lines)
+
+SCHEDULER_STATISTICS = WorkerStatistics()
+
+def job_size(job):
+    """Size of the input file of a job, the first path if the job is a list or dictionary of paths
+
+    Args:
+        job (PosixPath, list or dictionary): job as passed to the list functions of the parallel wrappers
+
+    Returns:
+        int: size in bytes, at least 1 so that jobs without a readable input are still counted
+    """
+    if isinstance(job, dict):
+        job = next(iter(job.values()))
+    elif isinstance(job, (list, tuple)):
+        job = job[0]
+    try:
+        return max(1, Path(job).stat().st_size)
+    except (OSError, TypeError):
+        return 1
+
+def schedule_chunks(jobs, sizes, n_cores, chunk_factor=CHUNK_FACTOR, max_chunks=MAX_CHUNKS):
+    """Sort jobs largest first and group them in chunks of decreasing size
+
+    Args:
+        jobs (list): jobs
+        sizes (list): size of each job
+        n_cores (int): number of worker processes
+        chunk_factor (int, optional): number of chunks each core gets from the remaining work. Defaults to CHUNK_FACTOR.
+        max_chunks (int, optional): number of chunks each core gets at most. Defaults to MAX_CHUNKS.
+
+    Returns:
+        list of tuples: (jobs of the chunk, size of the chunk)
+    """
+    order = sorted(range(len(jobs)), key=lambda idx: sizes[idx], reverse=True)
+    remaining = sum(sizes)
+    min_size = remaining / (max_chunks * n_cores)
+    chunks = []
+    chunk = []
+    chunk_size = 0
+    for idx in order:
+        chunk.append(jobs[idx])
+        chunk_size += sizes[idx]
+        if chunk_size >= max(remaining / (chunk_factor * n_cores), min_size):
+            chunks.append((chunk, chunk_size))
+            remaining -= chunk_size
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        chunks.append((chunk, chunk_size))
+    return chunks
+
+def _run_chunk(fct, chunk):
+    """Run a list function on a chunk and measure it, executed in the worker processes. The profiling counters of the chunk are returned if profiling is enabled."""
+    jobs, size = chunk
+    start = time.perf_counter()
+    result = fct(jobs)
+    profile = profiling.collect() if profiling.ENABLED else None
+    return result, os.getpid(), time.perf_counter() - start, len(jobs), size, profile
+
+def run_parallel(fct, jobs, n_cores, sizes=None, serial_threshold=SERIAL_THRESHOLD, statistics=SCHEDULER_STATISTICS):
+    """Run a function that processes a list of jobs on chunks of the jobs in a pool of processes
+
+    Args:
+        fct (function): function called with a list of jobs, has to be picklable (module level or partial)
+        jobs (list): jobs
+        n_cores (int): number of python processes to use (multiprocessing package)
+        sizes (list, optional): size of each job. Defaults to None (size of the input file, see job_size).
+        serial_threshold (int, optional): total size below which all jobs are processed in the calling process. Defaults to SERIAL_THRESHOLD.
+        statistics (WorkerStatistics, optional): where to count the work of each worker. Defaults to SCHEDULER_STATISTICS.
+
+    Returns:
+        list: return values of fct, one per chunk in the order the chunks finished
+    """
+    if sizes is None:
+        sizes = [job_size(job) for job in jobs]
+    start = time.perf_counter()
+    if n_cores <= 1 or len(jobs) < 2 or sum(sizes) < serial_threshold:
+        outputs = [_run_chunk(fct, (list(jobs), sum(sizes)))]
+    else:
+        chunks = schedule_chunks(jobs, sizes, n_cores)
+        with Pool(min(n_cores, len(chunks)), initializer=profiling.start_worker, initargs=(profiling.ENABLED,)) as p:
+            outputs = list(p.imap_unordered(partial(_run_chunk, fct), chunks))
+            # let the workers exit on their own, so that what they keep open over chunks is closed (e.g. shards)
+            p.close()
+            p.join()
+    statistics.wall += time.perf_counter() - start
+    results = []
+    for result, worker, seconds, n_jobs, size, profile in outputs:
+        statistics.add(worker, seconds, n_jobs, size)
+        if profile is not None:
+            profiling.PROFILE.merge(profile)
+        results.append(result)
+    return results
@@ -3,42 +3,44 @@ in BRAT (https://brat.nlplab.org/) that is in turn based on GeniaSS
 (http://www.nactem.ac.uk/y-matsu/geniass/)
 """
 
-import re
-
+from array import array
+from bisect import bisect_left
 from pathlib import Path
 
-from articlenizer.util import apply_regex_list
-from articlenizer import ABBREVIATIONS
+from articlenizer import regex_engine
+from articlenizer.util import apply_regex_list, apply_guarded_regex_list, compile_regex_stages, compile_stage_triggers
+from articlenizer.abbreviations import ABBREVIATION_MATCHER
+from articlenizer.document import Document
 
 # remove leading and trailing spaces for all lines to get rid of potential confusion.
 NORM_REGEX = []
-NORM_REGEX.append((re.compile(r'\n(?P<leading_spaces>\s+)'), '\n'))
-NORM_REGEX.append((re.compile(r'^(?P<leading_spaces> +)'), ''))
-NORM_REGEX.append((re.compile(r'^(?P<leading_newlines>\n+)'), ''))
-NORM_REGEX.append((re.compile(r'(?P<trailing_spaces> +)$'), ''))
-NORM_REGEX.append((re.compile(r'(?P<leading_spaces> +)\n'), '\n'))
-NORM_REGEX.append((re.compile(r'\n(?P<trailing_spaces> +)'), '\n'))
-NORM_REGEX.append((re.compile(r'(?P<multi_spaces>[ \u200a]{2,})'), ' '))
-NORM_REGEX.append((re.compile(r'(?P<multi_newline>\n{2,})'), '\n'))
+NORM_REGEX.append((regex_engine.compile(r'\n(?P<leading_spaces>\s+)'), '\n'))
+NORM_REGEX.append((regex_engine.compile(r'^(?P<leading_spaces> +)'), ''))
+NORM_REGEX.append((regex_engine.compile(r'^(?P<leading_newlines>\n+)'), ''))
+NORM_REGEX.append((regex_engine.compile(r'(?P<trailing_spaces> +)$'), ''))
+NORM_REGEX.append((regex_engine.compile(r'(?P<leading_spaces> +)\n'), '\n'))
+NORM_REGEX.append((regex_engine.compile(r'\n(?P<trailing_spaces> +)'), '\n'))
+NORM_REGEX.append((regex_engine.compile(r'(?P<multi_spaces>[ \u200a]{2,})'), ' '))
+NORM_REGEX.append((regex_engine.compile(r'(?P<multi_newline>\n{2,})'), '\n'))
 
 # regex to split everything there is to split on ".!?" (but not on "Word.Word")
-SPLIT_REGEX = re.compile(r'\S.*?(:?(:?(\.|!|\?|。|！|？)+(?=\s+))|(:?(?=\n+))|(:?(?=\s*$)))')
+SPLIT_REGEX = regex_engine.compile(r'\S.*?(:?(:?(\.|!|\?|。|！|？)+(?=\s+))|(:?(?=\n+))|(:?(?=\s*$)))')
 
 # splitter assumes new lines as sentence splits. Here new lines are added between costructions that are likely to indicate new sentences. 
 REFINED_SPLIT_REGEX_KEEP_LENGTH = []
 REFINED_SPLIT_REGEX_KEEP_LENGTH.append( # add "save" cases that capture stuff such as: "word.word" "232.word" "word).Next"
     (
-        re.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]+|[\d\(\)\[\]]+) ?[\?\!\.]) (?P<second_sentence_element>[A-Za-z]+ )'), # regex
+        regex_engine.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]+|[\d\(\)\[\]]+) ?[\?\!\.]) (?P<second_sentence_element>[A-Za-z]+ )'), # regex
         r'\g<first_sentence_element>\n\g<second_sentence_element>') # replacement (based on original input)
     ) 
 REFINED_SPLIT_REGEX_KEEP_LENGTH.append( 
     (
-        re.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]+|[\d\(\)\[\]]+) ?[\?\!\.][«”❞’"]) (?P<second_sentence_element>[A-Za-z]+ )'), 
+        regex_engine.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]+|[\d\(\)\[\]]+) ?[\?\!\.][«”❞’"]) (?P<second_sentence_element>[A-Za-z]+ )'), 
         r'\g<first_sentence_element>\n\g<second_sentence_element>') 
     ) 
 REFINED_SPLIT_REGEX_KEEP_LENGTH.append( 
     (
-        re.compile(r'(?P<first_sentence_element> formtok) (?P<second_sentence_element>[A-Z][a-z]+ )'), 
+        regex_engine.compile(r'(?P<first_sentence_element> formtok) (?P<second_sentence_element>[A-Z][a-z]+ )'), 
         r'\g<first_sentence_element>\n\g<second_sentence_element>') 
     ) 
 # TODO: add more cases?
@@ -46,12 +48,12 @@ REFINED_SPLIT_REGEX_KEEP_LENGTH.append(
 REFINED_SPLIT_REGEX_CHANGE_LENGTH = []
 REFINED_SPLIT_REGEX_CHANGE_LENGTH.append( # add "save" cases that capture stuff such as: "word.word" "232.word" "word).Next"
     (
-        re.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]{2,}|[\d\(\)\[\]]+) ?[\?\!\.])(?P<second_sentence_element>[A-HJ-UWYZ][a-z]+ )'), # regex
+        regex_engine.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]{2,}|[\d\(\)\[\]]+) ?[\?\!\.])(?P<second_sentence_element>[A-HJ-UWYZ][a-z]+ )'), # regex
         r'\g<first_sentence_element>\n\g<second_sentence_element>') # replacement (based on original input)
     )
 REFINED_SPLIT_REGEX_CHANGE_LENGTH.append( 
     (
-        re.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]{2,}|[\d\(\)\[\]]+) ?[\?\!\.][«”❞’"])(?P<second_sentence_element>[A-HJ-UWYZ][a-z]+ )'), 
+        regex_engine.compile(r'(?P<first_sentence_element> ([A-Za-z\(\)\[\]]{2,}|[\d\(\)\[\]]+) ?[\?\!\.][«”❞’"])(?P<second_sentence_element>[A-HJ-UWYZ][a-z]+ )'), 
         r'\g<first_sentence_element>\n\g<second_sentence_element>') 
     ) 
 
@@ -59,51 +61,288 @@ REFINED_SPLIT_REGEX = REFINED_SPLIT_REGEX_KEEP_LENGTH + REFINED_SPLIT_REGEX_CHAN
 
 # go in the reverse direction and check for cases where splits are wrong, e.g. when brackets are opened, and only closed on a new line. 
 SUBSENTENCE_REGEX = []
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\([^\[\]\(\)]*)\n(?P<close>[^\[\]\(\)]*\))'), r'\g<open> \g<close>')) # round bracket - no square inbetween
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\[[^\[\]\(\)]*)\n(?P<close>[^\[\]\(\)]*\])'), r'\g<open> \g<close>')) # square bracket - no round inbetween
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\([^\(\)]{0,250})\n(?P<close>[^\(\)]{0,250}\))'), r'\g<open> \g<close>')) # round within 250 chars
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\[[^\[\]]{0,250})\n(?P<close>[^\[\]]{0,250}\])'), r'\g<open> \g<close>')) # square within 250 chars
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\((?:[^\(\)]|\([^\(\)]*\)){0,250})\n(?P<close>(?:[^\(\)]|\([^\(\)]*\)){0,250}\))'), r'\g<open> \g<close>')) # round nested
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>\[(?:[^\[\]]|\[[^\[\]]*\]){0,250})\n(?P<close>(?:[^\[\]]|\[[^\[\]]*\]){0,250}\])'), r'\g<open> \g<close>')) # square nested
-SUBSENTENCE_REGEX.append((re.compile(r'(?P<open>[»“❝‘"][^»“❝‘"«”❞’"]{0,250})\n(?P<close>[^\(\)]{0,250}[«”❞’"])'), r'\g<open> \g<close>')) # quotations within 250 chars
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\([^\[\]\(\)]*)\n(?P<close>[^\[\]\(\)]*\))'), r'\g<open> \g<close>')) # round bracket - no square inbetween
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\[[^\[\]\(\)]*)\n(?P<close>[^\[\]\(\)]*\])'), r'\g<open> \g<close>')) # square bracket - no round inbetween
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\([^\(\)]{0,250})\n(?P<close>[^\(\)]{0,250}\))'), r'\g<open> \g<close>')) # round within 250 chars
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\[[^\[\]]{0,250})\n(?P<close>[^\[\]]{0,250}\])'), r'\g<open> \g<close>')) # square within 250 chars
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\((?:[^\(\)]|\([^\(\)]*\)){0,250})\n(?P<close>(?:[^\(\)]|\([^\(\)]*\)){0,250}\))'), r'\g<open> \g<close>')) # round nested
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>\[(?:[^\[\]]|\[[^\[\]]*\]){0,250})\n(?P<close>(?:[^\[\]]|\[[^\[\]]*\]){0,250}\])'), r'\g<open> \g<close>')) # square nested
+SUBSENTENCE_REGEX.append((regex_engine.compile(r'(?P<open>[»“❝‘"][^»“❝‘"«”❞’"]{0,250})\n(?P<close>[^\(\)]{0,250}[«”❞’"])'), r'\g<open> \g<close>')) # quotations within 250 chars
 
 # take back even more splits that are not desired
 RECOMBINE_REGEX = []
-RECOMBINE_REGEX.append((re.compile(r'[\.\,]\n(?P<normal_word>[a-z]{2}[a-z-]*[ \.\:\,\;])'), r'. \g<normal_word>')) # sentence cannot start with a "normal" lowercase word.
-RECOMBINE_REGEX.append((re.compile(r'(?P<abbr>\b[A-Z]\.)\n(?P<name>[a-z]{3,}\b)'), r'\g<abbr> \g<name>')) # names such as: "S. cerevisiae"
-RECOMBINE_REGEX.append((re.compile(r'(?P<word1>\s[a-z]{2,})\n(?P<word2>[a-z]{2,}\s)'), r'\g<word1> \g<word2>')) # recombine very "save", "weird" cases e.g. we performed\ntests.
-RECOMBINE_REGEX.append((re.compile(r'(?P<word1>\s[A-Z][a-z]{1,})\n(?P<word2>[a-z]{2,}\s)'), r'\g<word1> \g<word2>')) # recombine very "save", "weird" cases e.g. we performed\ntests.
-RECOMBINE_REGEX.append((re.compile(r'(?P<word1>\s[a-z]{2,})\n(?P<word2>http.+?\s)'), r'\g<word1> \g<word2>')) # url..
-RECOMBINE_REGEX.append((re.compile(r'(?P<word1>\s[A-Z][a-z]{1,})\n(?P<word2>http.+?\s)'), r'\g<word1> \g<word2>')) # url..
+RECOMBINE_REGEX.append((regex_engine.compile(r'[\.\,]\n(?P<normal_word>[a-z]{2}[a-z-]*[ \.\:\,\;])'), r'. \g<normal_word>')) # sentence cannot start with a "normal" lowercase word.
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<abbr>\b[A-Z]\.)\n(?P<name>[a-z]{3,}\b)'), r'\g<abbr> \g<name>')) # names such as: "S. cerevisiae"
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<word1>\s[a-z]{2,})\n(?P<word2>[a-z]{2,}\s)'), r'\g<word1> \g<word2>')) # recombine very "save", "weird" cases e.g. we performed\ntests.
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<word1>\s[A-Z][a-z]{1,})\n(?P<word2>[a-z]{2,}\s)'), r'\g<word1> \g<word2>')) # recombine very "save", "weird" cases e.g. we performed\ntests.
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<word1>\s[a-z]{2,})\n(?P<word2>http.+?\s)'), r'\g<word1> \g<word2>')) # url..
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<word1>\s[A-Z][a-z]{1,})\n(?P<word2>http.+?\s)'), r'\g<word1> \g<word2>')) # url..
 RECOMBINE_REGEX.append( # names such as "Anton P. Chekhov", "A. P. Chekhov"
     (
-        re.compile(r'(?P<given_names>\b(?:[A-Z]\.|[A-Z][a-z]{2,}) [A-Z]\.)\n(?P<surname>[A-Z][a-z]+\b)'),
+        regex_engine.compile(r'(?P<given_names>\b(?:[A-Z]\.|[A-Z][a-z]{2,}) [A-Z]\.)\n(?P<surname>[A-Z][a-z]+\b)'),
         r'\g<given_names> \g<surname>')
     )
-RECOMBINE_REGEX.append((re.compile(r'\n(?P<word_list>(?:and|or|but|nor|yet|of|in|by|as|on|at|to|via|for|with|that|than|from|into|upon|after|while|during|within|through|between|whereas|whether) )'), r' \g<word_list>')) # a number of words where there should not be an accidental split.
-RECOMBINE_REGEX.append((re.compile(r'(?P<t1>\b[ei]\.)\n(?P<t2>[gev]\.\,?)'), r'\g<t1> \g<t2>')) #specific abbreviations
+RECOMBINE_REGEX.append((regex_engine.compile(r'\n(?P<word_list>(?:and|or|but|nor|yet|of|in|by|as|on|at|to|via|for|with|that|than|from|into|upon|after|while|during|within|through|between|whereas|whether) )'), r' \g<word_list>')) # a number of words where there should not be an accidental split.
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<t1>\b[ei]\.)\n(?P<t2>[gev]\.\,?)'), r'\g<t1> \g<t2>')) #specific abbreviations
 RECOMBINE_REGEX.append( # more abbreviations
     (
-        re.compile(r'(?P<abbr> (' + r'|'.join(ABBREVIATIONS) + r'))\n'),
+        regex_engine.compile(r'(?P<abbr> (?:' + ABBREVIATION_MATCHER.pattern + r'))\n'),
         r'\g<abbr> ')
     )
 RECOMBINE_REGEX.append( # still more abbreviations
-    (re.compile(r'(?P<abbr>\b([Aa]pprox\.|[Nn]o\.|[Ff]igs?\.|[Tt]bls?\.|[Ee]qs?\.))\n(?P<number>\d+)'), r'\g<abbr> \g<number>'))
-RECOMBINE_REGEX.append((re.compile(r'(\.\s*)\n(\s*,)'), r'\1 \2')) # commas
-RECOMBINE_REGEX.append((re.compile(r'\n(?P<t1>\(.{0,250}\))'), r' \g<t1>')) #specific abbreviations
-RECOMBINE_REGEX.append((re.compile(r'(?P<t0>\d{1,4}\.?)\n(?P<t1>\d{1,4}\.)'), r'\g<t0> \g<t1>')) 
-RECOMBINE_REGEX.append((re.compile(r'\n(?P<t1>\[[0-9\-,\?]+\])'), r' \g<t1>')) 
-RECOMBINE_REGEX.append((re.compile(r'(?P<t1>\d{1,2}\.)\n(?P<t2>[12]\d{3})'), r'\g<t1> \g<t2>')) 
+    (regex_engine.compile(r'(?P<abbr>\b([Aa]pprox\.|[Nn]o\.|[Ff]igs?\.|[Tt]bls?\.|[Ee]qs?\.))\n(?P<number>\d+)'), r'\g<abbr> \g<number>'))
+RECOMBINE_REGEX.append((regex_engine.compile(r'(\.\s*)\n(\s*,)'), r'\1 \2')) # commas
+RECOMBINE_REGEX.append((regex_engine.compile(r'\n(?P<t1>\(.{0,250}\))'), r' \g<t1>')) #specific abbreviations
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<t0>\d{1,4}\.?)\n(?P<t1>\d{1,4}\.)'), r'\g<t0> \g<t1>')) 
+RECOMBINE_REGEX.append((regex_engine.compile(r'\n(?P<t1>\[[0-9\-,\?]+\])'), r' \g<t1>')) 
+RECOMBINE_REGEX.append((regex_engine.compile(r'(?P<t1>\d{1,2}\.)\n(?P<t2>[12]\d{3})'), r'\g<t1> \g<t2>')) 
 
 
 SPLIT_ENUM_REGEX_KEEP_LENGTH = []
-SPLIT_ENUM_REGEX_KEEP_LENGTH.append((re.compile(r'(?P<leading>[\)\.,;:\d]) (?P<enum>\([A-Z0-9]\)) (?P<next>[A-Z][a-z]+)'), r'\g<leading>\n\g<enum> \g<next>')) # commas
+SPLIT_ENUM_REGEX_KEEP_LENGTH.append((regex_engine.compile(r'(?P<leading>[\)\.,;:\d]) (?P<enum>\([A-Z0-9]\)) (?P<next>[A-Z][a-z]+)'), r'\g<leading>\n\g<enum> \g<next>')) # commas
 
 SPLIT_ENUM_REGEX_CHANGE_LENGTH = []
-SPLIT_ENUM_REGEX_CHANGE_LENGTH.append((re.compile(r'(?P<leading>[\)\.,;:\d])(?P<enum>\([A-Z0-9]\)) (?P<next>[A-Z][a-z]+)'), r'\g<leading>\n\g<enum> \g<next>')) # commas
+SPLIT_ENUM_REGEX_CHANGE_LENGTH.append((regex_engine.compile(r'(?P<leading>[\)\.,;:\d])(?P<enum>\([A-Z0-9]\)) (?P<next>[A-Z][a-z]+)'), r'\g<leading>\n\g<enum> \g<next>')) # commas
 
 SPLIT_ENUM_REGEX = SPLIT_ENUM_REGEX_KEEP_LENGTH + SPLIT_ENUM_REGEX_CHANGE_LENGTH
 
+# Trigger literals of each rule: a rule can only match if one of its literals appears in the string, None if it always has to be applied. 
+# Rules only replace newlines and spaces by each other, insert newlines or replace a comma by a dot (RECOMBINE_REGEX 0), 
+# literals that appear through an earlier replacement are found because the lookup is repeated after every change.
+REFINED_SPLIT_TRIGGERS = [
+    ['. ', '? ', '! '],
+    ['« ', '” ', '❞ ', '’ ', '" '],
+    [' formtok '],
+    ['.', '?', '!'],
+    ['«', '”', '❞', '’', '"']
+]
+RECOMBINE_TRIGGERS = [
+    ['.\n', ',\n'],
+    ['.\n'],
+    ['\n'],
+    ['\n'],
+    ['\nhttp'],
+    ['\nhttp'],
+    ['.\n'],
+    ['\n'],
+    ['e.\n', 'i.\n'],
+    None, # abbreviations may end in any character
+    ['.\n'],
+    [','],
+    ['\n('],
+    ['\n' + digit for digit in '0123456789'],
+    ['\n['],
+    ['.\n1', '.\n2']
+]
+SPLIT_ENUM_TRIGGERS = [
+    [' ('],
+    ['(']
+]
+
+# Rules are applied one after another, so most of them cannot be merged: their matches share context that the next rule 
+# needs (e.g. the space between two refined splits, or the newline consumed by a recombined word) or a replacement 
+# creates new matches for the next rule (e.g. removing a newline inside brackets). 
+# Only consecutive rules that can neither overlap nor create or destroy each others matches are grouped in one stage.
+NORM_STAGE_GROUPS = [[0, 1], [2, 3, 4], [5, 6], [7]]
+REFINED_SPLIT_STAGE_GROUPS = [[0], [1], [2], [3], [4]]
+SUBSENTENCE_STAGE_GROUPS = [[0, 1], [2], [3], [4], [5], [6]]
+RECOMBINE_STAGE_GROUPS = [[0], [1], [2], [3], [4], [5], [6], [7], [8], [9, 10], [11], [12, 13, 14], [15]]
+SPLIT_ENUM_STAGE_GROUPS = [[0, 1]]
+
+# The backtracking engine of the re module only skips ahead to candidate positions for patterns starting with a literal 
+# or a character set, which an alternation of different rules does not. Fused stages are therefore slower than the 
+# sequential passes with re (see benchmarks/benchmark_sentenize.py) and are only used by default with an automaton 
+# based engine (see regex_engine.FUSE_STAGES).
+FUSE_REGEX_STAGES = regex_engine.FUSE_STAGES
+
+NORM_STAGES = compile_regex_stages(NORM_REGEX, NORM_STAGE_GROUPS, FUSE_REGEX_STAGES)
+REFINED_SPLIT_STAGES = compile_regex_stages(REFINED_SPLIT_REGEX, REFINED_SPLIT_STAGE_GROUPS, FUSE_REGEX_STAGES)
+SUBSENTENCE_STAGES = compile_regex_stages(SUBSENTENCE_REGEX, SUBSENTENCE_STAGE_GROUPS, FUSE_REGEX_STAGES)
+RECOMBINE_STAGES = compile_regex_stages(RECOMBINE_REGEX, RECOMBINE_STAGE_GROUPS, FUSE_REGEX_STAGES)
+SPLIT_ENUM_STAGES = compile_regex_stages(SPLIT_ENUM_REGEX, SPLIT_ENUM_STAGE_GROUPS, FUSE_REGEX_STAGES)
+
+REFINED_SPLIT_STAGE_TRIGGERS = compile_stage_triggers(REFINED_SPLIT_TRIGGERS, REFINED_SPLIT_STAGE_GROUPS, FUSE_REGEX_STAGES)
+RECOMBINE_STAGE_TRIGGERS = compile_stage_triggers(RECOMBINE_TRIGGERS, RECOMBINE_STAGE_GROUPS, FUSE_REGEX_STAGES)
+SPLIT_ENUM_STAGE_TRIGGERS = compile_stage_triggers(SPLIT_ENUM_TRIGGERS, SPLIT_ENUM_STAGE_GROUPS, FUSE_REGEX_STAGES)
+
+# The SUBSENTENCE_REGEX rules only ever replace a single newline by a space, but their nested and bounded quantifiers 
+# backtrack heavily on bracket heavy text without a matching close (e.g. "(" followed by thousands of short lines). 
+# The scanners below find the same newlines as each rule does, jumping from bracket to bracket with regex searches 
+# and str.rfind, so that every rule is a single linear pass over the text.
+SUBSENTENCE_WINDOW = 250 # maximum context before and after the newline for the bounded rules
+# only brackets and quotes followed by a newline before the next bracket (or quote) can start a match
+SUBSENTENCE_OPENING = [
+    regex_engine.compile(r'\((?=[^\[\]\(\)]*?\n)'),
+    regex_engine.compile(r'\[(?=[^\[\]\(\)]*?\n)'),
+    regex_engine.compile(r'\((?=[^\(\)]{0,250}?\n)'),
+    regex_engine.compile(r'\[(?=[^\[\]]{0,250}?\n)'),
+    regex_engine.compile(r'\((?=(?:[^\(\)]|\([^\(\)]*\)){0,250}?\n)'),
+    regex_engine.compile(r'\[(?=(?:[^\[\]]|\[[^\[\]]*\]){0,250}?\n)'),
+    regex_engine.compile(r'[»“❝‘"](?=[^»“❝‘"«”❞’"]{0,250}?\n)')
+]
+ANY_BRACKET = regex_engine.compile(r'[\[\]\(\)]')
+ROUND_BRACKET = regex_engine.compile(r'[\(\)]')
+SQUARE_BRACKET = regex_engine.compile(r'[\[\]]')
+ANY_QUOTE = regex_engine.compile(r'[»“❝‘"«”❞’"]')
+CLOSING_QUOTES = '«”❞’"'
+
+def _last_newline(s, beg, end):
+    return s.rfind('\n', beg, max(beg, end))
+
+def _flat_bracket_match(s, beg, closing, stop, window):
+    """Match of a rule of the form "\\([^<stop>]*\\n[^<stop>]*\\)" at a given opening bracket (SUBSENTENCE_REGEX 0-3)
+
+    Args:
+        s (string): sentenized string
+        beg (int): position of the opening bracket
+        closing (string): closing bracket
+        stop (compiled regex): brackets that may not appear between the opening and closing bracket
+        window (int): maximum number of characters before and after the newline, None if unbounded
+
+    Returns:
+        (int, int): position of the newline and the closing bracket, None if the rule does not match
+    """
+    if window is None:
+        bracket = stop.search(s, beg + 1)
+    else:
+        bracket = stop.search(s, beg + 1, beg + 2 * window + 3)
+    if bracket is None or s[bracket.start()] != closing:
+        return None
+    end = bracket.start()
+    if window is None:
+        newline = _last_newline(s, beg + 1, end)
+    else:
+        newline = _last_newline(s, beg + 1, min(end, beg + window + 2))
+        if end - newline - 1 > window:
+            return None
+    if newline < 0:
+        return None
+    return newline, end
+
+def _nested_bracket_match(s, beg, closing, brackets, window):
+    """Match of a rule of the form "\\((?:[^\\(\\)]|\\([^\\(\\)]*\\)){0,250}\\n(?:[^\\(\\)]|\\([^\\(\\)]*\\)){0,250}\\)" at a given opening bracket.
+    Nested brackets count as a single character and the newline has to be outside of them (SUBSENTENCE_REGEX 4-5)
+
+    Args:
+        s (string): sentenized string
+        beg (int): position of the opening bracket
+        closing (string): closing bracket
+        brackets (compiled regex): opening or closing bracket
+        window (int): maximum number of characters (or nested brackets) before and after the newline
+
+    Returns:
+        (int, int): position of the newline and the closing bracket, None if the rule does not match
+    """
+    runs = [] # characters between nested brackets: start, end and number of characters before the run
+    items = 0
+    position = beg + 1
+    while True:
+        bracket = brackets.search(s, position)
+        if bracket is None:
+            return None
+        runs.append((position, bracket.start(), items))
+        items += bracket.start() - position
+        if items > 2 * window + 1:
+            return None
+        if s[bracket.start()] == closing:
+            end = bracket.start()
+            break
+        nested_close = brackets.search(s, bracket.start() + 1)
+        if nested_close is None or s[nested_close.start()] != closing:
+            return None
+        items += 1
+        position = nested_close.end()
+    for run_beg, run_end, items_before in reversed(runs):
+        newline = _last_newline(s, run_beg, min(run_end, run_beg + window - items_before + 1))
+        if newline >= 0:
+            if items - items_before - (newline - run_beg) - 1 > window:
+                return None
+            return newline, end
+    return None
+
+def _quote_match(s, beg, window):
+    """Match of the quotation rule at a given opening quote (SUBSENTENCE_REGEX 6)
+
+    Args:
+        s (string): sentenized string
+        beg (int): position of the opening quote
+        window (int): maximum number of characters before and after the newline
+
+    Returns:
+        (int, int): position of the newline and the closing quote, None if the rule does not match
+    """
+    limit = beg + window + 2
+    next_quote = ANY_QUOTE.search(s, beg + 1, limit)
+    newline = _last_newline(s, beg + 1, limit if next_quote is None else next_quote.start())
+    if newline < 0:
+        return None
+    limit = newline + window + 2
+    bracket = ROUND_BRACKET.search(s, newline + 1, limit)
+    end = max(s.rfind(c, newline + 1, limit if bracket is None else bracket.start()) for c in CLOSING_QUOTES)
+    if end < 0:
+        return None
+    return newline, end
+
+def _subsentence_newlines(s, opening, match_at, *args):
+    """Positions of the newlines a rule replaces, matches are searched from left to right without overlap like re.finditer
+
+    Args:
+        s (string): sentenized string
+        opening (compiled regex): first character of a match
+        match_at (function): returns the newline and end of a match at a given position or None
+
+    Returns:
+        list: positions of newlines to replace
+    """
+    newlines = []
+    beg = opening.search(s)
+    while beg is not None:
+        match = match_at(s, beg.start(), *args)
+        if match is None:
+            beg = opening.search(s, beg.start() + 1)
+        else:
+            newlines.append(match[0])
+            beg = opening.search(s, match[1] + 1)
+    return newlines
+
+def _replace_newlines(s, newlines):
+    """Replace newlines at the given positions by spaces
+
+    Args:
+        s (string): string
+        newlines (list): sorted positions of newlines
+
+    Returns:
+        string: string with replaced newlines
+    """
+    if not newlines:
+        return s
+    segments = []
+    position = 0
+    for newline in newlines:
+        segments.append(s[position:newline])
+        position = newline + 1
+    segments.append(s[position:])
+    return ' '.join(segments)
+
+def rejoin_subsentences(s):
+    """Rejoin splits inside of brackets and quotations, same result as applying SUBSENTENCE_REGEX but in linear time
+
+    Args:
+        s (string): sentenized string
+
+    Returns:
+        string: string with rejoined sentences
+    """
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[0], _flat_bracket_match, ')', ANY_BRACKET, None))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[1], _flat_bracket_match, ']', ANY_BRACKET, None))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[2], _flat_bracket_match, ')', ROUND_BRACKET, SUBSENTENCE_WINDOW))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[3], _flat_bracket_match, ']', SQUARE_BRACKET, SUBSENTENCE_WINDOW))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[4], _nested_bracket_match, ')', ROUND_BRACKET, SUBSENTENCE_WINDOW))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[5], _nested_bracket_match, ']', SQUARE_BRACKET, SUBSENTENCE_WINDOW))
+    s = _replace_newlines(s, _subsentence_newlines(s, SUBSENTENCE_OPENING[6], _quote_match, SUBSENTENCE_WINDOW))
+    return s
+
 def _boundary_gen(text, regex):
     for match in regex.finditer(text):
         yield match.span()
@@ -117,16 +356,50 @@ def sentenize(s):
     Returns:
         string: sentenized string
     """
-    s = apply_regex_list(s, NORM_REGEX)
+    s = apply_regex_list(s, NORM_STAGES)
     offsets = [o for o in _boundary_gen(s, SPLIT_REGEX)]
     s = '\n'.join((s[o[0]:o[1]] for o in offsets))
-    s = apply_regex_list(s, REFINED_SPLIT_REGEX)
-    s = apply_regex_list(s, SUBSENTENCE_REGEX)
-    s = apply_regex_list(s, RECOMBINE_REGEX)
-    s = apply_regex_list(s, SPLIT_ENUM_REGEX)
+    s = apply_guarded_regex_list(s, REFINED_SPLIT_STAGES, REFINED_SPLIT_STAGE_TRIGGERS, 'refined_split')
+    s = rejoin_subsentences(s)
+    s = apply_guarded_regex_list(s, RECOMBINE_STAGES, RECOMBINE_STAGE_TRIGGERS, 'recombine')
+    s = apply_guarded_regex_list(s, SPLIT_ENUM_STAGES, SPLIT_ENUM_STAGE_TRIGGERS, 'split_enum')
 
     return s
 
+def sentence_spans(s):
+    """Offsets of the sentences in a sentenized string (one sentence per line), empty lines are skipped
+
+    Args:
+        s (string): sentenized string
+
+    Returns:
+        array: unsigned integers, start and end offset of each sentence one after another
+    """
+    spans = array('I')
+    beg = 0
+    while beg < len(s):
+        end = s.find('\n', beg)
+        if end < 0:
+            end = len(s)
+        if end > beg:
+            spans.append(beg)
+            spans.append(end)
+        beg = end + 1
+    return spans
+
+def sentenize_spans(s):
+    """Sentenize a string and return the sentence boundaries instead of individual sentence strings.
+    Sentence i is s[spans[2*i]:spans[2*i+1]] of the returned string.
+
+    Args:
+        s (string): string to sentenize
+
+    Returns:
+        string, array: sentenized string and start and end offset of each sentence (see sentence_spans)
+    """
+    s = sentenize(s)
+    return s, sentence_spans(s)
+
 def sentenize_with_index(s):
     """Sentenizes a string but remember at what position a change is made
 
@@ -144,10 +417,10 @@ def sentenize_with_index(s):
         for match in reversed(list(regex_matches)):
             indices.append(match.span(1)[1])
     s = apply_regex_list(s, REFINED_SPLIT_REGEX_CHANGE_LENGTH)
-    s = apply_regex_list(s, REFINED_SPLIT_REGEX_KEEP_LENGTH)
-    s = apply_regex_list(s, SUBSENTENCE_REGEX)
-    s = apply_regex_list(s, RECOMBINE_REGEX)
-    s = apply_regex_list(s, SPLIT_ENUM_REGEX_KEEP_LENGTH)
+    s = apply_guarded_regex_list(s, REFINED_SPLIT_REGEX_KEEP_LENGTH, REFINED_SPLIT_TRIGGERS[:len(REFINED_SPLIT_REGEX_KEEP_LENGTH)], 'refined_split')
+    s = rejoin_subsentences(s)
+    s = apply_guarded_regex_list(s, RECOMBINE_STAGES, RECOMBINE_STAGE_TRIGGERS, 'recombine')
+    s = apply_guarded_regex_list(s, SPLIT_ENUM_REGEX_KEEP_LENGTH, SPLIT_ENUM_TRIGGERS[:len(SPLIT_ENUM_REGEX_KEEP_LENGTH)], 'split_enum')
     for r, t in SPLIT_ENUM_REGEX_CHANGE_LENGTH:
         regex_matches = r.finditer(s)
         for match in reversed(list(regex_matches)):
@@ -155,19 +428,157 @@ def sentenize_with_index(s):
     s = apply_regex_list(s, SPLIT_ENUM_REGEX_CHANGE_LENGTH)
     return s, indices
 
+def _insertion_edits(groups, char='\n'):
+    """Edits for characters inserted by a sequence of rules
+
+    Args:
+        groups (list): for each rule the positions it inserts a character at, in the string after all previous rules
+        char (str, optional): inserted character. Defaults to '\n'.
+
+    Returns:
+        list: edits (position, position, char) with positions in the string before the first rule
+    """
+    inserted = []
+    for positions in groups:
+        # current position of each inserted character
+        shifted = [pos + k for k, pos in enumerate(inserted)]
+        inserted = sorted(inserted + [pos - bisect_left(shifted, pos) for pos in positions])
+    return [(pos, pos, char) for pos in inserted]
+
+def _apply_insertion_rules(s, regex, groups):
+    """Apply rules that insert a newline at the end of their first group and collect the insertion positions
+
+    Args:
+        s (string): string to transform
+        regex (list): tuples of regular expressions and replacements
+        groups (list): positions of each rule are appended
+
+    Returns:
+        string: transformed string
+    """
+    for r, t in regex:
+        groups.append([match.end(1) for match in r.finditer(s)])
+        s = r.sub(t, s)
+    return s
+
+def sentenize_with_edits(s):
+    """Sentenizes a string as sentenize_with_index and report the changes as edits (see document.Document)
+
+    Args:
+        s (string): string to sentenize
+
+    Returns:
+        string: sentenized string
+        list: edits (beg, end, replacement) for whitespace dropped between sentences and inserted newlines
+    """
+    document = Document(s)
+    offsets = [o for o in _boundary_gen(s, SPLIT_REGEX)]
+    edits = []
+    last = 0
+    for idx, (beg, end) in enumerate(offsets):
+        separator = '\n' if idx else ''
+        if beg - last != len(separator):
+            edits.append((last, beg, separator))
+        last = end
+    if last < len(s):
+        edits.append((last, len(s), ''))
+    s = '\n'.join((s[o[0]:o[1]] for o in offsets))
+    document.edit('split', s, edits)
+
+    groups = []
+    s = _apply_insertion_rules(s, REFINED_SPLIT_REGEX_CHANGE_LENGTH, groups)
+    s = apply_guarded_regex_list(s, REFINED_SPLIT_REGEX_KEEP_LENGTH, REFINED_SPLIT_TRIGGERS[:len(REFINED_SPLIT_REGEX_KEEP_LENGTH)], 'refined_split')
+    s = rejoin_subsentences(s)
+    s = apply_guarded_regex_list(s, RECOMBINE_STAGES, RECOMBINE_STAGE_TRIGGERS, 'recombine')
+    s = apply_guarded_regex_list(s, SPLIT_ENUM_REGEX_KEEP_LENGTH, SPLIT_ENUM_TRIGGERS[:len(SPLIT_ENUM_REGEX_KEEP_LENGTH)], 'split_enum')
+    s = _apply_insertion_rules(s, SPLIT_ENUM_REGEX_CHANGE_LENGTH, groups)
+    document.edit('insert', s, _insertion_edits(groups))
+    return s, document.edit_log()
+
+# whitespace runs that normalize may change: everything but single spaces between two words
+NORM_WHITESPACE_RUN = regex_engine.compile(r'\s{2,}|[^\S ]|^ | $')
+NORM_MULTI_SPACES = regex_engine.compile(r'[ \u200a]{2,}')
+
+def _normalize_whitespace_run(w, at_start, at_end):
+    """Result of applying NORM_REGEX to a maximal run of whitespace
+
+    Args:
+        w (string): whitespace run
+        at_start (bool): run is at the beginning of the string
+        at_end (bool): run is at the end of the string
+
+    Returns:
+        string: normalized run
+    """
+    newline = w.find('\n')
+    if newline >= 0:
+        # everything after the first newline is dropped, spaces before it are trailing spaces
+        head = w[:newline].rstrip(' ')
+        tail = '\n'
+    else:
+        head = w
+        tail = ''
+        if at_end:
+            head = head.rstrip(' ')
+    if at_start:
+        head = head.lstrip(' ')
+        if not head:
+            tail = ''
+    return NORM_MULTI_SPACES.sub(' ', head) + tail
+
+def _changed_part(w, replacement, beg):
+    """Reduce a replacement to the part that actually changed by dropping the common prefix and suffix
+
+    Args:
+        w (string): original string
+        replacement (string): replacement
+        beg (int): position of w
+
+    Returns:
+        list: [string, replacement, start_ind, end_ind]
+    """
+    prefix = 0
+    while prefix < len(w) and prefix < len(replacement) and w[prefix] == replacement[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < len(w) - prefix and suffix < len(replacement) - prefix and w[-suffix-1] == replacement[-suffix-1]:
+        suffix += 1
+    return [w[prefix:len(w)-suffix], replacement[prefix:len(replacement)-suffix], beg + prefix, beg + len(w) - suffix]
+
 def normalize(s):
-    """Whitespace normalize a string
+    """Whitespace normalize a string, same result as applying NORM_REGEX but in a single pass over the string
 
     Args:
         s (string): string to normalize
 
     Returns:
-        string: whitespace normalized string
+        string, list: whitespace normalized string and replacements [string, replacement, start_ind, end_ind] from the end to the beginning of the string
     """
     replacement_length = []
-    for r, t in NORM_REGEX:
-        regex_matches = r.finditer(s)
-        for match in reversed(list(regex_matches)):
-            s = s[:match.span(0)[0]] + t + s[match.span(0)[1]:]
-            replacement_length.append([match.group(0), t, match.span(0)[0], match.span(0)[1]])
-    return s, replacement_length
+    segments = []
+    position = 0
+    for match in NORM_WHITESPACE_RUN.finditer(s):
+        beg, end = match.span()
+        w = match.group(0)
+        replacement = _normalize_whitespace_run(w, beg == 0, end == len(s))
+        if replacement != w:
+            segments.append(s[position:beg])
+            segments.append(replacement)
+            position = end
+            replacement_length.append(_changed_part(w, replacement, beg))
+    segments.append(s[position:])
+    replacement_length.reverse()
+    return ''.join(segments), replacement_length
+
+def normalize_with_edits(s):
+    """Whitespace normalize a string as normalize and report the changes as edits (see document.Document)
+
+    Args:
+        s (string): string to normalize
+
+    Returns:
+        string: whitespace normalized string
+        list: edits (beg, end, replacement) from the beginning to the end of the string
+    """
+    s, replacement_length = normalize(s)
+    return s, [(beg, end, replacement) for _, replacement, beg, end in reversed(replacement_length)]
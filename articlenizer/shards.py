@@ -0,0 +1,238 @@
+"""Corpus output in a few large shards instead of one file per article.
+
+Records are written as JSON lines, each with the key of its article (e.g. the input path), into shards of about
+max_bytes (on disk, after compression). Shards are compressed with gzip or, if the zstandard package is installed, zstd.
+Every process writes its own shards, named <prefix>-<run>-<process id>-<number>, so parallel workers never write
+to the same file. A writer that is passed to a pool of processes is unpickled once per worker: all chunks of a worker
+write to the same open shard, which is closed when the worker exits. Records are buffered by the compressor until
+their shard is closed, so anything that depends on them being written (e.g. manifest entries) is deferred with
+call_when_written.
+iter_shards reads the records of all shards lazily, a shard that was cut off by a crash is read up to its last
+complete record. A key that was written again by a later (incremental) run is only read from its last record.
+"""
+
+import os
+import io
+import json
+import gzip
+import time
+from pathlib import Path
+from multiprocessing import util
+
+from articlenizer import profiling
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# errors raised when a compressed shard ends in the middle of a gzip member or zstd frame
+TRUNCATED_ERRORS = (EOFError,) if zstandard is None else (EOFError, zstandard.ZstdError)
+
+SUFFIXES = {
+    None: '.jsonl',
+    'gzip': '.jsonl.gz',
+    'zstd': '.jsonl.zst'
+}
+
+def _open_shard(path, compression, mode):
+    """Open a shard for appending ('ab') or reading ('rb')"""
+    raw = open(path, mode)
+    if compression == 'gzip':
+        return raw, gzip.GzipFile(fileobj=raw, mode=mode, compresslevel=6)
+    if compression == 'zstd':
+        if mode == 'rb':
+            return raw, zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+        return raw, zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    return raw, raw
+
+_PROCESS_WRITERS = {} # writers unpickled in a worker process, shared by all chunks of the worker
+
+def _process_writer(state):
+    """Writer of the current process for a pickled ShardWriter, created on the first call and closed when the process exits"""
+    key = (os.getpid(), state['out_path'], state['prefix'], state['run'])
+    writer = _PROCESS_WRITERS.get(key)
+    if writer is None:
+        writer = ShardWriter.__new__(ShardWriter)
+        writer.__dict__.update(state)
+        writer.shared = True
+        _PROCESS_WRITERS[key] = writer
+        util.Finalize(writer, writer.close, exitpriority=0)
+    return writer
+
+class ShardWriter():
+    """Writes records to size bounded shards in an output directory.
+    """
+    def __init__(self, out_path, prefix='part', max_bytes=256 * 1024 * 1024, compression=None):
+        """Set up a writer, files are only created when records are written
+
+        Args:
+            out_path (string or PosixPath): output directory
+            prefix (str, optional): name prefix of the shards. Defaults to 'part'.
+            max_bytes (int, optional): size of a shard on disk at which the next one is started. Defaults to 256 MB.
+            compression (string, optional): None, 'gzip' or 'zstd'. Defaults to None.
+        """
+        if compression not in SUFFIXES:
+            raise(RuntimeError("Unknown compression: {}".format(compression)))
+        if compression == 'zstd' and zstandard is None:
+            raise(RuntimeError("zstd compression requires the zstandard package."))
+        self.out_path = Path(out_path)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.run = '{:x}'.format(time.time_ns())
+        self.shared = False
+        self._raw = None
+        self._file = None
+        self._pending = []
+
+    def __reduce__(self):
+        state = dict(self.__dict__)
+        state['_raw'] = None
+        state['_file'] = None
+        state['_pending'] = []
+        return _process_writer, (state,)
+
+    def _next_shard(self):
+        """Last shard of this process if it has space left, otherwise a new one"""
+        pattern = '{}-{}-{}-*{}'.format(self.prefix, self.run, os.getpid(), SUFFIXES[self.compression])
+        shards = sorted(self.out_path.glob(pattern))
+        if shards and shards[-1].stat().st_size < self.max_bytes:
+            return shards[-1]
+        return self.out_path / '{}-{}-{}-{:05d}{}'.format(self.prefix, self.run, os.getpid(), len(shards), SUFFIXES[self.compression])
+
+    def write(self, key, record):
+        """Write a record
+
+        Args:
+            key (string): key of the article (e.g. the input path)
+            record (dictionary): JSON serializable content, stored together with the key
+        """
+        if self._file is not None and self._raw.tell() >= self.max_bytes:
+            self.close()
+        if self._file is None:
+            self._raw, self._file = _open_shard(self._next_shard(), self.compression, 'ab')
+        start = time.perf_counter()
+        line = dict(record)
+        line['key'] = key
+        line = json.dumps(line, ensure_ascii=False) + '\n'
+        self._file.write(line.encode('utf-8'))
+        profiling.add('write', time.perf_counter() - start, len(line))
+
+    def call_when_written(self, fct, *args):
+        """Call a function once all records written so far are on disk, i.e. when the current shard is closed
+
+        Args:
+            fct (function): function to call
+            *args: arguments of fct
+        """
+        if self._file is None:
+            fct(*args)
+        else:
+            self._pending.append((fct, args))
+
+    def close(self):
+        """Finish the current shard and sync it to disk, then call the functions waiting for its records (see call_when_written). Writing can continue afterwards.
+        """
+        if self._file is not None:
+            if self._raw is not self._file:
+                # writes the end of the gzip member or zstd frame, the raw file stays open
+                self._file.close()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._raw.close()
+            self._raw = None
+            self._file = None
+        pending, self._pending = self._pending, []
+        for fct, args in pending:
+            fct(*args)
+
+    def finish(self):
+        """Close the shard at the end of a list of articles, unless the writer is shared by the chunks of a worker process (see _process_writer)
+        """
+        if not self.shared:
+            self.close()
+
+def shard_compression(path):
+    """Compression of a shard, taken from its suffix
+
+    Args:
+        path (PosixPath): shard
+
+    Returns:
+        string: None, 'gzip' or 'zstd'
+    """
+    name = Path(path).name
+    for compression, suffix in SUFFIXES.items():
+        if compression is not None and name.endswith(suffix):
+            return compression
+    return None
+
+def iter_shard(path):
+    """Read the records of a shard one by one. If the shard is truncated (e.g. by a crash while it was written) a warning
+    is printed and reading stops after the last complete record.
+
+    Args:
+        path (string or PosixPath): shard
+
+    Yields:
+        dictionary: record with its key
+    """
+    compression = shard_compression(path)
+    if compression == 'zstd' and zstandard is None:
+        raise(RuntimeError("zstd compression requires the zstandard package."))
+    raw, f = _open_shard(path, compression, 'rb')
+    lines = io.BufferedReader(f) if compression == 'zstd' else f
+    try:
+        try:
+            for line in lines:
+                if not line.endswith(b'\n'):
+                    # the last record was not written completely
+                    raise EOFError(line)
+                if line.strip():
+                    yield json.loads(line.decode('utf-8'))
+        except TRUNCATED_ERRORS:
+            print(RuntimeWarning("Shard is truncated, skipping the rest of it: {}".format(path)))
+    finally:
+        f.close()
+        raw.close()
+
+def shard_paths(path, prefix='part'):
+    """Shards in a directory, in the order they are read by iter_shards
+
+    Args:
+        path (string or PosixPath): directory with the shards
+        prefix (str, optional): name prefix of the shards. Defaults to 'part'.
+
+    Returns:
+        list: paths of the shards
+    """
+    return sorted(p for p in Path(path).glob(prefix + '-*') if any(p.name.endswith(s) for s in SUFFIXES.values()))
+
+def iter_shards(path, prefix='part'):
+    """Read the records of all shards in a directory lazily, shard by shard. A key that was written more than once
+    (e.g. by a later incremental run) is only yielded with its last record, the shards are read twice record by record,
+    once to find the last record of every key and once to yield these records.
+
+    Args:
+        path (string or PosixPath): directory with the shards
+        prefix (str, optional): name prefix of the shards. Defaults to 'part'.
+
+    Yields:
+        dictionary: record with its key
+    """
+    shards = shard_paths(path, prefix)
+    last = {}
+    for shard_idx, shard in enumerate(shards):
+        for idx, record in enumerate(iter_shard(shard)):
+            last[record['key']] = (shard_idx, idx)
+    used = [set() for _ in shards]
+    for shard_idx, idx in last.values():
+        used[shard_idx].add(idx)
+    del last
+    for shard_idx, shard in enumerate(shards):
+        if not used[shard_idx]:
+            continue
+        for idx, record in enumerate(iter_shard(shard)):
+            if idx in used[shard_idx]:
+                yield record
@@ -1,7 +1,58 @@
-import re
+"""Regular expression based tokenization.
+
+TOKENIZATION_PATTERNS are tried from left to right at every position, the first one that matches gives the token.
+Where possible a pattern starts with a single character or character set, so the regex engine rejects it after
+looking at the character at the current position instead of running it. DISPATCH_REGEX additionally starts
+with TOKENIZATION_SHORTCUTS, which take plain words and numbers in one step. The output is the same as with
+the single alternation TOKENIZATION_REGEX.
+"""
+from array import array
+
+from articlenizer import regex_engine
 
 # TODO numbers such as 10,000 and stuff such as R&D
-TOKENIZATION_REGEX = re.compile(r'((?:10.1371.journal.[a-z]+.[a-z0-9\.]+)|https?\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]|ftp\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]|www\.[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*|[a-zA-Z0-9\-\.]+\.org\/[\w\/_\-\:~\?=#%]*|[a-zA-Z0-9\-\.]+\.edu\/[\w\/_\-\:~\?=#%]*|[\.0-9]+[0-9][a-zA-Z]+|v\.|ver\.|V\.|Ver\.|e\.g\.|i\.e\.|i\.v\.|[0-9]{1,3},[0-9]{3},[0-9]{3}|[0-9]{1,3},[0-9]{3}|\[[0-9\-,\?]+\]|[0-9\.]*\.[0-9]+[a-zA-Z]*|[\.0-9]+[a-zA-Z]+|[a-qs-uw-zA-QS-UW-Z]+[0-9][a-zA-Z]+|[a-qs-uw-zA-QS-UW-Z][0-9]+[a-zA-Z]?|[a-zA-Z]+&[a-zA-Z]+|[a-zA-Z]+\.[a-zA-Z]+|[a-zA-Z]+|[0-9]+|[^0-9a-zA-Z\s])')
+# in order of priority, repetitions at the start are written as 'XX*' instead of 'X+' to expose the first character
+TOKENIZATION_PATTERNS = [
+    r'10.1371.journal.[a-z]+.[a-z0-9\.]+',
+    r'https?\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]',
+    r'ftp\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]',
+    r'www\.[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*',
+    r'[a-zA-Z0-9\-\.][a-zA-Z0-9\-\.]*\.org\/[\w\/_\-\:~\?=#%]*',
+    r'[a-zA-Z0-9\-\.][a-zA-Z0-9\-\.]*\.edu\/[\w\/_\-\:~\?=#%]*',
+    r'[\.0-9][\.0-9]*[0-9][a-zA-Z]+',
+    r'v\.',
+    r'ver\.',
+    r'V\.',
+    r'Ver\.',
+    r'e\.g\.',
+    r'i\.e\.',
+    r'i\.v\.',
+    r'[0-9][0-9]{0,2},[0-9]{3},[0-9]{3}',
+    r'[0-9][0-9]{0,2},[0-9]{3}',
+    r'\[[0-9\-,\?]+\]',
+    r'[0-9\.]*\.[0-9]+[a-zA-Z]*',
+    r'[\.0-9][\.0-9]*[a-zA-Z]+',
+    r'[a-qs-uw-zA-QS-UW-Z][a-qs-uw-zA-QS-UW-Z]*[0-9][a-zA-Z]+',
+    r'[a-qs-uw-zA-QS-UW-Z][0-9]+[a-zA-Z]?',
+    r'[a-zA-Z][a-zA-Z]*&[a-zA-Z]+',
+    r'[a-zA-Z][a-zA-Z]*\.[a-zA-Z]+',
+    r'[a-zA-Z]+',
+    r'[0-9]+',
+    r'[^0-9a-zA-Z\s]'
+]
+
+# A word (number) that is not followed by a character continuing a URL, domain, version, abbreviation or
+# number would only be matched by the '[a-zA-Z]+' ('[0-9]+') pattern, the other patterns starting with
+# a letter (digit) need one of the excluded characters after the first run of letters (digits).
+# The run itself is excluded as well, so the shortcut cannot backtrack into a shorter run (e.g. 'worke' of 'worked').
+# The DOI pattern accepts any character between its parts (e.g. '10/1371/journal/...'), so numbers starting one are left to it.
+TOKENIZATION_SHORTCUTS = [
+    r'[a-zA-Z][a-zA-Z]*(?![a-zA-Z0-9&\.\-\:])',
+    r'(?!10.1371.journal.)[0-9][0-9]*(?![0-9a-zA-Z\.,\-])'
+]
+
+TOKENIZATION_REGEX = regex_engine.compile(r'(' + r'|'.join(TOKENIZATION_PATTERNS) + r')')
+DISPATCH_REGEX = regex_engine.compile(r'(' + r'|'.join(TOKENIZATION_SHORTCUTS + TOKENIZATION_PATTERNS) + r')')
 
 def tokenize(line):
     """Tokenize a string based on a regular expression
@@ -12,4 +63,35 @@ def tokenize(line):
     Returns:
         list of string: list of individual tokens
     """
-    return [t for t in TOKENIZATION_REGEX.split(line) if t]
\ No newline at end of file
+    return [t for t in DISPATCH_REGEX.split(line) if t]
+
+def tokenize_spans(text, start=0, end=None):
+    """Tokenize a part of a string without creating the token strings.
+    The result matches tokenize(text[start:end]) without the whitespace tokens, token i is text[spans[2*i]:spans[2*i+1]].
+
+    Args:
+        text (string): string to tokenize, usually the whole document
+        start (int, optional): index to start tokenizing at. Defaults to 0.
+        end (int, optional): index to stop tokenizing at. Defaults to None (end of the string).
+
+    Returns:
+        array: unsigned integers, start and end offset of each token one after another (relative to text)
+    """
+    if end is None:
+        end = len(text)
+    spans = array('I')
+    for m in DISPATCH_REGEX.finditer(text, start, end):
+        spans.extend(m.span())
+    return spans
+
+def span_tokens(text, spans):
+    """Create the token strings for token offsets
+
+    Args:
+        text (string): tokenized string
+        spans (array): start and end offset of each token one after another (result of tokenize_spans)
+
+    Returns:
+        list of string: list of individual tokens
+    """
+    return [text[beg:end] for beg, end in zip(spans[::2], spans[1::2])]
@@ -1,5 +1,8 @@
+import re
 import argparse
 
+from articlenizer import regex_engine
+
 def apply_regex_list(s, regex):
     """Substitute list of given regex in a string
 
@@ -14,6 +17,211 @@ def apply_regex_list(s, regex):
         s = r.sub(t, s)
     return s
 
+class RuleStatistics():
+    """Counts for each rule of a guarded regex list how often it was applied, how often it changed the string 
+    and how often the pass was skipped because none of its trigger literals was present.
+    """
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, name, idx, applied, changed):
+        """Count a single rule application
+
+        Args:
+            name (string): name of the rule list
+            idx (int): index of the rule in the list
+            applied (bool): whether the rule was applied or skipped
+            changed (bool): whether the rule matched
+        """
+        counts = self.counts.setdefault((name, idx), [0, 0, 0])
+        if applied:
+            counts[0] += 1
+        else:
+            counts[2] += 1
+        if changed:
+            counts[1] += 1
+
+    def merge(self, other):
+        """Add the counts of another RuleStatistics object (e.g. from a different process)
+
+        Args:
+            other (RuleStatistics): statistics to add
+        """
+        for key, (applied, changed, skipped) in other.counts.items():
+            counts = self.counts.setdefault(key, [0, 0, 0])
+            counts[0] += applied
+            counts[1] += changed
+            counts[2] += skipped
+
+    def skipped(self):
+        """Total number of skipped passes
+
+        Returns:
+            int: number of rule passes that were skipped
+        """
+        return sum(c[2] for c in self.counts.values())
+
+    def report(self):
+        """Summary table of all counted rules
+
+        Returns:
+            string: one line per rule with the number of applied, matching and skipped passes
+        """
+        lines = ['{:<20} {:>4} {:>10} {:>10} {:>10}'.format('rules', 'idx', 'applied', 'matched', 'skipped')]
+        for (name, idx), (applied, changed, skipped) in sorted(self.counts.items()):
+            lines.append('{:<20} {:>4} {:>10} {:>10} {:>10}'.format(name, idx, applied, changed, skipped))
+        total = sum(c[0] + c[2] for c in self.counts.values())
+        lines.append('{} of {} passes skipped'.format(self.skipped(), total))
+        return '\n'.join(lines)
+
+RULE_STATISTICS = RuleStatistics()
+
+def _contains_any(s, literals, present):
+    for literal in literals:
+        if literal not in present:
+            present[literal] = literal in s
+        if present[literal]:
+            return True
+    return False
+
+def apply_guarded_regex_list(s, regex, triggers, name, statistics=RULE_STATISTICS):
+    """Substitute list of given regex in a string, but skip rules that cannot match. 
+    A rule is only applied if one of its trigger literals appears in the string. Each literal is looked up once 
+    and only looked up again after a rule changed the string.
+
+    Args:
+        s (string): string in which subsitutions are made
+        regex (list): tuples of regular expressions and replacements
+        triggers (list): for each rule a list of literals one of which has to be present for the rule to match, None to always apply the rule
+        name (string): name of the rule list in the statistics
+        statistics (RuleStatistics, optional): where to count applied and skipped rules. Defaults to RULE_STATISTICS.
+
+    Returns:
+        string: transformed string
+    """
+    present = {}
+    for idx, ((r, t), literals) in enumerate(zip(regex, triggers)):
+        if literals is not None and not _contains_any(s, literals, present):
+            statistics.add(name, idx, False, False)
+            continue
+        s, changes = r.subn(t, s)
+        statistics.add(name, idx, True, changes > 0)
+        if changes:
+            present = {}
+    return s
+
+NAMED_GROUP = re.compile(r'\(\?P<\w+>')
+BACK_REFERENCE = re.compile(r'\(\?P=|\\[1-9]')
+
+def fuse_regex_list(regex):
+    """Merge a list of regular expressions in a single pattern with one named alternative per rule. 
+    The replacement is dispatched by the alternative that matched, so the text is only scanned once. 
+    This is only equivalent to apply_regex_list if the rules do not interact, i.e. their matches do not overlap and no replacement creates or destroys a match of another rule. 
+
+    Args:
+        regex (list): tuples of regular expressions and replacements
+
+    Returns:
+        (compiled regex, function): fused regular expression and replacement function 
+    """
+    alternatives = []
+    for idx, (r, _) in enumerate(regex):
+        if BACK_REFERENCE.search(r.pattern) is not None:
+            raise(RuntimeError("Rules with back references cannot be fused: {}".format(r.pattern)))
+        # group names of different rules would collide, groups are resolved on the original rule instead
+        alternatives.append('(?P<_rule{}>{})'.format(idx, NAMED_GROUP.sub('(?:', r.pattern)))
+    fused = regex_engine.compile(r'|'.join(alternatives))
+    rules = {'_rule{}'.format(idx): rule for idx, rule in enumerate(regex)}
+
+    def replace(match):
+        r, t = rules[match.lastgroup]
+        return r.match(match.string, match.start()).expand(t)
+
+    return fused, replace
+
+def compile_regex_stages(regex, groups, fuse=True):
+    """Compile a list of regular expressions in stages, each stage fuses a group of consecutive rules (see fuse_regex_list). 
+    The result can be used in place of the original list in apply_regex_list. 
+
+    Args:
+        regex (list): tuples of regular expressions and replacements
+        groups (list of lists): indices of the rules in each stage, all rules have to be covered in their original order 
+        fuse (bool, optional): fuse the groups, otherwise the groups are only validated and the rules are returned unchanged. Defaults to True.
+
+    Returns:
+        list: tuples of regular expressions and replacements (strings or functions)
+    """
+    if [idx for group in groups for idx in group] != list(range(len(regex))):
+        raise(RuntimeError("Stages have to cover all rules in order: {}".format(groups)))
+    if not fuse:
+        return list(regex)
+    stages = []
+    for group in groups:
+        if len(group) == 1:
+            stages.append(regex[group[0]])
+        else:
+            stages.append(fuse_regex_list([regex[idx] for idx in group]))
+    return stages
+
+def compile_stage_triggers(triggers, groups, fuse=True):
+    """Trigger literals of the stages compiled by compile_regex_stages, a stage is triggered by the literals of all its rules
+
+    Args:
+        triggers (list): trigger literals of each rule (see apply_guarded_regex_list)
+        groups (list of lists): indices of the rules in each stage
+        fuse (bool, optional): whether the stages are fused. Defaults to True.
+
+    Returns:
+        list: trigger literals of each stage
+    """
+    if len(triggers) != sum(len(group) for group in groups):
+        raise(RuntimeError("Trigger literals have to be given for all rules: {}".format(triggers)))
+    if not fuse:
+        return list(triggers)
+    stage_triggers = []
+    for group in groups:
+        if any(triggers[idx] is None for idx in group):
+            stage_triggers.append(None)
+        else:
+            stage_triggers.append([literal for idx in group for literal in triggers[idx]])
+    return stage_triggers
+
+class Vocabulary():
+    """Growable mapping of token strings to consecutive integer ids, vocabulary[i] is the token with id i.
+    """
+    def __init__(self, tokens=()):
+        self.index = {}
+        self.tokens = []
+        self.intern(tokens)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, idx):
+        return self.tokens[idx]
+
+    def __contains__(self, token):
+        return token in self.index
+
+    def intern(self, tokens):
+        """Ids of a sequence of tokens, unknown tokens are added to the vocabulary
+
+        Args:
+            tokens (iterable): token strings
+
+        Returns:
+            list: integer id of each token
+        """
+        index = self.index
+        ids = []
+        for t in tokens:
+            idx = index.get(t)
+            if idx is None:
+                idx = index[t] = len(self.tokens)
+                self.tokens.append(t)
+            ids.append(idx)
+        return ids
+
 def chunk_list(seq, num):
     """Divide a list in num equal chunks
 
@@ -0,0 +1,68 @@
+"""Benchmark the abbreviation recombination rule of the sentenizer with a flat alternation of ABBREVIATIONS and with the trie ordered pattern of AbbreviationMatcher.
+The list of abbreviations is extended with generated domain specific abbreviations to simulate a larger list.
+
+Run with:
+    python benchmarks/benchmark_abbreviations.py
+"""
+import re
+import random
+import string
+import time
+
+from articlenizer import ABBREVIATIONS
+from articlenizer.abbreviations import AbbreviationMatcher
+
+SENTENCE = 'Cells were incubated for 2 h at 37 °C as described by Smith et al.\nThe supernatant was removed, e.g.\nby centrifugation, and approx.\n5 ml of buffer were added to the sample.\n'
+
+def extended_abbreviations(factor=10, seed=0):
+    """Extend ABBREVIATIONS by generated abbreviations such as 'Subsp.' or 'temp.'
+
+    Args:
+        factor (int, optional): size of the output relative to ABBREVIATIONS. Defaults to 10.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        list: abbreviation patterns
+    """
+    rng = random.Random(seed)
+    abbreviations = list(ABBREVIATIONS)
+    while len(abbreviations) < factor * len(ABBREVIATIONS):
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 6)))
+        if rng.random() < 0.3:
+            word = word.capitalize()
+        abbreviations.append(re.escape(word) + r'\.')
+    return abbreviations
+
+def time_sub(regex, s, repeat=3):
+    """Minimum wall time of the recombination substitution
+
+    Args:
+        regex (compiled regex): recombination rule
+        s (string): input
+        repeat (int, optional): number of runs. Defaults to 3.
+
+    Returns:
+        float, string: time in seconds and substitution result
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = regex.sub(r'\g<abbr> ', s)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best, result
+
+if __name__ == "__main__":
+    text = SENTENCE * 5000
+    for factor in [1, 10]:
+        abbreviations = extended_abbreviations(factor)
+        flat = re.compile(r'(?P<abbr> (' + r'|'.join(abbreviations) + r'))\n')
+        trie = re.compile(r'(?P<abbr> (?:' + AbbreviationMatcher(abbreviations).pattern + r'))\n')
+        t_flat, flat_result = time_sub(flat, text)
+        t_trie, trie_result = time_sub(trie, text)
+        if flat_result != trie_result:
+            raise(RuntimeError("Trie ordered pattern differs from the flat alternation."))
+        print("{} abbreviations, {} newlines".format(len(abbreviations), text.count('\n')))
+        print("\tflat alternation: {:.3f}s".format(t_flat))
+        print("\ttrie pattern:     {:.3f}s ({:.1f}x)".format(t_trie, t_flat / t_trie))
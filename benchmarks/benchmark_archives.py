@@ -0,0 +1,55 @@
+"""Benchmark parsing a .tar.gz bundle of JATS articles after unpacking it to disk (tarfile.extractall followed by
+parse_article_list, as before archives could be read directly) against parse_archive_list on the archive.
+
+Run with:
+    python benchmarks/benchmark_archives.py
+"""
+import io
+import random
+import tarfile
+import tempfile
+from pathlib import Path
+
+from articlenizer import jats_parser
+
+from common import time_function
+
+SECTION = '<sec><title>Methods {}</title><p>Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with {} mM PMSF [<xref>{}</xref>]. Protein amounts were quantified using ImageJ (NIH, see <ext-link xlink:href="http://imagej.nih.gov/ij/">ImageJ</ext-link>). Data were analysed with SPSS {}.0.</p></sec>'
+ARTICLE = '<?xml version="1.0" encoding="UTF-8"?><article xmlns:xlink="http://www.w3.org/1999/xlink" xml:lang="en"><front><article-meta><article-id pub-id-type="pmc">{}</article-id><abstract><p>Abstract {}.</p></abstract></article-meta></front><body>{}</body></article>'
+
+def make_archive(path, n_articles, seed=0):
+    """A PMC style bundle, articles in one directory per journal"""
+    rng = random.Random(seed)
+    with tarfile.open(path, mode='w:gz') as tar_file:
+        for idx in range(n_articles):
+            sections = ''.join(SECTION.format(*(rng.randint(1, 99) for _ in range(4))) for _ in range(rng.randint(3, 12)))
+            data = ARTICLE.format(idx, idx, sections).encode('utf-8')
+            info = tarfile.TarInfo('journal{}/PMC{}.nxml'.format(idx % 20, idx))
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+
+def unpack_and_parse(archive, tmp_path):
+    unpacked = tmp_path / 'unpacked'
+    with tarfile.open(archive) as tar_file:
+        tar_file.extractall(unpacked)
+    jobs = []
+    for p in unpacked.rglob('*.nxml'):
+        out_name = tmp_path / 'out_unpacked' / p.relative_to(unpacked).with_suffix('.txt')
+        out_name.parent.mkdir(parents=True, exist_ok=True)
+        jobs.append([p, out_name])
+    return jats_parser.parse_article_list(jobs)
+
+def parse_archive(archive, tmp_path):
+    return jats_parser.parse_archive_list([[archive, tmp_path / 'out_archive']])
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir)
+        archive = tmp_path / 'bundle.tar.gz'
+        make_archive(archive, 5000)
+        t_unpack, _ = time_function(unpack_and_parse, archive, tmp_path)
+        t_archive, _ = time_function(parse_archive, archive, tmp_path)
+        for p in (tmp_path / 'out_unpacked').rglob('*.txt'):
+            assert p.read_text() == (tmp_path / 'out_archive' / p.relative_to(tmp_path / 'out_unpacked')).read_text()
+        print('5000 articles, archive {:.1f} MB'.format(archive.stat().st_size / 1e6))
+        print('unpack and parse {:.2f}s, parse from archive {:.2f}s'.format(t_unpack, t_archive))
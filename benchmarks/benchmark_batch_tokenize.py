@@ -0,0 +1,47 @@
+"""Benchmark the memory held by tokenized sentences as lists of token strings against the integer ids of tokenize_batch.
+
+Run with:
+    python benchmarks/benchmark_batch_tokenize.py
+"""
+import time
+import tracemalloc
+
+from articlenizer import articlenizer, sentenize
+
+from common import PARAGRAPH
+
+def token_lists(sentences):
+    return [articlenizer.tokenize_text(sentence, correct=False) for sentence in sentences]
+
+def token_ids(sentences):
+    return articlenizer.tokenize_batch(sentences, correct=False)
+
+def measure(fct, sentences):
+    """Wall time of calling fct(sentences) and memory still allocated for the result of a second, traced call
+
+    Args:
+        fct (function): function to measure
+        sentences (list): sentence strings
+
+    Returns:
+        float, int, result: time in seconds, allocated bytes and return value
+    """
+    start = time.perf_counter()
+    result = fct(sentences)
+    duration = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fct(sentences)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, size, result
+
+if __name__ == "__main__":
+    # distinct sentence strings, as in a real corpus
+    sentences = ['{} {}'.format(sentence, i) for i in range(5000) for sentence in sentenize.sentenize(PARAGRAPH).split('\n')]
+    t_lists, size_lists, lists = measure(token_lists, sentences)
+    del lists
+    t_ids, size_ids, (ids, offsets, vocabulary) = measure(token_ids, sentences)
+    print("{} sentences, {} tokens, vocabulary of {}".format(len(sentences), len(ids), len(vocabulary)))
+    print("token lists: {:.3f}s, {:.1f} MB ({:.1f} bytes per token)".format(t_lists, size_lists / 1e6, size_lists / len(ids)))
+    print("token ids:   {:.3f}s, {:.1f} MB ({:.1f} bytes per token)".format(t_ids, size_ids / 1e6, size_ids / len(ids)))
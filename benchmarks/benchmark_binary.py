@@ -0,0 +1,73 @@
+"""Benchmark reading a preprocessed corpus for training, from .prepro.txt outputs (split every line and look up the
+token ids, as every epoch had to before) and from the memory mapped binary corpus, for a full pass over all sentences
+and for random access to single sentences.
+
+Run with:
+    python benchmarks/benchmark_binary.py
+"""
+import random
+import tempfile
+from pathlib import Path
+
+from articlenizer import articlenizer
+from articlenizer.binary import BinaryCorpus, BinaryCorpusWriter, output_documents, split_line
+
+from common import random_paragraphs, time_function
+
+def make_outputs(path, n_articles, seed=0):
+    """.prepro.txt outputs of a few paragraphs each"""
+    rng = random.Random(seed)
+    for idx in range(n_articles):
+        text = random_paragraphs(rng, rng.randint(2, 10), max_value=9999)
+        with (path / 'article{}.prepro.txt'.format(idx)).open(mode='w') as f:
+            for sentence in articlenizer.get_tokenized_sentences(text):
+                f.write(' '.join(sentence) + '\n')
+
+def text_epoch(path, vocabulary):
+    n_tokens = 0
+    for out_name in sorted(path.glob('*.prepro.txt')):
+        with out_name.open(mode='r') as f:
+            for line in f:
+                ids = [vocabulary[t] for t in split_line(line.rstrip('\n'))]
+                n_tokens += len(ids)
+    return n_tokens
+
+def binary_epoch(corpus):
+    n_tokens = 0
+    for idx in range(corpus.n_sentences):
+        ids = corpus.sentence_ids(idx).tolist()
+        n_tokens += len(ids)
+    return n_tokens
+
+def text_random_access(path, sentence_index, picks):
+    """Random sentences from text outputs, sentence_index holds file and line of every sentence"""
+    return [split_line((path / sentence_index[i][0]).read_text().split('\n')[sentence_index[i][1]]) for i in picks]
+
+def binary_random_access(corpus, picks):
+    return [corpus.sentence(i) for i in picks]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_path = Path(tmp_dir) / 'out'
+        out_path.mkdir()
+        make_outputs(out_path, 2000)
+        writer = BinaryCorpusWriter(Path(tmp_dir) / 'corpus')
+        sentence_index = []
+        for key, sentences, _ in output_documents(out_path):
+            writer.add_document(key, sentences)
+            sentence_index.extend((key + '.prepro.txt', line) for line in range(len(sentences)))
+        writer.close()
+        corpus = BinaryCorpus(Path(tmp_dir) / 'corpus')
+        vocabulary = corpus.vocabulary.index
+        print('{} documents, {} sentences, {} tokens'.format(len(corpus), corpus.n_sentences, corpus.meta['n_tokens']))
+
+        t_text, n_text = time_function(text_epoch, out_path, vocabulary, repeat=3)
+        t_binary, n_binary = time_function(binary_epoch, corpus, repeat=3)
+        assert n_text == n_binary
+        print('epoch: text {:.3f}s, binary {:.3f}s'.format(t_text, t_binary))
+
+        picks = random.Random(1).choices(range(corpus.n_sentences), k=5000)
+        t_text, text_sentences = time_function(text_random_access, out_path, sentence_index, picks, repeat=3)
+        t_binary, binary_sentences = time_function(binary_random_access, corpus, picks, repeat=3)
+        assert text_sentences == binary_sentences
+        print('5000 random sentences: text {:.3f}s, binary {:.3f}s'.format(t_text, t_binary))
@@ -0,0 +1,47 @@
+"""Benchmark get_tokenized_sentences with the paragraph cache on a corpus in which every article ends with the same
+boilerplate paragraphs and part of the articles appear twice (e.g. in two dumps), without cache, with an empty cache
+and with a filled cache.
+
+Run with:
+    python benchmarks/benchmark_cache.py
+"""
+import os
+import random
+import tempfile
+
+from articlenizer import articlenizer
+from articlenizer.cache import ParagraphCache
+
+from common import random_paragraphs, time_function
+
+TEMPLATE = 'Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with {} mM PMSF. Lysates were cleared by centrifugation ({} min at 16,000 x g). Protein amounts were quantified using ImageJ (NIH, see Fig.\n{} and e.g. http://imagej.nih.gov/ij/). Data were analysed with SPSS {}.0 as in. [5]\n\n'
+BOILERPLATE = [
+    'Competing interests: The authors have declared that no competing interests exist.\n\n',
+    'Funding: This work was supported by the German Research Foundation (DFG). The funders had no role in study design, data collection and analysis, decision to publish, or preparation of the manuscript.\n\n',
+    'Data Availability: All relevant data are within the paper and its Supporting Information files.\n\n',
+    'Copyright: This is an open access article distributed under the terms of the Creative Commons Attribution License, which permits unrestricted use, distribution, and reproduction in any medium, provided the original author and source are credited.\n\n'
+]
+
+def make_articles(n_articles, seed=0):
+    """Articles of unique paragraphs followed by the boilerplate, a third of the articles is repeated"""
+    rng = random.Random(seed)
+    articles = []
+    for _ in range(n_articles):
+        articles.append('Methods.\n\n' + random_paragraphs(rng, rng.randint(3, 8), TEMPLATE) + ''.join(BOILERPLATE))
+    return articles + articles[:n_articles // 3]
+
+def process(articles, cache=None):
+    return [articlenizer.get_tokenized_sentences(article, cache=cache) for article in articles]
+
+if __name__ == "__main__":
+    articles = make_articles(300)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ParagraphCache(os.path.join(tmp_dir, 'cache.db'))
+        t_plain, expected = time_function(process, articles)
+        t_cold, result_cold = time_function(process, articles, cache)
+        hits = cache.hits
+        t_warm, result_warm = time_function(process, articles, cache)
+        assert result_cold == expected and result_warm == expected
+        print('{} articles, {:.1f} MB'.format(len(articles), sum(len(a) for a in articles) / 1e6))
+        print('no cache {:.2f}s, empty cache {:.2f}s ({} hits), filled cache {:.2f}s'.format(t_plain, t_cold, hits, t_warm))
+        print('cache: {} paragraphs, {:.2f} MB'.format(len(cache), cache.size() / 1e6))
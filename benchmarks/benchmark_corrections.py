@@ -0,0 +1,49 @@
+"""Benchmark corrections.correct_with_index against the sequential rule by rule implementation it replaced.
+
+Run with:
+    python benchmarks/benchmark_corrections.py
+"""
+from articlenizer import corrections
+
+from common import time_function
+
+ERRORS = 'Statistical analyses were conducted applying SPSS(IBM;Inc. Chicago, IL, USA)version 24 and R,(R Core Team)which is freely available;see [3]. Cells were lysed in RIPA Buffer(Cell Signaling)supplemented with PMSF;protease inhibitors were added afterwards.\n'
+
+def sequential_correct_with_index(s):
+    """Reference implementation: insert a space for every match of every rule by slicing the string.
+
+    Args:
+        s (string): string to correct
+
+    Returns:
+        string, positions: corrected string
+    """
+    indices = []
+    for r, t in corrections.CORRECTION_REGEX:
+        regex_matches = r.finditer(s)
+        for match in reversed(list(regex_matches)):
+            ind = match.span(2)[0]
+            s = s[:ind] + ' ' + s[ind:]
+            indices.append(ind-1)
+    return s, list(reversed(indices))
+
+def build_article(size=1000000):
+    """Build an article of a given size in characters from a paragraph with many errors
+
+    Args:
+        size (int, optional): article length in characters. Defaults to 1000000.
+
+    Returns:
+        string: article text
+    """
+    return (ERRORS * (size // len(ERRORS) + 1))[:size]
+
+if __name__ == "__main__":
+    article = build_article()
+    t_sequential, sequential_result = time_function(sequential_correct_with_index, article, repeat=1)
+    t_single_pass, single_pass_result = time_function(corrections.correct_with_index, article, repeat=3)
+    if sequential_result != single_pass_result:
+        raise(RuntimeError("Single pass correction differs from the sequential implementation."))
+    print("Article with {} characters and {} insertions".format(len(article), len(single_pass_result[1])))
+    print("sequential:  {:.3f}s".format(t_sequential))
+    print("single pass: {:.3f}s ({:.1f}x)".format(t_single_pass, t_sequential / t_single_pass))
@@ -0,0 +1,48 @@
+"""Benchmark projecting entities through the preprocessing with the alignment of a Document against replaying
+every edit for every entity, as formatting did with one replay function per preprocessing stage.
+
+Run with:
+    python benchmarks/benchmark_document.py
+"""
+from articlenizer import formatting
+
+from common import time_function
+
+SENTENCE = 'Data were analysed with SPSS 22.0 (IBM Corp., Armonk, NY)and   R 3.3.2 as in. [5] µg of  SPS௵S per (f)=∇∑ sample.\n'
+
+def replay(edits, spans):
+    """Adjust spans to a list of edits by visiting every span for every edit
+
+    Args:
+        edits (list): sorted edits (beg, end, replacement) in the raw text
+        spans (list): (beg, end) tuples in the raw text
+
+    Returns:
+        list: (beg, end) tuples in the processed text
+    """
+    spans = [list(span) for span in spans]
+    for beg, end, replacement in reversed(edits):
+        diff = len(replacement) - (end - beg)
+        for span in spans:
+            if end <= span[0] and (beg < end or beg < span[0]):
+                span[0] += diff
+                span[1] += diff
+            elif beg < span[1]:
+                span[0] = min(span[0], beg)
+                span[1] = max(span[1], end) + diff
+    return [tuple(span) for span in spans]
+
+if __name__ == "__main__":
+    for n in [200, 1000, 5000]:
+        text = SENTENCE * n
+        offset = SENTENCE.index('SPSS')
+        spans = [(i * len(SENTENCE) + offset, i * len(SENTENCE) + offset + 4) for i in range(n)]
+        t_preprocess, document = time_function(formatting.preprocess_document, text, repeat=1)
+        edits = document.edit_log()
+        t_replay, _ = time_function(replay, edits, spans, repeat=1)
+        t_alignment, projected = time_function(document.forward_spans, spans, repeat=3)
+        if [text[b:e] for b, e in spans] != [document.text[b:e] for b, e in projected]:
+            raise(RuntimeError("Projected entities do not match."))
+        print("{} characters, {} edits, {} entities, preprocessing {:.3f}s".format(len(text), len(edits), len(spans), t_preprocess))
+        print("replay edits:        {:.3f}s".format(t_replay))
+        print("document alignment:  {:.3f}s ({:.0f}x)".format(t_alignment, t_replay / t_alignment))
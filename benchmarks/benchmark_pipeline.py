@@ -0,0 +1,32 @@
+"""Benchmark processing many short texts with a Pipeline that was built once against checking the configuration
+flags for every text, and print the time spent in each stage.
+
+Run with:
+    python benchmarks/benchmark_pipeline.py
+"""
+from articlenizer import articlenizer
+from articlenizer.pipeline import Pipeline
+
+from common import time_function
+
+SENTENCE = 'Data were analysed with SPSS 22.0 (IBM Corp., Armonk, NY)and   R 3.3.2 as in. [5] µg of  SPS௵S per (f)=∇∑ sample.'
+
+def flag_checks(texts):
+    """Preprocess every text with the original sequence of flag checks and wrapper calls"""
+    results = []
+    for text in texts:
+        text = articlenizer.handle_unicode(text)
+        text = articlenizer.replace_math_equations(text)
+        text = articlenizer.switch_citations(text)
+        sentences = articlenizer.sentenize_text(text, 'list', correct=True)
+        results.append([articlenizer.tokenize_text(sentence, 'no_spaces', correct=False) for sentence in sentences])
+    return results
+
+if __name__ == "__main__":
+    texts = [SENTENCE * (i % 3 + 1) for i in range(5000)]
+    pipeline = Pipeline()
+    t_flags, expected = time_function(flag_checks, texts, repeat=3)
+    t_pipeline, result = time_function(lambda: list(pipeline.process_many(texts)), repeat=3)
+    assert result == expected
+    print('{} texts: flag checks {:.3f}s, pipeline {:.3f}s'.format(len(texts), t_flags, t_pipeline))
+    print(pipeline.report())
@@ -0,0 +1,35 @@
+"""Benchmark preprocess_articles with reads and writes one after another (queue_depth=0) and overlapped with the
+processing by the reader and writer threads, on local disk and with a simulated network storage latency of
+LATENCY seconds per file open (added to the read and write functions of articlenizer).
+
+Run with:
+    python benchmarks/benchmark_prefetch.py
+"""
+import time
+import tempfile
+from pathlib import Path
+
+from articlenizer import articlenizer
+
+from common import make_corpus, time_function
+
+LATENCY = 0.005
+
+def with_latency(fct):
+    def slow_fct(*args):
+        time.sleep(LATENCY)
+        return fct(*args)
+    return slow_fct
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs = make_corpus(Path(tmp_dir), 500)
+        for name in ['local disk', '{:.0f} ms latency'.format(LATENCY * 1000)]:
+            if name != 'local disk':
+                articlenizer._read_text = with_latency(articlenizer._read_text)
+                articlenizer._write_lines = with_latency(articlenizer._write_lines)
+            t_serial, _ = time_function(articlenizer.preprocess_articles, jobs, repeat=3, queue_depth=0)
+            expected = [out_name.read_text() for _, out_name in jobs]
+            t_overlap, _ = time_function(articlenizer.preprocess_articles, jobs, repeat=3)
+            assert [out_name.read_text() for _, out_name in jobs] == expected
+            print('{}: serial {:.2f}s, overlapped {:.2f}s'.format(name, t_serial, t_overlap))
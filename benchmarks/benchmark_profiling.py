@@ -0,0 +1,41 @@
+"""Benchmark the overhead of profiling: preprocess_articles and article_list_brat_to_bio on a small corpus with
+profiling disabled and enabled, and print the collected profile.
+
+Run with:
+    python benchmarks/benchmark_profiling.py
+"""
+import tempfile
+from pathlib import Path
+
+from articlenizer import articlenizer
+from articlenizer import formatting
+from articlenizer import profiling
+
+from common import make_corpus, time_function
+
+TEMPLATE = 'Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with {} mM PMSF. Protein amounts were quantified using ImageJ (NIH, see Fig. {}). Data were analysed with SPSS {}.0 as in [{}].\n\n'
+
+def make_annotated_corpus(path, n_articles, seed=0):
+    """Articles with an annotation of their software mentions"""
+    prepro_jobs = make_corpus(path, n_articles, seed, paragraphs=(2, 8), template=TEMPLATE, max_value=99)
+    bio_jobs = []
+    for in_name, _ in prepro_jobs:
+        text = in_name.read_text()
+        annotation = ''
+        for n, position in enumerate(p for p in range(len(text)) if text.startswith('ImageJ', p)):
+            annotation += 'T{}\tApplication {} {}\tImageJ\n'.format(n + 1, position, position + 6)
+        in_name.with_suffix('.ann').write_text(annotation)
+        bio_jobs.append({'txt': in_name, 'ann': in_name.with_suffix('.ann'), 'out': in_name.with_suffix('')})
+    return prepro_jobs, bio_jobs
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prepro_jobs, bio_jobs = make_annotated_corpus(Path(tmp_dir), 300)
+        for name, fct, jobs in [('preprocess_articles', articlenizer.preprocess_articles, prepro_jobs), ('article_list_brat_to_bio', formatting.article_list_brat_to_bio, bio_jobs)]:
+            profiling.enable(False)
+            t_off, _ = time_function(fct, jobs, repeat=3)
+            profiling.collect()
+            profiling.enable()
+            t_on, _ = time_function(fct, jobs, repeat=3)
+            print('{}: profiling off {:.3f}s, on {:.3f}s'.format(name, t_off, t_on))
+            print(profiling.collect().report())
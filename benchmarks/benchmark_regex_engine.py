@@ -0,0 +1,74 @@
+"""Conformance and throughput of the available regex engines (see articlenizer.regex_engine).
+
+For every installed engine the pipeline is run in a separate process with ARTICLENIZER_REGEX_ENGINE set. 
+The process reports how many patterns fell back to the standard library, how many patterns find different matches 
+than the standard library on the benchmark article, the pipeline time and a hash of the output, 
+which has to be the same as the one of the standard library for the engine to be usable.
+
+Run with:
+    python benchmarks/benchmark_regex_engine.py
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import subprocess
+
+from common import PARAGRAPH
+
+def match_signature(compiled, s):
+    """All matches of a pattern with the spans of all groups
+
+    Args:
+        compiled (compiled regex): pattern
+        s (string): text to search
+
+    Returns:
+        list: group spans of each match
+    """
+    return [[m.span(g) for g in range(compiled.groups + 1)] for m in compiled.finditer(s)]
+
+def run_engine(article):
+    """Run the pipeline with the engine selected in the environment and report conformance and time
+
+    Args:
+        article (string): text to process
+
+    Returns:
+        dictionary: engine, number of fallbacks and nonconforming patterns, time and output hash
+    """
+    import re
+    from articlenizer import articlenizer, regex_engine
+    nonconforming = 0
+    for pattern, flags, compiled in regex_engine.COMPILED:
+        if match_signature(compiled, article) != match_signature(re.compile(pattern, flags), article):
+            nonconforming += 1
+    start = time.perf_counter()
+    result = articlenizer.get_tokenized_sentences(article)
+    duration = time.perf_counter() - start
+    return {
+        'engine': regex_engine.ENGINE_NAME,
+        'patterns': len(regex_engine.COMPILED),
+        'fallbacks': len(regex_engine.FALLBACKS),
+        'nonconforming': nonconforming,
+        'seconds': duration,
+        'output': hashlib.sha1(json.dumps(result).encode()).hexdigest()
+    }
+
+if __name__ == "__main__":
+    article = PARAGRAPH * 500
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        print(json.dumps(run_engine(article)))
+        sys.exit(0)
+
+    from articlenizer import regex_engine
+    results = []
+    for name in regex_engine.ENGINES:
+        env = dict(os.environ, ARTICLENIZER_REGEX_ENGINE=name)
+        child = subprocess.run([sys.executable, __file__, '--child'], env=env, capture_output=True, text=True, check=True)
+        results.append(json.loads(child.stdout.strip().split('\n')[-1]))
+    reference = results[0]['output']
+    print('{:<8} {:>9} {:>10} {:>14} {:>9} {:>10}'.format('engine', 'patterns', 'fallbacks', 'nonconforming', 'output', 'time'))
+    for r in results:
+        print('{:<8} {:>9} {:>10} {:>14} {:>9} {:>9.3f}s'.format(r['engine'], r['patterns'], r['fallbacks'], r['nonconforming'], 'same' if r['output'] == reference else 'DIFFERS', r['seconds']))
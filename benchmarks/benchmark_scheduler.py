@@ -0,0 +1,40 @@
+"""Benchmark the size-aware scheduler against static chunks of equal length on a skewed corpus: a few large
+review articles among many short ones. The work of a job is simulated by sleeping in proportion to its size, so the
+result only depends on the scheduling and not on the number of physical cores.
+
+Run with:
+    python benchmarks/benchmark_scheduler.py
+"""
+import time
+import random
+from multiprocessing import Pool
+
+from articlenizer import scheduler
+from articlenizer.util import chunk_list
+
+from common import time_function
+
+SECONDS_PER_MB = 0.5
+
+def process_jobs(jobs):
+    """Simulated list function, a job is the size of its article in bytes"""
+    time.sleep(sum(jobs) / 1e6 * SECONDS_PER_MB)
+    return len(jobs)
+
+def static_chunks(jobs, n_cores):
+    """Previous parallel wrappers: n_cores chunks of equal length and Pool.map"""
+    with Pool(n_cores) as p:
+        return p.map(process_jobs, chunk_list(jobs, n_cores))
+
+if __name__ == "__main__":
+    random.seed(0)
+    n_cores = 8
+    jobs = [random.randint(20000, 60000) for _ in range(400)]
+    for idx in random.sample(range(len(jobs)), 6):
+        jobs[idx] = random.randint(1000000, 2000000)
+    print('{} jobs, {:.1f} MB, ideal time on {} cores {:.2f}s'.format(len(jobs), sum(jobs) / 1e6, n_cores, sum(jobs) / 1e6 * SECONDS_PER_MB / n_cores))
+    t_static, _ = time_function(static_chunks, jobs, n_cores)
+    statistics = scheduler.WorkerStatistics()
+    t_scheduled, _ = time_function(scheduler.run_parallel, process_jobs, jobs, n_cores, jobs, scheduler.SERIAL_THRESHOLD, statistics)
+    print('static chunks {:.2f}s, size-aware scheduler {:.2f}s'.format(t_static, t_scheduled))
+    print(statistics.report())
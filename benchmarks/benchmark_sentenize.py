@@ -0,0 +1,81 @@
+"""Benchmark the sentenizer with fused rule stages against applying every rule sequentially 
+and the single pass whitespace normalization against splicing every match into the string.
+
+Run with:
+    python benchmarks/benchmark_sentenize.py
+"""
+from articlenizer import sentenize
+from articlenizer.util import apply_regex_list, compile_regex_stages
+
+from common import PARAGRAPH, time_function
+
+FUSED_STAGES = [
+    compile_regex_stages(sentenize.NORM_REGEX, sentenize.NORM_STAGE_GROUPS),
+    compile_regex_stages(sentenize.REFINED_SPLIT_REGEX, sentenize.REFINED_SPLIT_STAGE_GROUPS),
+    compile_regex_stages(sentenize.SUBSENTENCE_REGEX, sentenize.SUBSENTENCE_STAGE_GROUPS),
+    compile_regex_stages(sentenize.RECOMBINE_REGEX, sentenize.RECOMBINE_STAGE_GROUPS),
+    compile_regex_stages(sentenize.SPLIT_ENUM_REGEX, sentenize.SPLIT_ENUM_STAGE_GROUPS)
+]
+
+def staged_sentenize(s, stages):
+    """Sentenize with the given rule stages, mirrors sentenize.sentenize.
+
+    Args:
+        s (string): string to sentenize
+        stages (list): normalization, refined split, subsentence, recombine and enumeration stages
+
+    Returns:
+        string: sentenized string
+    """
+    norm, refined_split, subsentence, recombine, split_enum = stages
+    s = apply_regex_list(s, norm)
+    offsets = [o for o in sentenize._boundary_gen(s, sentenize.SPLIT_REGEX)]
+    s = '\n'.join((s[o[0]:o[1]] for o in offsets))
+    s = apply_regex_list(s, refined_split)
+    s = apply_regex_list(s, subsentence)
+    s = apply_regex_list(s, recombine)
+    s = apply_regex_list(s, split_enum)
+    return s
+
+def sequential_sentenize(s):
+    return staged_sentenize(s, [sentenize.NORM_REGEX, sentenize.REFINED_SPLIT_REGEX, sentenize.SUBSENTENCE_REGEX, sentenize.RECOMBINE_REGEX, sentenize.SPLIT_ENUM_REGEX])
+
+def fused_sentenize(s):
+    return staged_sentenize(s, FUSED_STAGES)
+
+def splicing_normalize(s):
+    """Reference implementation of sentenize.normalize: every match is spliced into a new copy of the string.
+
+    Args:
+        s (string): string to normalize
+
+    Returns:
+        string, list: whitespace normalized string and replacements
+    """
+    replacement_length = []
+    for r, t in sentenize.NORM_REGEX:
+        regex_matches = r.finditer(s)
+        for match in reversed(list(regex_matches)):
+            s = s[:match.span(0)[0]] + t + s[match.span(0)[1]:]
+            replacement_length.append([match.group(0), t, match.span(0)[0], match.span(0)[1]])
+    return s, replacement_length
+
+if __name__ == "__main__":
+    article = PARAGRAPH * (1000000 // len(PARAGRAPH))
+    t_sequential, sequential_result = time_function(sequential_sentenize, article, repeat=3)
+    t_stages, stages_result = time_function(fused_sentenize, article, repeat=3)
+    if sequential_result != stages_result:
+        raise(RuntimeError("Fused stages differ from the sequential rule lists."))
+    print("Article with {} characters".format(len(article)))
+    print("sequential rules: {:.3f}s".format(t_sequential))
+    print("fused stages:     {:.3f}s ({:.2f}x)".format(t_stages, t_sequential / t_stages))
+
+    # PDF to text output: padded columns and blank lines
+    article = ' \n\n  '.join(('   '.join(PARAGRAPH.split(' ')) for _ in range(300)))
+    t_splicing, splicing_result = time_function(splicing_normalize, article, repeat=1)
+    t_single_pass, single_pass_result = time_function(sentenize.normalize, article, repeat=3)
+    if splicing_result[0] != single_pass_result[0]:
+        raise(RuntimeError("Single pass normalization differs from the rule list."))
+    print("Whitespace heavy article with {} characters".format(len(article)))
+    print("splicing normalize:    {:.3f}s".format(t_splicing))
+    print("single pass normalize: {:.3f}s ({:.2f}x)".format(t_single_pass, t_splicing / t_single_pass))
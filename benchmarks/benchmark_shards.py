@@ -0,0 +1,67 @@
+"""Benchmark writing and reading back preprocessed articles as one file per article (in subdirectories, as written by
+bin/articlenize_prepro) and as shards, uncompressed and gzip compressed. Only the output is timed, the articles are
+preprocessed once beforehand.
+
+Run with:
+    python benchmarks/benchmark_shards.py
+"""
+import os
+import random
+import tempfile
+from pathlib import Path
+
+from articlenizer import articlenizer
+from articlenizer.shards import ShardWriter, iter_shards
+
+from common import random_paragraphs, time_function
+
+def make_articles(n_articles, seed=0):
+    """Preprocessed articles of a few paragraphs, as lists of sentences"""
+    rng = random.Random(seed)
+    sentences = {}
+    articles = []
+    for idx in range(n_articles):
+        n_paragraphs = rng.randint(3, 8)
+        if n_paragraphs not in sentences:
+            text = random_paragraphs(rng, n_paragraphs)
+            sentences[n_paragraphs] = [' '.join(s) for s in articlenizer.get_tokenized_sentences(text)]
+        articles.append(('journal{}/article{}.txt'.format(idx % 50, idx), sentences[n_paragraphs]))
+    return articles
+
+def write_files(articles, out_path):
+    for name, lines in articles:
+        out_name = out_path / Path(name).with_suffix('.prepro.txt')
+        out_name.parent.mkdir(exist_ok=True)
+        with out_name.open(mode='w') as out_file:
+            for line in lines:
+                out_file.write(line + '\n')
+
+def read_files(out_path):
+    return sum(len(p.read_text().split('\n')) - 1 for p in out_path.rglob('*.prepro.txt'))
+
+def write_shards(articles, out_path, compression=None):
+    writer = ShardWriter(out_path, prefix='prepro', max_bytes=8 * 1024 * 1024, compression=compression)
+    for name, lines in articles:
+        writer.write(name, {'sentences': lines})
+    writer.close()
+
+def read_shards(out_path):
+    return sum(len(record['sentences']) for record in iter_shards(out_path, prefix='prepro'))
+
+def disk_usage(out_path):
+    """Number of files and bytes in a directory"""
+    files = [p for p in Path(out_path).rglob('*') if p.is_file()]
+    return len(files), sum(p.stat().st_size for p in files)
+
+if __name__ == "__main__":
+    articles = make_articles(20000)
+    n_sentences = sum(len(lines) for _, lines in articles)
+    print('{} articles, {} sentences'.format(len(articles), n_sentences))
+    for name, write, read, args in [('files', write_files, read_files, ()), ('shards', write_shards, read_shards, ()), ('gzip shards', write_shards, read_shards, ('gzip',))]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = Path(tmp_dir)
+            t_write, _ = time_function(write, articles, out_path, *args)
+            t_read, count = time_function(read, out_path)
+            assert count == n_sentences
+            n_files, n_bytes = disk_usage(out_path)
+            print('{}: write {:.2f}s, read {:.2f}s, {} files, {:.1f} MB'.format(name, t_write, t_read, n_files, n_bytes / 1e6))
@@ -0,0 +1,33 @@
+"""Worst case benchmark of rejoining splits inside brackets and quotations: SUBSENTENCE_REGEX against the linear scanner.
+The inputs open a bracket (or quote) that is never closed and follow it by many short lines, so that every newline 
+is a candidate the regex rules have to backtrack over. Doubling the input should double the time of the scanner.
+
+Run with:
+    python benchmarks/benchmark_subsentence.py
+"""
+from articlenizer import sentenize
+from articlenizer.util import apply_regex_list
+
+from common import time_function
+
+def unclosed_round(n):
+    return '(' + 'a\n' * n
+
+def unclosed_square(n):
+    return '[' + 'a\n' * n
+
+def unclosed_nested(n):
+    return ('(' + '(a)\n' * 120 + 'b' * 300 + '\n') * (n // 600)
+
+def unclosed_quotes(n):
+    return ('"' + 'a\n' * 120 + 'b' * 300 + '\n') * (n // 500)
+
+if __name__ == "__main__":
+    for generator in [unclosed_round, unclosed_square, unclosed_nested, unclosed_quotes]:
+        for n in [5000, 10000, 20000]:
+            s = generator(n)
+            t_regex, regex_result = time_function(lambda x: apply_regex_list(x, sentenize.SUBSENTENCE_REGEX), s, repeat=1)
+            t_scanner, scanner_result = time_function(sentenize.rejoin_subsentences, s, repeat=3)
+            if regex_result != scanner_result:
+                raise(RuntimeError("Scanner differs from SUBSENTENCE_REGEX on {}".format(generator.__name__)))
+            print("{:<16} {:>7} characters   regex: {:8.3f}s   scanner: {:.4f}s".format(generator.__name__, len(s), t_regex, t_scanner))
@@ -0,0 +1,42 @@
+"""Benchmark tokenization with the single alternation TOKENIZATION_REGEX against DISPATCH_REGEX with word and number shortcuts.
+Both run on the rewritten TOKENIZATION_PATTERNS, the original alternation is timed as well.
+The input are sentences as they come out of the sentenizer, once prose heavy and once with many URLs, versions and numbers.
+
+Run with:
+    python benchmarks/benchmark_tokenize.py
+"""
+import re
+
+from articlenizer import sentenize, tokenize
+
+from common import PARAGRAPH, time_function
+
+SOFTWARE = '''Data processing and statistical analyses were conducted using IBM SPSS 22.0 (IBM Corp., Armonk, NY), MATLAB R2015a (The MathWorks, Natick, MA), R 3.3.2 (http://www.R-project.org/), and Python libraries for scientific computation (NumPy, and SciPy) [39]. Several softwares and R packages are available for Rasch model analysis such as ConQuest (https://shop.acer.edu.au/group/CON3), RUMM (www.rummlab.com.au), ltm (cran.r-project.org/package=ltm) and eRM v.0.16 (cran.r-project.org/package=eRm), i.e. 1,250,000 samples.'''
+
+# single alternation before the patterns were rewritten to start with their first character
+ORIGINAL_REGEX = re.compile(r'((?:10.1371.journal.[a-z]+.[a-z0-9\.]+)|https?\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]|ftp\:\/\/[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*[\w\/_\-\:~\?=#%]|www\.[a-zA-Z0-9\-\.]+[\w\/\._\-\:~\?=#%]*|[a-zA-Z0-9\-\.]+\.org\/[\w\/_\-\:~\?=#%]*|[a-zA-Z0-9\-\.]+\.edu\/[\w\/_\-\:~\?=#%]*|[\.0-9]+[0-9][a-zA-Z]+|v\.|ver\.|V\.|Ver\.|e\.g\.|i\.e\.|i\.v\.|[0-9]{1,3},[0-9]{3},[0-9]{3}|[0-9]{1,3},[0-9]{3}|\[[0-9\-,\?]+\]|[0-9\.]*\.[0-9]+[a-zA-Z]*|[\.0-9]+[a-zA-Z]+|[a-qs-uw-zA-QS-UW-Z]+[0-9][a-zA-Z]+|[a-qs-uw-zA-QS-UW-Z][0-9]+[a-zA-Z]?|[a-zA-Z]+&[a-zA-Z]+|[a-zA-Z]+\.[a-zA-Z]+|[a-zA-Z]+|[0-9]+|[^0-9a-zA-Z\s])')
+
+def tokenize_sentences(regex, sentences):
+    """Tokenize every sentence as tokenize.tokenize does with the given regex
+
+    Args:
+        regex (compiled regex): tokenization regex with a single group
+        sentences (list): sentence strings
+
+    Returns:
+        list: token list of each sentence
+    """
+    return [[t for t in regex.split(sentence) if t] for sentence in sentences]
+
+if __name__ == "__main__":
+    for name, paragraph in [('prose', PARAGRAPH), ('software mentions', SOFTWARE)]:
+        sentences = sentenize.sentenize(paragraph).split('\n') * (1000000 // len(paragraph))
+        t_original, original_result = time_function(lambda s: tokenize_sentences(ORIGINAL_REGEX, s), sentences, repeat=5)
+        t_alternation, alternation_result = time_function(lambda s: tokenize_sentences(tokenize.TOKENIZATION_REGEX, s), sentences, repeat=5)
+        t_dispatch, dispatch_result = time_function(lambda s: tokenize_sentences(tokenize.DISPATCH_REGEX, s), sentences, repeat=5)
+        if not original_result == alternation_result == dispatch_result:
+            raise(RuntimeError("Tokenization differs from the original alternation."))
+        print("{}: {} sentences, {} tokens".format(name, len(sentences), sum(len(tokens) for tokens in dispatch_result)))
+        print("original alternation:  {:.3f}s".format(t_original))
+        print("rewritten alternation: {:.3f}s ({:.2f}x)".format(t_alternation, t_original / t_alternation))
+        print("with shortcuts:        {:.3f}s ({:.2f}x)".format(t_dispatch, t_original / t_dispatch))
@@ -0,0 +1,66 @@
+"""Count how many rule passes the trigger literals avoid and compare the time with applying every rule.
+
+Run with:
+    python benchmarks/benchmark_triggers.py [--in-path DIR]
+
+Without an input directory the paragraphs of benchmark_sentenize are used as documents. 
+Documents are processed paragraph by paragraph, as the parsers emit them.
+"""
+import time
+import argparse
+
+from pathlib import Path
+
+from articlenizer import sentenize, corrections
+from articlenizer.util import apply_regex_list, RULE_STATISTICS
+
+from common import PARAGRAPH
+
+def unguarded_sentenize(s):
+    """Reference implementation: every rule is applied to every paragraph.
+
+    Args:
+        s (string): string to sentenize
+
+    Returns:
+        string: sentenized string
+    """
+    s = apply_regex_list(s, sentenize.NORM_REGEX)
+    offsets = [o for o in sentenize._boundary_gen(s, sentenize.SPLIT_REGEX)]
+    s = '\n'.join((s[o[0]:o[1]] for o in offsets))
+    s = apply_regex_list(s, sentenize.REFINED_SPLIT_REGEX)
+    s = sentenize.rejoin_subsentences(s)
+    s = apply_regex_list(s, sentenize.RECOMBINE_REGEX)
+    s = apply_regex_list(s, sentenize.SPLIT_ENUM_REGEX)
+    return s
+
+def guarded(paragraphs):
+    return [sentenize.sentenize(corrections.correct(p)) for p in paragraphs]
+
+def unguarded(paragraphs):
+    return [unguarded_sentenize(apply_regex_list(p, corrections.CORRECTION_REGEX)) for p in paragraphs]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark trigger guarded rule execution.")
+    parser.add_argument("--in-path", default=None, help="Directory of .txt files to use as corpus.")
+    args = parser.parse_args()
+
+    if args.in_path is None:
+        texts = [PARAGRAPH] * 2000
+    else:
+        texts = [p.read_text() for p in Path(args.in_path).rglob('*.txt')]
+    paragraphs = [p for text in texts for p in text.split('\n\n') if p.strip()]
+
+    start = time.perf_counter()
+    unguarded_result = unguarded(paragraphs)
+    t_unguarded = time.perf_counter() - start
+    start = time.perf_counter()
+    guarded_result = guarded(paragraphs)
+    t_guarded = time.perf_counter() - start
+    if unguarded_result != guarded_result:
+        raise(RuntimeError("Guarded rules differ from applying every rule."))
+
+    print(RULE_STATISTICS.report())
+    print("{} paragraphs".format(len(paragraphs)))
+    print("all rules:     {:.3f}s".format(t_unguarded))
+    print("guarded rules: {:.3f}s ({:.2f}x)".format(t_guarded, t_unguarded / t_guarded))
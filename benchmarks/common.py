@@ -0,0 +1,70 @@
+"""Timing helper and synthetic articles shared by the benchmark scripts.
+
+The scripts are run from the repository root (python benchmarks/benchmark_<name>.py), which puts this folder on the
+import path.
+"""
+import time
+import random
+
+PARAGRAPH = '''Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with 1 mM PMSF and a protease inhibitor cocktail (Sigma-Aldrich).  Lysates were cleared by centrifugation (10 min at 16,000 x g at 4 °C).Proteins were transferred to PVDF membranes, which were then blocked with 5% milk for 1 hr at room temperature as described by Smith et al. [26]. 
+Membranes were probed with primary antibodies: (1) Rabbit anti-DYNC2LI1 [26] (1:200; LIC3); (2) Rabbit anti-WDR34 (1:200; Abcam ab81030). Protein amounts were quantified from scanned blots using ImageJ (NIH, see Fig.
+6 and e.g. http://imagej.nih.gov/ij/). 
+
+'''
+PARAGRAPH_TEMPLATE = 'Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with {} mM PMSF. Lysates were cleared by centrifugation ({} min at 16,000 x g). Protein amounts were quantified using ImageJ (NIH, see Fig. {}). Data were analysed with SPSS {}.0.\n\n'
+
+def time_function(fct, *args, repeat=1, **kwargs):
+    """Minimum wall time of calling fct(*args, **kwargs)
+
+    Args:
+        fct (function): function to time
+        repeat (int, optional): number of runs. Defaults to 1.
+
+    Returns:
+        float, result: time in seconds and return value of the last call
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fct(*args, **kwargs)
+        duration = time.perf_counter() - start
+        if best is None or duration < best:
+            best = duration
+    return best, result
+
+def random_paragraphs(rng, n_paragraphs, template=PARAGRAPH_TEMPLATE, max_value=999):
+    """Text of paragraphs with random numbers filled into a template
+
+    Args:
+        rng (Random): random number generator
+        n_paragraphs (int): number of paragraphs
+        template (string, optional): paragraph with {} fields. Defaults to PARAGRAPH_TEMPLATE.
+        max_value (int, optional): largest number filled in. Defaults to 999.
+
+    Returns:
+        string: paragraphs
+    """
+    n_fields = template.count('{}')
+    return ''.join(template.format(*(rng.randint(1, max_value) for _ in range(n_fields))) for _ in range(n_paragraphs))
+
+def make_corpus(path, n_articles, seed=0, paragraphs=(1, 4), template=PARAGRAPH_TEMPLATE, max_value=999):
+    """Articles of random paragraphs as files in path
+
+    Args:
+        path (PosixPath): folder for the articles
+        n_articles (int): number of articles
+        seed (int, optional): random seed. Defaults to 0.
+        paragraphs (tuple, optional): smallest and largest number of paragraphs of an article. Defaults to (1, 4).
+        template (string, optional): paragraph with {} fields. Defaults to PARAGRAPH_TEMPLATE.
+        max_value (int, optional): largest number filled in. Defaults to 999.
+
+    Returns:
+        list: input and output path of every article, as passed to articlenizer.preprocess_articles
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for idx in range(n_articles):
+        in_name = path / 'article{}.txt'.format(idx)
+        in_name.write_text(random_paragraphs(rng, rng.randint(*paragraphs), template, max_value))
+        jobs.append([in_name, path / 'article{}.prepro.txt'.format(idx)])
+    return jobs
@@ -26,10 +26,15 @@ setup(name='articlenizer',
         'bin/parse_TEI',
         'bin/parse_HTML',
         'bin/articlenize_prepro',
-        'bin/analyze_corpus'
+        'bin/analyze_corpus',
+        'bin/export_binary'
       ],
       install_requires=[
         'pytest'
       ],
+      extras_require={
+        'numpy': ['numpy'],
+        'zstd': ['zstandard']
+      },
       include_package_data=True,
       zip_safe=False)
\ No newline at end of file
@@ -0,0 +1,15 @@
+import pytest
+
+from articlenizer.abbreviations import ABBREVIATION_MATCHER, AbbreviationMatcher
+
+def test_trie_pattern():
+    matcher = AbbreviationMatcher([r'e\. ?g\.\,?', r'et ?al\.', r'[Vv]er\.'])
+    assert matcher.pattern == r'(?:Ver\.|e(?:\.(?:\ g\.(?:,)?|g\.(?:,)?)|t(?:\ al\.|al\.))|ver\.)'
+    assert matcher.search('as described by Smith et al. before').group(0) == 'et al.'
+
+def test_ends_at():
+    s = 'as described by Smith et al. [5] and in ref.'
+    assert ABBREVIATION_MATCHER.ends_at(s, 28)
+    assert not ABBREVIATION_MATCHER.ends_at(s, 27)
+    assert not ABBREVIATION_MATCHER.ends_at(s, 28, beg=24)
+    assert ABBREVIATION_MATCHER.ends_at(s, len(s))
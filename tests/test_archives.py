@@ -0,0 +1,48 @@
+import io
+import tarfile
+import zipfile
+import pytest
+
+from articlenizer import articlenizer
+from articlenizer import jats_parser
+from articlenizer.archives import archive_out_path, find_archives, iter_members
+from articlenizer.manifest import Manifest
+
+ARTICLE = '<?xml version="1.0" encoding="UTF-8"?><article><front><abstract><p>We used SPSS {} for the analysis [<xref>3</xref>].</p></abstract></front></article>'
+
+def write_tar(path, members):
+    with tarfile.open(path, mode='w:gz') as tar_file:
+        for name, content in members.items():
+            data = content.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+
+def test_iter_members(tmp_path):
+    members = {'j/a.nxml': ARTICLE.format(1), 'j/b.txt': 'Text.', '../evil.nxml': ARTICLE.format(2)}
+    write_tar(tmp_path / 'pack.tar.gz', members)
+    with zipfile.ZipFile(tmp_path / 'pack.zip', mode='w') as zip_file:
+        for name, content in members.items():
+            zip_file.writestr(name, content)
+    assert find_archives(tmp_path) == [tmp_path / 'pack.tar.gz', tmp_path / 'pack.zip']
+    for archive in find_archives(tmp_path):
+        assert [(str(path), member.read().decode('utf-8')) for path, member in iter_members(archive, '.nxml')] == [('j/a.nxml', ARTICLE.format(1))]
+    assert archive_out_path(tmp_path / 'sub' / 'pack.tar.gz', tmp_path, tmp_path / 'out') == tmp_path / 'out' / 'sub' / 'pack'
+
+def test_parse_archive_list(tmp_path):
+    write_tar(tmp_path / 'pack.tar.gz', {'j/a{}.nxml'.format(idx): ARTICLE.format(idx) for idx in range(3)})
+    job = [tmp_path / 'pack.tar.gz', tmp_path / 'out' / 'pack']
+    manifest = Manifest(tmp_path, {})
+    assert jats_parser.parse_archive_list([job], manifest) == 0
+    for idx in range(3):
+        assert (tmp_path / 'out' / 'pack' / 'j' / 'a{}.txt'.format(idx)).read_text() == jats_parser.parse_jats_article(io.BytesIO(ARTICLE.format(idx).encode('utf-8')))
+    assert manifest.pending([job]) == []
+
+def test_preprocess_archives(tmp_path):
+    text = 'Data were analysed with SPSS. Results are shown in Fig. 1.\n\nSee ä.'
+    write_tar(tmp_path / 'pack.tar.gz', {'a.txt': text})
+    (tmp_path / 'a.txt').write_text(text)
+    articlenizer.preprocess_articles([[tmp_path / 'a.txt', tmp_path / 'a.prepro.txt']])
+    for stream in [False, True]:
+        articlenizer.preprocess_archives([[tmp_path / 'pack.tar.gz', tmp_path / 'out']], stream=stream)
+        assert (tmp_path / 'out' / 'a.prepro.txt').read_text() == (tmp_path / 'a.prepro.txt').read_text()
@@ -1,3 +1,4 @@
+import io
 import pytest
 
 from articlenizer import articlenizer
@@ -16,3 +17,30 @@ def test_prepro_pipeline():
         ['Protein', 'amounts', 'were', 'quantified', 'from', 'scanned', 'blots', 'using', 'ImageJ', '(', 'NIH', ')', '.'], 
         ['Full', 'scans', 'of', 'Western', 'blot', 'data', 'are', 'included', 'in', 'Supplementary', 'Fig', '.', '6', '.']
     ]
+
+def test_streaming_pipeline():
+    paragraphs = [
+        'Cells were lysed in 1X RIPA Buffer (Cell Signaling Technology) supplemented with 1 mM PMSF.\n\n',
+        'Results (see\n\nTable 2) show that we performed\n\ntests on cells.\n\n',
+        'Protein amounts were quantified using ImageJ (NIH, see Fig.\n6 and e.g. http://imagej.nih.gov/ij/).\n\n'
+    ]
+    text = ''.join(paragraphs * 20)
+    target = articlenizer.get_tokenized_sentences(text)
+    for window_size, overlap in [(400, 400), (600, 200), (1000, 600)]:
+        streamed = list(articlenizer.iter_tokenized_sentences(io.StringIO(text), window_size=window_size, overlap=overlap))
+        assert streamed == target
+    with pytest.raises(RuntimeError):
+        next(articlenizer.iter_tokenized_sentences(io.StringIO(text), window_size=200, overlap=400))
+
+def test_tokenize_batch():
+    sentences = ['Tokenize a text.', 'Tokenize a second text.', '']
+    ids, offsets, vocabulary = articlenizer.tokenize_batch(sentences)
+    assert list(ids) == [0, 1, 2, 3, 0, 1, 4, 2, 3]
+    assert list(offsets) == [0, 4, 9, 9]
+    assert ids.itemsize == 4
+    assert [vocabulary[i] for i in ids[offsets[1]:offsets[2]]] == articlenizer.tokenize_text(sentences[1])
+    ids, offsets, vocabulary = articlenizer.tokenize_batch(['A new text.'], vocabulary)
+    assert list(ids) == [5, 6, 2, 3]
+    assert len(vocabulary) == 7
+    assert vocabulary.tokens == ['Tokenize', 'a', 'text', '.', 'second', 'A', 'new']
+    assert all(vocabulary.index[t] == i for i, t in enumerate(vocabulary.tokens))
@@ -0,0 +1,61 @@
+import pytest
+
+from articlenizer import articlenizer
+from articlenizer import formatting
+from articlenizer.binary import BinaryCorpus, BinaryCorpusWriter, output_documents
+from articlenizer.shards import ShardWriter
+
+TEXTS = [
+    'Data were analysed with SPSS 22.0. Results are shown in Fig. 1.\n\nWe used R.',
+    '',
+    'Cells were counted with ImageJ (NIH, e.g. http://imagej.nih.gov/ij/).'
+]
+
+def test_binary_corpus_round_trip(tmp_path):
+    writer = BinaryCorpusWriter(tmp_path / 'corpus')
+    documents = [articlenizer.get_tokenized_sentences(text) for text in TEXTS]
+    for idx, sentences in enumerate(documents):
+        writer.add_document('article{}'.format(idx), sentences)
+    writer.close()
+    corpus = BinaryCorpus(tmp_path / 'corpus')
+    assert len(corpus) == 3
+    assert corpus.keys == ['article0', 'article1', 'article2']
+    assert corpus.n_sentences == sum(len(d) for d in documents)
+    for idx, sentences in enumerate(documents):
+        assert corpus.document(idx) == sentences
+    assert corpus.sentence(corpus.n_sentences - 1) == documents[2][-1]
+    assert list(corpus.sentence_ids(0)) == corpus.vocabulary.intern(documents[0][0])
+    with pytest.raises(RuntimeError):
+        corpus.sentence_labels(0)
+
+def test_binary_corpus_from_bio_outputs(tmp_path):
+    (tmp_path / 'article.txt').write_text('We used SPSS.\n\nData were analysed with SPSS 22.0.')
+    (tmp_path / 'article.ann').write_text('T1\tApplication 8 12\tSPSS\n')
+    job = {'txt': tmp_path / 'article.txt', 'ann': tmp_path / 'article.ann', 'out': tmp_path / 'out' / 'article'}
+    (tmp_path / 'out').mkdir()
+    formatting.article_list_brat_to_bio([job])
+    writer = BinaryCorpusWriter(tmp_path / 'corpus', with_labels=True)
+    for key, sentences, labels in output_documents(tmp_path / 'out', 'bio'):
+        writer.add_document(key, sentences, labels)
+    writer.close()
+    corpus = BinaryCorpus(tmp_path / 'corpus')
+    expected = formatting.brat_to_bio((tmp_path / 'article.txt').read_text(), (tmp_path / 'article.ann').read_text())
+    assert corpus.keys == ['article']
+    assert corpus.document(0) == [s['tokens'] for s in expected]
+    assert corpus.document_labels(0) == [s['labels'] for s in expected]
+    with pytest.raises(RuntimeError):
+        writer = BinaryCorpusWriter(tmp_path / 'corpus2', with_labels=True)
+        writer.add_document('a', [['We', 'used']], [['O']])
+
+def test_output_documents_from_shards(tmp_path):
+    shards = ShardWriter(tmp_path, prefix='prepro', max_bytes=100)
+    for idx, text in enumerate(TEXTS):
+        shards.write('article{}'.format(idx), {'sentences': [' '.join(s) for s in articlenizer.get_tokenized_sentences(text)]})
+    # an incremental run writes article0 again
+    shards.write('article0', {'sentences': ['We used R .']})
+    shards.close()
+    assert len(list(tmp_path.glob('prepro-*'))) > 1
+    documents = list(output_documents(tmp_path))
+    assert [key for key, _, _ in documents] == ['article1', 'article2', 'article0']
+    assert documents[1][1] == articlenizer.get_tokenized_sentences(TEXTS[2])
+    assert documents[2] == ('article0', [['We', 'used', 'R', '.']], None)
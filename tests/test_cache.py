@@ -0,0 +1,48 @@
+import random
+import pytest
+
+from articlenizer import articlenizer
+from articlenizer.cache import ParagraphCache, cache_key
+
+BOILERPLATE = 'Competing interests: The authors declare that no competing interests exist.\n\nData Availability: All data are within the paper (see Table 1).\n\n'
+
+def test_paragraph_cache_eviction(tmp_path):
+    cache = ParagraphCache(tmp_path / 'cache.db', max_bytes=1000)
+    keys = [cache_key('paragraph {}'.format(i), ['flags']) for i in range(30)]
+    assert cache_key('paragraph 0', ['other flags']) != keys[0]
+    cache.put_many({key: [['token', str(i)] * 5] for i, key in enumerate(keys[:10])})
+    assert cache.get_many(keys[:1]) == {keys[0]: [['token', '0'] * 5]}
+    cache.put_many({key: [['token', str(i)] * 5] for i, key in enumerate(keys[10:15])})
+    assert cache.size() <= 1000
+    # the entry that was used last is kept
+    assert keys[0] in cache.get_many(keys[:2])
+    assert keys[1] not in cache.get_many(keys[:2])
+
+def test_cached_tokenized_sentences(tmp_path):
+    cache = ParagraphCache(tmp_path / 'cache.db')
+    texts = [
+        'We used SPSS (v. 24).\n\n' + BOILERPLATE + 'Funding: none.',
+        'Results (see\n\nTable 2) show that we performed\n\ntests.\n\n' + BOILERPLATE,
+        BOILERPLATE + 'As in. [5] we used e.g.\n\nR.'
+    ]
+    for text in texts:
+        assert articlenizer.get_tokenized_sentences(text, cache=cache) == articlenizer.get_tokenized_sentences(text)
+    assert articlenizer.split_paragraphs(texts[1])[0] == 'Results (see\n\nTable 2) show that we performed\n\ntests.\n\n'
+    assert cache.hits == 3
+    with pytest.raises(RuntimeError):
+        articlenizer.get_tokenized_sentences(texts[0], token_rep='spans', cache=cache)
+
+def test_cached_tokenized_sentences_match_whole_text(tmp_path):
+    cache = ParagraphCache(tmp_path / 'cache.db')
+    text = 'We describe the model below.\n\nE=∑m≤c holds for all inputs. It was used in SPSS.'
+    assert articlenizer.get_tokenized_sentences(text, cache=cache) == articlenizer.get_tokenized_sentences(text)
+    # paragraphs starting with formulas, quotes, abbreviations and brackets
+    pieces = ['We describe the model below.', 'E=∑m≤c holds for all inputs.', '∑x=1 is used.', 'It was used in SPSS.', '“Quoted text.', 'as stated.”', 
+        'See e.g.', 'Fig. 2 shows it.', 'Smith et al.', 'J. S. Smith wrote it.', 'The (bracket', 'ends here).', '[3] shows R.', 'x² is small.', 
+        'No. 5 was best.', 'i.e. the same.', 'Über alles.', '"Hello."', 'The end!', 'Data (see above).']
+    rng = random.Random(0)
+    for _ in range(300):
+        paragraphs = [' '.join(rng.choice(pieces) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(2, 8))]
+        text = ''.join(paragraph + rng.choice(['\n\n', '\n\n', '\n', ' \n\n']) for paragraph in paragraphs)
+        assert articlenizer.get_tokenized_sentences(text, cache=cache) == articlenizer.get_tokenized_sentences(text)
+    assert cache.hits > 0
@@ -21,4 +21,22 @@ def test_formula_replacement():
 def test_citation_correction():
     s = "Endometrial cancer (EC) is the most common gynaecological malignancy. The age standardised incidence in the UK has risen from 13.4 to 19.1 per 100,000 over the period from 1998 to 2009,[1] possibly as a consequence of rise in obesity, a known risk factor. [2] Age standardised mortality from EC has risen from 3.0 to 4.0 per 100,000 over the same period (1999 to 2012).[3] Women with EC usually present with postmenopausal bleeding and are diagnosed with early stage disease. Although five year survival is in excess of 90% in early stage, it declines sharply to 14% for those with Stage IV disease, similar to ovarian cancer cf.[4] treatment is primarily surgical, but varies according to stage with hysterectomy and bilateral salpingo-oophorectomy (BSO) performed in women detected at Stage I, whilst for women with stage III and IV disease, chemotherapy or radiotherapy are recommended. The value of lymphadenectomy in the treatment of EC is not universally established.[5]"
     s, _ = corrections.correct_citations(s)
-    assert s ==  "Endometrial cancer (EC) is the most common gynaecological malignancy. The age standardised incidence in the UK has risen from 13.4 to 19.1 per 100,000 over the period from 1998 to 2009[1], possibly as a consequence of rise in obesity, a known risk factor [2]. Age standardised mortality from EC has risen from 3.0 to 4.0 per 100,000 over the same period (1999 to 2012)[3]. Women with EC usually present with postmenopausal bleeding and are diagnosed with early stage disease. Although five year survival is in excess of 90% in early stage, it declines sharply to 14% for those with Stage IV disease, similar to ovarian cancer cf.[4] treatment is primarily surgical, but varies according to stage with hysterectomy and bilateral salpingo-oophorectomy (BSO) performed in women detected at Stage I, whilst for women with stage III and IV disease, chemotherapy or radiotherapy are recommended. The value of lymphadenectomy in the treatment of EC is not universally established[5]."
\ No newline at end of file
+    assert s ==  "Endometrial cancer (EC) is the most common gynaecological malignancy. The age standardised incidence in the UK has risen from 13.4 to 19.1 per 100,000 over the period from 1998 to 2009[1], possibly as a consequence of rise in obesity, a known risk factor [2]. Age standardised mortality from EC has risen from 3.0 to 4.0 per 100,000 over the same period (1999 to 2012)[3]. Women with EC usually present with postmenopausal bleeding and are diagnosed with early stage disease. Although five year survival is in excess of 90% in early stage, it declines sharply to 14% for those with Stage IV disease, similar to ovarian cancer cf.[4] treatment is primarily surgical, but varies according to stage with hysterectomy and bilateral salpingo-oophorectomy (BSO) performed in women detected at Stage I, whilst for women with stage III and IV disease, chemotherapy or radiotherapy are recommended. The value of lymphadenectomy in the treatment of EC is not universally established[5]."
+
+def test_formula_replacement_positions():
+    s = 'Only a=∑b is checked, not (a=∑b inside an unbalanced bracket.'
+    s, replacements = corrections.remove_math_expr(s)
+    assert s == 'Only formtok is checked, not (a=∑b inside an unbalanced bracket.'
+    assert replacements == [['a=∑b ', 'formtok ', 5, 10]]
+
+def test_correction_with_index():
+    s = 'Some errors(with brackets)and;semi;colons,(like this)'
+    corrected, indices = corrections.correct_with_index(s)
+    assert corrected == corrections.correct(s) == 'Some errors (with brackets) and;semi; colons, (like this)'
+    assert indices == [36, 43, 10, 25]
+
+def test_citation_correction_abbreviation():
+    s = 'As shown by Smith et al. [4] and others. [5] More text.'
+    s, switches = corrections.correct_citations(s)
+    assert s == 'As shown by Smith et al. [4] and others [5]. More text.'
+    assert switches == [[(39, 40), (40, 44)]]
@@ -0,0 +1,30 @@
+import pytest
+
+from articlenizer import formatting
+from articlenizer.document import Document
+
+def test_document_alignment():
+    document = Document('ab cde  fg')
+    document.edit('drop', 'ab cdefg', [(5, 7, '')])
+    document.edit('insert', 'ab XX cdefg Y', [(3, 3, 'XX '), (8, 8, ' Y')])
+    assert document.text == 'ab XX cdefg Y'
+    assert document.edit_log() == [(3, 3, 'XX '), (5, 7, ''), (10, 10, ' Y')]
+    # inserted text is not added to a span, dropped text is
+    assert document.forward_spans([(3, 5), (4, 8), (8, 10)]) == [(6, 8), (7, 9), (9, 11)]
+    assert document.backward_spans([(6, 11), (3, 5)]) == [(3, 10), (3, 3)]
+    with pytest.raises(RuntimeError):
+        document.edit('wrong', 'ab', [(0, 1, '')])
+
+def test_preprocess_document():
+    text = '  We used SPS௵௵S;version   24 (f)=∇∑ as in. [5] and R.'
+    document = formatting.preprocess_document(text)
+    spans = [(text.index('SPS'), text.index(';')), (text.index('24'), text.index('24') + 2), (text.index('[5]'), text.index('[5]') + 3)]
+    assert [document.text[b:e] for b, e in document.forward_spans(spans)] == ['SPSS', '24', '[5]']
+    assert document.stages == ['unicode', 'math', 'correct', 'citations', 'normalize', 'sentenize']
+    pieces = []
+    last = 0
+    for beg, end, replacement in document.edit_log():
+        pieces.extend([text[last:beg], replacement])
+        last = end
+    pieces.append(text[last:])
+    assert ''.join(pieces) == document.text
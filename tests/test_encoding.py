@@ -20,4 +20,9 @@ def test_trademarks():
 def test_quotations():
     s = '«“Different quotes should be the same.»”'
     s, _ = encode_string.handle_unicode_characters(s)
-    assert s == '““Different quotes should be the same.””'
\ No newline at end of file
+    assert s == '““Different quotes should be the same.””'
+
+def test_dropped_indices():
+    s = 'A❨b⁆ cé꜐d'
+    s, dropped = encode_string.handle_unicode_characters(s)
+    assert s == 'Ab ced' and dropped == [[1, '❨'], [3, '⁆'], [7, '꜐']]
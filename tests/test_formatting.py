@@ -1,6 +1,6 @@
 import pytest
 
-from articlenizer import formatting
+from articlenizer import formatting, tokenize
 
 def test_replacement():
     text = '  Statistical analyses were conducted applying Statistical Program for the Social Sciences (SPS௵௵S);version   24 (f)=∇∑ (IBM;Inc. Chicago, IL, USA).  '
@@ -55,3 +55,17 @@ def test_sentence_based_info_real_sample():
     sentences = formatting.sentence_based_info(text, annotation)
     expected_result = [{'string': 'The maps were drawn from free-access shapefiles obtained from DIVA-GIS (http://www.diva-gis.org/) with QGIS 1.8.0 and ArcView 3.2 software.', 'entities': {'T1': {'label': 'reference', 'beg': 72, 'end': 96, 'string': 'http://www.diva-gis.org/', 'idx': 0}}, 'relations': {}}]
     assert sentences == expected_result
+
+def test_bio_annotate_spans():
+    text = 'Skipped.\nWe used SPSS 22.0 and R(3.3).'
+    entities = {
+        'T1': {'label': 'Application', 'beg': 8, 'end': 17},
+        'T2': {'label': 'Application', 'beg': 22, 'end': 23}
+    }
+    spans = tokenize.tokenize_spans(text, 9)
+    tokens, names, labels = formatting.bio_annotate_spans(text, spans, entities, 9)
+    assert tokens == ['We', 'used', 'SPSS', '22.0', 'and', 'R', '(', '3.3', ')', '.']
+    assert labels == ['O', 'O', 'B-Application', 'I-Application', 'O', 'B-Application', 'O', 'O', 'O', 'O']
+    assert names == ['O', 'O', 'T1', 'T1', 'O', 'T2', 'O', 'O', 'O', 'O']
+    assert (entities['T2']['new_beg'], entities['T2']['new_end']) == (22, 23)
+    assert formatting.bio_annotate(tokenize.tokenize(text[9:]), entities) == (tokens, names, labels)
@@ -0,0 +1,74 @@
+import os
+import multiprocessing
+import pytest
+
+from articlenizer import articlenizer, formatting
+from articlenizer.manifest import Manifest
+
+def test_manifest_skips_unchanged_articles(tmp_path):
+    jobs = []
+    for idx in range(3):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Data were analysed with SPSS {}.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+    config = {'tool': 'test', 'correct': True}
+    manifest = Manifest(tmp_path, config)
+    assert manifest.pending(jobs) == jobs
+    articlenizer.preprocess_articles(jobs[:2], manifest=manifest)
+    # a new manifest resumes after the finished articles
+    manifest = Manifest(tmp_path, config)
+    assert manifest.pending(jobs) == jobs[2:]
+    jobs[0][0].write_text('Data were analysed with R.')
+    assert manifest.pending(jobs) == [jobs[0], jobs[2]]
+    assert Manifest(tmp_path, {'tool': 'test', 'correct': False}).pending(jobs[1:2]) == jobs[1:2]
+
+def test_manifest_ignores_broken_lines(tmp_path):
+    in_name = tmp_path / 'article.txt'
+    in_name.write_text('Text.')
+    job = [in_name, tmp_path / 'article.prepro.txt']
+    job[1].write_text('Text .\n')
+    manifest = Manifest(tmp_path, {})
+    manifest.record(job)
+    manifest.record(job)
+    with manifest.path.open(mode='a') as f:
+        f.write('{"output": "art')
+    manifest = Manifest(tmp_path, {})
+    assert manifest.pending([job]) == []
+    manifest.compact()
+    assert len(manifest.path.read_text().split('\n')) == 2
+
+def test_manifest_rebuilds_missing_outputs(tmp_path):
+    jobs = []
+    for idx in range(2):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Data were analysed with SPSS {}.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+    manifest = Manifest(tmp_path, {})
+    articlenizer.preprocess_articles(jobs, manifest=manifest)
+    jobs[0][1].unlink()
+    assert Manifest(tmp_path, {}).pending(jobs) == jobs[:1]
+
+    (tmp_path / 'article0.ann').write_text('T1\tApplication 24 28\tSPSS\n')
+    job = {'txt': tmp_path / 'article0.txt', 'ann': tmp_path / 'article0.ann', 'out': tmp_path / 'article0'}
+    formatting.article_list_brat_to_bio([job], manifest=manifest)
+    assert Manifest(tmp_path, {}).pending([job]) == []
+    (tmp_path / 'article0.labels.txt').unlink()
+    assert Manifest(tmp_path, {}).pending([job]) == [job]
+
+def _record_jobs(path, jobs):
+    manifest = Manifest(path, {'padding': 'x' * 5000})
+    for job in jobs:
+        manifest.record(job)
+
+def test_manifest_records_from_several_processes(tmp_path):
+    jobs = []
+    for idx in range(200):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Text {}.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+        jobs[-1][1].write_text('Text .\n')
+    with multiprocessing.Pool(4) as pool:
+        pool.starmap(_record_jobs, [(tmp_path, jobs[idx::4]) for idx in range(4)])
+    lines = Manifest(tmp_path, {}).path.read_text().split('\n')
+    assert len(lines) == 201
+    assert Manifest(tmp_path, {'padding': 'x' * 5000}).pending(jobs) == []
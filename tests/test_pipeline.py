@@ -0,0 +1,27 @@
+import pytest
+
+from articlenizer import articlenizer
+from articlenizer.pipeline import Pipeline
+
+def test_pipeline_stages():
+    pipeline = Pipeline.from_config({'replace_math': False, 'tokenize': False})
+    assert [name for name, _ in pipeline.stages] == ['unicode', 'citations', 'correct', 'sentenize']
+    assert [name for name, _ in Pipeline(track_edits=True).stages] == ['unicode', 'math', 'correct', 'citations', 'normalize', 'sentenize']
+    with pytest.raises(RuntimeError):
+        Pipeline.from_config({'sentence_rep': 'list'})
+
+def test_pipeline_process():
+    texts = ['We used SPSS (v. 24). It worked [5].', 'The ﬁle was analysed with R.']
+    pipeline = Pipeline()
+    assert list(pipeline.process_many(texts)) == [articlenizer.get_tokenized_sentences(t) for t in texts]
+    seconds, characters, calls = pipeline.timings['unicode']
+    assert characters == sum(len(t) for t in texts)
+    assert calls == 2
+    other = Pipeline()
+    other.process(texts[0])
+    pipeline.merge(other)
+    assert pipeline.timings['tokenize'][2] == 3
+    assert pipeline.report().split('\n')[1].startswith('unicode')
+    document = Pipeline(track_edits=True).process(texts[1])
+    assert document.raw == texts[1]
+    assert document.stages == ['unicode', 'math', 'correct', 'citations', 'normalize', 'sentenize']
@@ -0,0 +1,39 @@
+import pytest
+
+from articlenizer.prefetch import prefetch, BackgroundWriter
+
+def read(item):
+    if item == 'missing':
+        raise(FileNotFoundError(item))
+    return item.upper()
+
+def test_prefetch_keeps_order():
+    items = ['a{}'.format(idx) for idx in range(50)]
+    for queue_depth in [0, 1, 4]:
+        assert list(prefetch(items, read, queue_depth)) == [(item, item.upper()) for item in items]
+
+def test_prefetch_raises_at_failed_item():
+    results = []
+    with pytest.raises(FileNotFoundError):
+        for item, result in prefetch(['a', 'b', 'missing', 'c'], read, 2):
+            results.append(result)
+    assert results == ['A', 'B']
+    # stopping early does not block the reader thread
+    for item, result in prefetch(['a{}'.format(idx) for idx in range(100)], read, 1):
+        break
+
+def test_background_writer():
+    written = []
+    for queue_depth in [0, 2]:
+        writer = BackgroundWriter(queue_depth)
+        for idx in range(20):
+            writer.submit(written.append, idx)
+        writer.close()
+        assert written == list(range(20))
+        written.clear()
+    writer = BackgroundWriter(2)
+    writer.submit(read, 'missing')
+    writer.submit(written.append, 1)
+    with pytest.raises(FileNotFoundError):
+        writer.close()
+    assert written == []
@@ -0,0 +1,52 @@
+from functools import partial
+
+from articlenizer import articlenizer
+from articlenizer import formatting
+from articlenizer import profiling
+from articlenizer.scheduler import run_parallel, WorkerStatistics
+
+def test_profile_merge_and_summary():
+    profile = profiling.Profile()
+    profile.add('read', 0.5, 1000)
+    other = profiling.Profile()
+    other.add('read', 0.5, 3000, 2)
+    profile.merge(other)
+    profile.merge({'tokenize': [1.0, 4000, 3]})
+    summary = profile.summary(wall=2.0)
+    assert summary['stages']['read'] == {'seconds': 1.0, 'share': 0.5, 'characters': 4000, 'documents': 3, 'chars_per_second': 4000}
+    assert summary['stage_seconds'] == 2.0 and summary['wall_seconds'] == 2.0
+    assert profile.report().split('\n')[0].split() == ['stage', 'seconds', 'share', 'characters', 'chars/s', 'documents']
+
+def test_profiling_merges_worker_counters(tmp_path):
+    jobs = []
+    for idx in range(6):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Data were analysed with SPSS {}. Results are shown in Fig. 1.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+    profiling.collect()
+    profiling.enable()
+    try:
+        statistics = WorkerStatistics()
+        run_parallel(partial(articlenizer.preprocess_articles), jobs, 2, serial_threshold=0, statistics=statistics)
+        profile = profiling.collect()
+    finally:
+        profiling.enable(False)
+    assert len(statistics.workers) == 2
+    for stage in ['read (thread)', 'unicode', 'sentenize', 'tokenize', 'write (thread)']:
+        assert profile.stages[stage][2] == 6
+    assert profile.stages['read (thread)'][1] == sum(len(in_name.read_text()) for in_name, _ in jobs)
+
+def test_profiling_brat_to_bio_stages():
+    profiling.collect()
+    formatting.brat_to_bio('We used SPSS.', 'T1\tApplication 8 12\tSPSS\n')
+    assert 'projection' not in profiling.collect().stages
+    profiling.enable()
+    try:
+        formatting.brat_to_bio('We used SPSS.', 'T1\tApplication 8 12\tSPSS\n')
+        profile = profiling.collect()
+    finally:
+        profiling.enable(False)
+    assert profile.stages['projection'][2] == 1
+    assert profile.stages['projection'][1] == len('We used SPSS.')
+    assert profile.stages['tokenize'][2] == 1
+    assert profile.stages['sentenize'][2] == 1
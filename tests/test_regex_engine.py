@@ -0,0 +1,22 @@
+import re
+import pytest
+
+from articlenizer import regex_engine
+
+class LookaroundFreeEngine():
+    @staticmethod
+    def compile(pattern, flags=0):
+        if '(?=' in pattern or '(?<' in pattern:
+            raise(ValueError("Lookarounds are not supported"))
+        return re.compile(pattern, flags)
+
+def test_unknown_engine():
+    assert regex_engine.select_engine('not_an_engine') == 're'
+
+def test_pattern_fallback(monkeypatch):
+    monkeypatch.setitem(regex_engine.ENGINES, 'lookaround_free', LookaroundFreeEngine)
+    monkeypatch.setattr(regex_engine, 'FALLBACKS', [])
+    compiled = regex_engine.compile(r'(?<=\s)[a-z]+', engine='lookaround_free')
+    assert compiled.findall('a bc de') == ['bc', 'de']
+    regex_engine.compile(r'\s[a-z]+', engine='lookaround_free')
+    assert regex_engine.FALLBACKS == [r'(?<=\s)[a-z]+']
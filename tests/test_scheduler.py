@@ -0,0 +1,27 @@
+import pytest
+
+from articlenizer import scheduler
+
+def test_schedule_chunks():
+    jobs = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+    sizes = [1, 100, 2, 50, 1, 1, 3, 1]
+    chunks = scheduler.schedule_chunks(jobs, sizes, 2)
+    # largest jobs come first and alone, small jobs are grouped at the end
+    assert chunks[0] == (['b'], 100)
+    assert chunks[1] == (['d'], 50)
+    assert len(chunks[-1][0]) > 1
+    assert sorted(job for chunk, _ in chunks for job in chunk) == jobs
+    assert sum(size for _, size in chunks) == sum(sizes)
+
+def test_run_parallel():
+    jobs = list(range(40))
+    statistics = scheduler.WorkerStatistics()
+    results = scheduler.run_parallel(len, jobs, 2, sizes=[j + 1 for j in jobs], serial_threshold=0, statistics=statistics)
+    assert sum(results) == len(jobs)
+    assert len(results) > 2
+    assert sum(counts[2] for counts in statistics.workers.values()) == len(jobs)
+    # small corpora are processed in a single chunk without starting a pool
+    statistics = scheduler.WorkerStatistics()
+    assert scheduler.run_parallel(len, jobs, 2, statistics=statistics) == [len(jobs)]
+    assert len(statistics.workers) == 1
+    assert statistics.report().split('\n')[-1].startswith('wall')
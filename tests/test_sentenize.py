@@ -1,7 +1,10 @@
 import pytest
+import random
+
+from array import array
 
 from articlenizer import sentenize
-from articlenizer.util import apply_regex_list
+from articlenizer.util import apply_regex_list, apply_guarded_regex_list, compile_regex_stages, compile_stage_triggers, RuleStatistics
 
 def test_string_normalization():
     s = '  This is    a test for  string normalization in    \n  all cases. '
@@ -48,3 +51,76 @@ def test_normalize():
     s = 'Stimuli were displayed on a 21 inch CRT monitor (refresh rate  = 120 Hz) using MatLab (7.1 version) software.'
     s, replacements = sentenize.normalize(s)
     assert s == 'Stimuli were displayed on a 21 inch CRT monitor (refresh rate = 120 Hz) using MatLab (7.1 version) software.'
+
+def test_fused_stages():
+    samples = [
+        '  \n\nLeading and trailing whitespace   \n   is removed.  \n\n',
+        'Brackets (are\nrejoined) and [so\nare] square ones (even [nested\nones]).',
+        'As seen in Fig.\n5 and e.g.\n[3]\n(see above) or 12.\n2.\n[4]',
+        'Enumerations: (1) First one; (2) Second one,(3) Third one.'
+    ]
+    rule_lists = [
+        (sentenize.NORM_REGEX, sentenize.NORM_STAGE_GROUPS),
+        (sentenize.SUBSENTENCE_REGEX, sentenize.SUBSENTENCE_STAGE_GROUPS),
+        (sentenize.RECOMBINE_REGEX, sentenize.RECOMBINE_STAGE_GROUPS),
+        (sentenize.SPLIT_ENUM_REGEX, sentenize.SPLIT_ENUM_STAGE_GROUPS)
+    ]
+    for regex, groups in rule_lists:
+        stages = compile_regex_stages(regex, groups)
+        for s in samples:
+            assert apply_regex_list(s, stages) == apply_regex_list(s, regex)
+
+def test_fused_sentenize(monkeypatch):
+    words = ['we', 'performed', 'tests', 'cerevisiae', 'and', 'of', 'with', 'The', 'Smith', 'Tests', 'J. S.', 'S.', 'A', 'formtok', 
+        'http://imagej.nih.gov/ij/', '5', '1.', '12.', '2003', 'Fig.', 'e.', 'g.', 'e.g.', 'i.e.', 'et al.', 'No.', 'approx.', 
+        '(see above)', '[3]', '[1-4]', '(1)', '(A)', '(', ')', '[', ']', '"', '“', '”', '.', ',', ';']
+    separators = [' ', ' ', ' ', '\n', '\n', ' \n', '\n ', '  ', '\n\n', '']
+    rng = random.Random(0)
+    samples = [rng.choice(separators) + ''.join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(1, 30))) for _ in range(1000)]
+    stages = {}
+    for name in ['NORM', 'REFINED_SPLIT', 'SUBSENTENCE', 'RECOMBINE', 'SPLIT_ENUM']:
+        regex = getattr(sentenize, name + '_REGEX')
+        groups = getattr(sentenize, name + '_STAGE_GROUPS')
+        stages[name] = compile_regex_stages(regex, groups, fuse=True)
+        for s in samples:
+            assert apply_regex_list(s, stages[name]) == apply_regex_list(s, regex)
+    expected = [(sentenize.sentenize(s), sentenize.sentenize_with_index(s), sentenize.sentenize_with_edits(s)) for s in samples]
+    for name in ['NORM', 'REFINED_SPLIT', 'RECOMBINE', 'SPLIT_ENUM']:
+        monkeypatch.setattr(sentenize, name + '_STAGES', stages[name])
+    for name in ['REFINED_SPLIT', 'RECOMBINE', 'SPLIT_ENUM']:
+        triggers = compile_stage_triggers(getattr(sentenize, name + '_TRIGGERS'), getattr(sentenize, name + '_STAGE_GROUPS'), fuse=True)
+        monkeypatch.setattr(sentenize, name + '_STAGE_TRIGGERS', triggers)
+    assert [(sentenize.sentenize(s), sentenize.sentenize_with_index(s), sentenize.sentenize_with_edits(s)) for s in samples] == expected
+
+def test_normalize_replacements():
+    s = '  Cells were  lysed \n\n  in buffer.\t \n'
+    normalized, replacements = sentenize.normalize(s)
+    assert normalized == apply_regex_list(s, sentenize.NORM_REGEX) == 'Cells were lysed\nin buffer.\t\n'
+    assert replacements == [[' ', '', 35, 36], [' \n\n  ', '\n', 19, 24], [' ', '', 13, 14], ['  ', '', 0, 2]]
+
+def test_sentenize_spans():
+    s = 'Cells were lysed in RIPA Buffer.Proteins were transferred (see Fig.\n5).\n\nMembranes were probed: (1) Rabbit anti-WDR34 (1:200).'
+    text, spans = sentenize.sentenize_spans(s)
+    assert text == sentenize.sentenize(s)
+    assert [text[b:e] for b, e in zip(spans[::2], spans[1::2])] == text.split('\n')
+    assert sentenize.sentence_spans('\nFirst.\n\nSecond.') == array('I', [1, 7, 9, 16])
+
+def test_rejoin_subsentences():
+    samples = [
+        'Brackets (are\nrejoined) and [so\nare] square ones (even [nested\nones]).',
+        'Nested (brackets (a) count (b) as\none) and "quotes\nare" rejoined.',
+        'Far (' + 'a' * 250 + '\n' + 'b' * 251 + ') apart.',
+        '(' + 'unclosed\n' * 100,
+        '(a\nb\nc\nd)'
+    ]
+    for s in samples:
+        assert sentenize.rejoin_subsentences(s) == apply_regex_list(s, sentenize.SUBSENTENCE_REGEX)
+    assert sentenize.rejoin_subsentences(samples[1]) == 'Nested (brackets (a) count (b) as one) and "quotes are" rejoined.'
+
+def test_trigger_guards():
+    s = 'Membranes were probed (see Fig.\n5) with antibodies.\nand then washed (1) Three times.'
+    statistics = RuleStatistics()
+    target = apply_regex_list(s, sentenize.RECOMBINE_REGEX)
+    assert apply_guarded_regex_list(s, sentenize.RECOMBINE_REGEX, sentenize.RECOMBINE_TRIGGERS, 'recombine', statistics) == target
+    assert statistics.counts[('recombine', 4)] == [0, 0, 1]
+    assert statistics.counts[('recombine', 0)] == [1, 1, 0]
@@ -0,0 +1,140 @@
+import zlib
+import pytest
+from functools import partial
+
+from articlenizer import articlenizer
+from articlenizer import formatting
+from articlenizer.manifest import Manifest
+from articlenizer.scheduler import run_parallel, WorkerStatistics
+from articlenizer.shards import ShardWriter, iter_shard, iter_shards
+
+def test_shards_roll_over_and_append(tmp_path):
+    writer = ShardWriter(tmp_path, max_bytes=100)
+    for idx in range(5):
+        writer.write('article{}'.format(idx), {'text': 'x' * 60})
+    writer.close()
+    assert len(list(tmp_path.glob('part-*.jsonl'))) == 3
+    writer = ShardWriter(tmp_path, max_bytes=1000)
+    writer.write('a', {'text': 'first'})
+    writer.close()
+    writer.write('b', {'text': 'second'})
+    writer.close()
+    # the second list of articles is appended to the same shard
+    assert len(list(tmp_path.glob('part-*.jsonl'))) == 4
+    keys = [record['key'] for record in iter_shards(tmp_path)]
+    assert sorted(keys) == ['a', 'article0', 'article1', 'article2', 'article3', 'article4', 'b']
+
+def test_gzip_shards(tmp_path):
+    writer = ShardWriter(tmp_path, compression='gzip')
+    writer.write('a', {'sentences': ['Ein Satz über Ä.']})
+    writer.close()
+    writer.write('b', {'sentences': []})
+    writer.close()
+    shards = list(tmp_path.glob('part-*.jsonl.gz'))
+    assert len(shards) == 1
+    assert list(iter_shard(shards[0])) == [{'sentences': ['Ein Satz über Ä.'], 'key': 'a'}, {'sentences': [], 'key': 'b'}]
+    with pytest.raises(RuntimeError):
+        ShardWriter(tmp_path, compression='lzma')
+
+def test_truncated_shards(tmp_path, capsys):
+    for compression in [None, 'gzip']:
+        out_path = tmp_path / str(compression)
+        out_path.mkdir()
+        writer = ShardWriter(out_path, compression=compression)
+        writer.write('a', {'sentences': ['Ein Satz über Ä.']})
+        writer.close()
+        shard = next(out_path.glob('part-*'))
+        first = shard.stat().st_size
+        writer.write('b', {'sentences': ['Noch ein Satz über Ä.']})
+        writer.close()
+        content = shard.read_bytes()
+        # cut off the second record after the first byte of Ä, or the gzip member holding it in the middle
+        shard.write_bytes(content[:content.rindex('Ä'.encode('utf-8')) + 1] if compression is None else content[:(first + len(content)) // 2])
+        writer = ShardWriter(out_path, compression=compression)
+        writer.write('c', {'sentences': []})
+        writer.close()
+        assert [record['key'] for record in iter_shards(out_path)] == ['a', 'c']
+        assert 'truncated' in capsys.readouterr().out
+
+def test_shards_keep_last_record_of_key(tmp_path):
+    writer = ShardWriter(tmp_path, max_bytes=100)
+    writer.write('a', {'text': 'first'})
+    writer.write('b', {'text': 'x' * 100})
+    writer.write('c', {'text': 'first'})
+    writer.close()
+    # a later run writes a and c again
+    writer = ShardWriter(tmp_path)
+    writer.write('c', {'text': 'second'})
+    writer.write('a', {'text': 'second'})
+    writer.close()
+    assert [(record['key'], record['text']) for record in iter_shards(tmp_path)] == [('b', 'x' * 100), ('c', 'second'), ('a', 'second')]
+
+def test_preprocess_articles_to_shards(tmp_path):
+    jobs = []
+    for idx in range(3):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Data were analysed with SPSS {}. Results are shown in Fig. 1.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+    articlenizer.preprocess_articles(jobs[:2], shards=ShardWriter(tmp_path, prefix='prepro'))
+    articlenizer.preprocess_articles(jobs[2:], stream=True, shards=ShardWriter(tmp_path, prefix='prepro'))
+    records = {record['key']: record['sentences'] for record in iter_shards(tmp_path, prefix='prepro')}
+    assert not list(tmp_path.glob('*.prepro.txt'))
+    assert len(records) == 3
+    for in_name, out_name in jobs:
+        articlenizer.preprocess_articles([[in_name, out_name]])
+        assert records[str(in_name)] == out_name.read_text().split('\n')[:-1]
+
+def test_manifest_waits_for_shards(tmp_path):
+    in_name = tmp_path / 'article.txt'
+    in_name.write_text('Data were analysed with SPSS.')
+    job = [in_name, tmp_path / 'article.prepro.txt']
+    manifest = Manifest(tmp_path, {})
+    shards = ShardWriter(tmp_path, compression='gzip')
+    shards.write(str(in_name), {'sentences': ['Data were analysed with SPSS .']})
+    manifest.record_written(job, shards=shards)
+    # the record is still buffered by the compressor
+    assert Manifest(tmp_path, {}).pending([job]) == [job]
+    shards.close()
+    assert Manifest(tmp_path, {}).pending([job]) == []
+    assert next(iter_shards(tmp_path))['key'] == str(in_name)
+    articlenizer.preprocess_articles([job], manifest=Manifest(tmp_path, {'sharded': True}), shards=shards)
+    assert Manifest(tmp_path, {'sharded': True}).pending([job]) == []
+
+def test_brat_to_bio_to_shards(tmp_path):
+    (tmp_path / 'article.txt').write_text('We used SPSS.')
+    (tmp_path / 'article.ann').write_text('T1\tApplication 8 12\tSPSS\n')
+    job = {'txt': tmp_path / 'article.txt', 'ann': tmp_path / 'article.ann', 'out': tmp_path / 'article'}
+    formatting.article_list_brat_to_bio([job], shards=ShardWriter(tmp_path, prefix='bio'))
+    record = next(iter_shards(tmp_path, prefix='bio'))
+    formatting.article_list_brat_to_bio([job])
+    assert record['data'] == (tmp_path / 'article.data.txt').read_text().split('\n')[:-1]
+    assert record['labels'] == (tmp_path / 'article.labels.txt').read_text().split('\n')[:-1]
+    assert record['relations'] == (tmp_path / 'article.relations.txt').read_text().split('\n')[:-1]
+
+def _gzip_members(path):
+    data = path.read_bytes()
+    members = 0
+    while data:
+        decompressor = zlib.decompressobj(31)
+        decompressor.decompress(data)
+        data = decompressor.unused_data
+        members += 1
+    return members
+
+def test_parallel_workers_keep_their_shard_open(tmp_path):
+    jobs = []
+    for idx in range(40):
+        in_name = tmp_path / 'article{}.txt'.format(idx)
+        in_name.write_text('Data were analysed with SPSS {}. Results are shown in Fig. 1.'.format(idx))
+        jobs.append([in_name, tmp_path / 'article{}.prepro.txt'.format(idx)])
+    manifest = Manifest(tmp_path, {})
+    fct = partial(articlenizer.preprocess_articles, manifest=manifest, shards=ShardWriter(tmp_path, prefix='prepro', compression='gzip'))
+    statistics = WorkerStatistics()
+    results = run_parallel(fct, jobs, 2, serial_threshold=0, statistics=statistics)
+    assert len(results) > 2
+    # one shard and gzip member per worker instead of one member per chunk
+    shards = list(tmp_path.glob('prepro-*.jsonl.gz'))
+    assert len(shards) == len(statistics.workers)
+    assert all(_gzip_members(shard) == 1 for shard in shards)
+    assert sorted(record['key'] for record in iter_shards(tmp_path, prefix='prepro')) == sorted(str(in_name) for in_name, _ in jobs)
+    assert Manifest(tmp_path, {}).pending(jobs) == []
@@ -1,6 +1,8 @@
 import pytest
 
-from articlenizer import articlenizer
+from array import array
+
+from articlenizer import articlenizer, tokenize
 
 def test_tokenization_with_spaces():
     s = 'Tokenization is tested with a single sentence, which requires an example such as the sentence: "Data processing and statistical analyses were conducted using IBM SPSS 22.0 (IBM Corp., Armonk, NY), MATLAB R2015a (The MathWorks, Natick, MA), R 3.3.2 R2.11.1 (http://www.R-project.org/), and Python libraries for scientific computation (NumPy, and SciPy) [39]."'
@@ -17,3 +19,20 @@ def test_tokenization_without_spaces_application():
     s = articlenizer.tokenize_text(s)
     print(s)
     assert s == ['Several', 'softwares', 'and', 'R', 'packages', 'are', 'available', 'for', 'Rasch', 'model', 'analysis', 'such', 'as', 'ConQuest', '(', 'https://shop.acer.edu.au/group/CON3', ')', ',', 'RUMM', '(', 'www.rummlab.com.au', ')', ',', 'ltm', '(', 'cran.r-project.org/package=ltm', ')', 'and', 'eRM', '(', 'cran.r-project.org/package=eRm', ')', '.']
+
+def test_tokenize_spans():
+    s = 'First line.\nWe used SPSS 22.0 (IBM Corp., Armonk, NY) and R2015a [39].'
+    spans = tokenize.tokenize_spans(s, 12)
+    assert tokenize.span_tokens(s, spans) == articlenizer.tokenize_text(s[12:], correct=False)
+    assert spans[:4] == array('I', [12, 14, 15, 19])
+    assert tokenize.span_tokens(s, tokenize.tokenize_spans(s, 0, 10)) == ['First', 'line']
+    text, spans = articlenizer.tokenize_text(s, representation='spans', correct=False)
+    assert tokenize.span_tokens(text, spans) == articlenizer.tokenize_text(s, correct=False)
+
+def test_dispatch_tokenization():
+    for s in ['Word and R2015a, 10.1371.journal.pone.0123 at www.site.org/x or site.edu/y.', 'Rk&D cran.r-project.org/p=1 V.2 ver. e.g. i.v. [1-3,5] 1,000,000 1,0000 .5mg 3.3.2a abc-def', 'Théorie: http://x.de/a_b? ftp://f.org. 12ab R2 x9y wd3', 'It worked.', '10/1371/journal/pone/0123', '10 1371 journal abc 1', 'see 10_1371_journal_x_1']:
+        assert tokenize.DISPATCH_REGEX.split(s) == tokenize.TOKENIZATION_REGEX.split(s)
+    assert tokenize.tokenize('It worked.') == ['It', ' ', 'worked', '.']
+    assert tokenize.tokenize('10/1371/journal/pone/0123') == ['10/1371/journal/pone/0123']
+    assert tokenize.tokenize('10 1371 journal abc 1') == ['10 1371 journal abc 1']
+    assert tokenize.tokenize('see 10_1371_journal_x_1') == ['see', ' ', '10_1371_journal_x_1']